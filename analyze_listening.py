@@ -3,62 +3,16 @@
 Analyze Spotify listening data and filter artists by listening frequency
 """
 
-import json
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
-import config
-
-def get_top_artists_all_ranges(spotify):
-    """Get top artists across all time ranges with rankings"""
-    artist_scores = {}
-
-    # Weight: short_term (last 4 weeks) gets highest weight
-    # medium_term (last 6 months) gets medium weight
-    # long_term (several years) gets lowest weight
-    time_ranges = {
-        'short_term': 3,    # Last 4 weeks - most important
-        'medium_term': 2,   # Last 6 months
-        'long_term': 1      # All time
-    }
+import argparse
 
-    print("Analyzing your listening habits across different time periods...\n")
+from spotify_data import get_artist_scores
 
-    for time_range, weight in time_ranges.items():
-        print(f"Fetching {time_range.replace('_', ' ')} data...")
-        top = spotify.current_user_top_artists(limit=50, time_range=time_range)
-
-        for idx, item in enumerate(top['items']):
-            artist_name = item['name']
-            # Higher rank (lower index) = higher score
-            rank_score = (50 - idx) * weight
-
-            if artist_name in artist_scores:
-                artist_scores[artist_name]['score'] += rank_score
-                artist_scores[artist_name]['appearances'] += 1
-                artist_scores[artist_name]['time_ranges'].append(time_range)
-            else:
-                artist_scores[artist_name] = {
-                    'score': rank_score,
-                    'appearances': 1,
-                    'time_ranges': [time_range],
-                    'id': item['id']
-                }
-
-    return artist_scores
-
-def filter_by_listening(min_score=None, top_n=None, require_recent=False):
+def filter_by_listening(min_score=None, top_n=None, require_recent=False, refresh=False):
     """Filter artists based on listening data"""
 
-    # Initialize Spotify
-    spotify = spotipy.Spotify(auth_manager=SpotifyOAuth(
-        client_id=config.SPOTIFY_CLIENT_ID,
-        client_secret=config.SPOTIFY_CLIENT_SECRET,
-        redirect_uri=config.SPOTIFY_REDIRECT_URI,
-        scope=config.SPOTIFY_SCOPES
-    ))
-
-    # Get listening data
-    artist_scores = get_top_artists_all_ranges(spotify)
+    # Get listening data (cached; Spotify is only contacted when it's stale)
+    print("Analyzing your listening habits across different time periods...\n")
+    artist_scores = get_artist_scores(refresh=refresh)
 
     # Load current artist list
     with open('my_artists.txt', 'r') as f:
@@ -94,14 +48,14 @@ def filter_by_listening(min_score=None, top_n=None, require_recent=False):
 
     return filtered_artists, current_artists, artist_scores
 
-def show_analysis():
+def show_analysis(refresh=False):
     """Show listening analysis and recommendations"""
     print("=" * 80)
     print("SPOTIFY LISTENING ANALYSIS")
     print("=" * 80)
     print()
 
-    filtered, current, all_scores = filter_by_listening()
+    filtered, current, all_scores = filter_by_listening(refresh=refresh)
 
     print(f"Total artists in your list: {len(current)}")
     print(f"Artists you actually listen to: {len(filtered)}")
@@ -130,7 +84,11 @@ def show_analysis():
     return filtered, current, all_scores
 
 if __name__ == '__main__':
-    filtered, current, all_scores = show_analysis()
+    parser = argparse.ArgumentParser(description='Filter my_artists.txt by how much you listen to each artist')
+    parser.add_argument('--refresh', action='store_true', help='Ignore the cached listening data and refetch it')
+    args = parser.parse_args()
+
+    filtered, current, all_scores = show_analysis(refresh=args.refresh)
 
     choice = input("\nEnter your choice (1-7): ").strip()
 
@@ -0,0 +1,77 @@
+"""
+Artist registry: one hashed index of normalized artist names, shared by loading, merging and matching
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+
+@lru_cache(maxsize=8192)
+def normalize_artist_name(name):
+    """Fold an artist name into a matching key.
+
+    Applies Unicode NFKC and casefolding, treats '&' and 'and' the same,
+    collapses whitespace and drops a leading 'The ', so "The Weeknd" and
+    "weeknd" or "Simon & Garfunkel" and "Simon and Garfunkel" share a key.
+    Results are memoized since the same performers recur across events.
+    """
+    key = unicodedata.normalize('NFKC', name or '').casefold()
+    key = key.replace('&', ' and ')
+    key = re.sub(r'\s+', ' ', key).strip()
+    if key.startswith('the '):
+        key = key[4:]
+    return key
+
+
+class ArtistRegistry:
+    """Ordered set of artist dicts with O(1) lookups by normalized name and Spotify ID."""
+
+    def __init__(self, artists=()):
+        self._artists = []
+        self._by_key = {}
+        self._by_spotify_id = {}
+        for artist in artists:
+            self.add(artist)
+
+    def add(self, artist):
+        """Add an artist dict ({'name', 'id', 'source'}). Returns False if it was already known.
+
+        A duplicate that brings a Spotify ID the existing entry lacks fills it in.
+        """
+        key = normalize_artist_name(artist['name'])
+        spotify_id = artist.get('id')
+        existing = self._by_key.get(key)
+        if existing is None and spotify_id:
+            existing = self._by_spotify_id.get(spotify_id)
+
+        if existing is not None:
+            if spotify_id and not existing.get('id'):
+                existing['id'] = spotify_id
+                self._by_spotify_id[spotify_id] = existing
+            return False
+
+        self._artists.append(artist)
+        self._by_key[key] = artist
+        if spotify_id:
+            self._by_spotify_id[spotify_id] = artist
+        return True
+
+    def get(self, name):
+        """Return the artist whose normalized name matches, or None."""
+        return self._by_key.get(normalize_artist_name(name))
+
+    def get_by_spotify_id(self, spotify_id):
+        return self._by_spotify_id.get(spotify_id)
+
+    def to_list(self):
+        return list(self._artists)
+
+    def __contains__(self, name):
+        return normalize_artist_name(name) in self._by_key
+
+    def __iter__(self):
+        return iter(self._artists)
+
+    def __len__(self):
+        return len(self._artists)
@@ -0,0 +1,97 @@
+"""
+Incremental search schedule: check touring artists every run and dormant ones on a decaying schedule
+"""
+
+import math
+import random
+from datetime import datetime, timedelta
+
+from artist_registry import normalize_artist_name
+
+# Cron jitter: a weekly run that starts a few hours early still counts as a week later
+SCHEDULE_SLACK = timedelta(hours=12)
+
+
+class ArtistScheduler:
+    """Decides which artists to search this run, from what earlier searches found.
+
+    An artist is "hot" and searched every run if they have upcoming shows,
+    announced something on their last check, or announce often (at least
+    `hot_frequency` of checks turned up a new show). Otherwise each quiet
+    check doubles the wait, from `base_days` up to `max_days`.
+
+    To measure what skipping costs, an `audit_rate` share of the skipped
+    artists is searched anyway; an audited artist with a new show is a miss
+    (its alert would have been delayed until its next scheduled check).
+    """
+
+    def __init__(self, state, base_days=7, max_days=28, hot_frequency=0.25, audit_rate=0.1, rng=None):
+        self.state = state
+        self.base_days = base_days
+        self.max_days = max_days
+        self.hot_frequency = hot_frequency
+        self.audit_rate = audit_rate
+        self.rng = rng or random.Random()
+        self.schedule = state.load_schedule()
+        self.skipped = []
+        self.audited = set()
+        self.misses = []
+
+    def interval_days(self, entry):
+        """Days to wait between checks for an artist (0 = every run)."""
+        if entry['event_ids'] or entry['quiet_streak'] == 0:
+            return 0
+        if entry['changes'] / entry['checks'] >= self.hot_frequency:
+            return 0
+        return min(self.max_days, self.base_days * 2 ** (entry['quiet_streak'] - 1))
+
+    def is_due(self, artist_name, now=None):
+        entry = self.schedule.get(normalize_artist_name(artist_name))
+        if entry is None:
+            return True
+        interval = timedelta(days=self.interval_days(entry))
+        if not interval:
+            return True
+        now = now or datetime.now()
+        return now - datetime.fromisoformat(entry['last_checked']) >= interval - SCHEDULE_SLACK
+
+    def plan(self, artists, now=None):
+        """Return the artists to search this run (due ones plus an audit sample of the rest), in list order."""
+        due = [artist for artist in artists if self.is_due(artist['name'], now)]
+        due_names = {artist['name'] for artist in due}
+        self.skipped = [artist for artist in artists if artist['name'] not in due_names]
+
+        audit_count = math.ceil(len(self.skipped) * self.audit_rate)
+        self.audited = {artist['name'] for artist in self.rng.sample(self.skipped, audit_count)}
+        return [artist for artist in artists if artist['name'] in due_names or artist['name'] in self.audited]
+
+    def record(self, artist_name, event_ids, new_shows, now=None):
+        """Update an artist's entry after a completed search (saved with the run's next checkpoint).
+
+        event_ids are the artist's upcoming events seen this search and
+        new_shows how many of them hadn't been alerted on before.
+        """
+        key = normalize_artist_name(artist_name)
+        now = (now or datetime.now()).isoformat(timespec='seconds')
+        entry = self.schedule.get(key) or {
+            'artist_key': key, 'name': artist_name, 'last_changed': None,
+            'checks': 0, 'changes': 0, 'quiet_streak': 0, 'event_ids': [],
+        }
+        entry['last_checked'] = now
+        entry['checks'] += 1
+        if new_shows:
+            entry['changes'] += 1
+            entry['last_changed'] = now
+            entry['quiet_streak'] = 0
+        else:
+            entry['quiet_streak'] += 1
+        entry['event_ids'] = sorted(event_ids)
+        self.schedule[key] = entry
+        self.state.save_schedule_entry(entry)
+
+        if new_shows and artist_name in self.audited:
+            self.misses.append(artist_name)
+
+    def miss_rate(self):
+        """Share of audited (otherwise skipped) artists that had a new show, or None if none were audited."""
+        return len(self.misses) / len(self.audited) if self.audited else None
@@ -0,0 +1,101 @@
+"""
+Persistent artist -> Ticketmaster attraction ID mapping, with TTL refresh and manual overrides
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+from artist_registry import normalize_artist_name
+
+
+def load_overrides(filename):
+    """Parse the override file: one 'Artist Name = ATTRACTION_ID[, ATTRACTION_ID...]' per line.
+
+    Use 'Artist Name = none' to force a plain keyword search for an artist.
+    """
+    overrides = {}
+    if not os.path.exists(filename):
+        return overrides
+    with open(filename, 'r') as f:
+        for line in f:
+            line = line.strip()
+            # Skip empty lines and comments
+            if not line or line.startswith('#') or '=' not in line:
+                continue
+            name, ids = line.rsplit('=', 1)
+            ids = [i.strip() for i in ids.split(',') if i.strip()]
+            if [i.lower() for i in ids] == ['none']:
+                ids = []
+            overrides[normalize_artist_name(name)] = ids
+    return overrides
+
+
+class AttractionMap:
+    """Maps artists to their Ticketmaster attraction IDs.
+
+    Resolved IDs are kept in a JSON file and re-resolved once older than
+    `ttl_days`. Entries from the override file always win and never expire.
+    An empty ID list means "no confident match - search by keyword".
+    """
+
+    def __init__(self, filename, overrides_file, ttl_days):
+        self.filename = filename
+        self.ttl = timedelta(days=ttl_days)
+        self.overrides = load_overrides(overrides_file)
+        self.resolved_count = 0
+        self._lock = threading.Lock()
+        self._entries = {}
+        if os.path.exists(filename):
+            with open(filename, 'r') as f:
+                self._entries = json.load(f)
+
+    def get(self, artist_name):
+        """Return the known attraction IDs for an artist (possibly stale), or None."""
+        key = normalize_artist_name(artist_name)
+        if key in self.overrides:
+            return self.overrides[key]
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry['ids'] if entry else None
+
+    def needs_refresh(self, artist_name):
+        """True if the artist has no entry yet or its entry is older than the TTL."""
+        key = normalize_artist_name(artist_name)
+        if key in self.overrides:
+            return False
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return True
+        return datetime.now() - datetime.fromisoformat(entry['resolved_at']) > self.ttl
+
+    def set(self, artist_name, ids):
+        with self._lock:
+            self._entries[normalize_artist_name(artist_name)] = {
+                'name': artist_name,
+                'ids': sorted(ids),
+                'resolved_at': datetime.now().isoformat(timespec='seconds'),
+            }
+            self.resolved_count += 1
+
+    def artist_for_id(self):
+        """Reverse index: attraction ID -> normalized artist key."""
+        index = {}
+        with self._lock:
+            for key, entry in self._entries.items():
+                for attraction_id in entry['ids']:
+                    index[attraction_id] = key
+        for key, ids in self.overrides.items():
+            for attraction_id in ids:
+                index[attraction_id] = key
+        return index
+
+    def save(self):
+        """Write the mapping atomically, sorted so the file diffs cleanly."""
+        with self._lock:
+            tmp_path = f"{self.filename}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self._entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.filename)
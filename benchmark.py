@@ -0,0 +1,964 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the concert search pipeline, run against local stub servers
+
+Usage: python benchmark.py [search] [ratelimit] [strategy] [registry] [classify] [schedule]
+                           [decode] [follow] [resolve] [top] [auth] [snapshot] [sources]
+                           [dedupe] [profiles] [geo] [notify]
+
+Exits non-zero if any correctness check prints NO, so CI can catch regressions.
+"""
+
+import contextlib
+import dataclasses
+import io
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import requests
+
+import config
+from artist_scheduler import ArtistScheduler
+from concert_bot import ConcertBot, run_profiles
+from concert_sources import BandsintownSource, SeatGeekSource, SourceFanout
+from dedupe_index import DedupeIndex, event_fingerprint
+from discovery_decode import decode_events_page, streaming_available
+from event_matcher import EventClassifier
+from follow_snapshot import FollowSnapshot
+from profiles import Profile, Region
+from spotify_auth import spotify_client
+from spotify_batches import apply_in_batches
+from spotify_data import TIME_RANGE_WEIGHTS, load_top_artists, score_artists
+from spotify_ids import SpotifyIdResolver
+from state_store import StateStore
+from venue_index import VenueIndex, distance_miles, enclosing_region, point_in_polygon, vectorized_available
+from stub_servers import (
+    fake_duplicate_listings, FakeBandsintownServer, FakeSeatGeekServer, FakeSmtpServer, FakeSpotifyServer,
+    FakeTicketmasterServer, FakeWebhookServer, fake_events, fake_regional_events, fake_venues, place_events,
+)
+
+
+# Correctness checks that came out wrong, so the run can exit non-zero
+FAILED_CHECKS = []
+
+
+def report_check(label, ok):
+    """Print a yes/NO correctness line and remember the failures."""
+    print(f"  {label}: {'yes' if ok else 'NO'}")
+    if not ok:
+        FAILED_CHECKS.append(label)
+
+
+def load_artist_names():
+    """Load the curated artist list (falls back to the example file)."""
+    for filename in (config.MY_ARTISTS_FILE, 'my_artists.txt.example'):
+        try:
+            with open(filename, 'r') as f:
+                return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        except FileNotFoundError:
+            continue
+    return []
+
+
+def scratch_profile(directory):
+    """The configured profile with its state database, notified list and alerts file moved into `directory`."""
+    return dataclasses.replace(Profile.from_config(), state_db=os.path.join(directory, 'state.db'),
+                               notified_file=os.path.join(directory, 'notified.json'),
+                               output_file=os.path.join(directory, 'alerts.txt'))
+
+
+def bench_search(latency=0.4, artist_count=80):
+    """Serial vs concurrent search mode against a fake Ticketmaster with fixed latency."""
+    names = load_artist_names()[:artist_count]
+    artists = [{'name': name, 'id': None, 'source': 'manual'} for name in names]
+    events = [event for name in names for event in fake_events(name)]
+
+    print("=" * 80)
+    print(f"SEARCH: {len(artists)} artists, {latency * 1000:.0f}ms server latency, "
+          f"{config.TICKETMASTER_RATE_LIMIT:g} req/s limit")
+    print("=" * 80)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, FakeTicketmasterServer(events, latency=latency) as server:
+        config.TICKETMASTER_BASE_URL = server.base_url
+        config.TICKETMASTER_API_KEY = 'benchmark'
+        config.RESPONSE_CACHE_ENABLED = False
+
+        for mode, workers in (('serial', 1), ('concurrent', config.SEARCH_WORKERS)):
+            config.SEARCH_MODE = mode
+            config.SEARCH_WORKERS = workers
+            bot = ConcertBot(scratch_profile(tmp))
+
+            start = time.perf_counter()
+            found = [(artist['name'], [e['id'] for e in found_events])
+                     for _, artist, found_events in bot._search_artists(artists)]
+            elapsed = time.perf_counter() - start
+
+            results[mode] = found
+            stats = bot.http.connection_stats()
+            bot.http.close()
+            print(f"  {mode:<12} workers={workers:<3} {elapsed:7.2f}s  "
+                  f"({len(artists) / elapsed:5.1f} artists/s, "
+                  f"{stats['connections']} connections for {stats['requests']} requests)")
+
+    same = results['serial'] == results['concurrent']
+    report_check("Results identical and in the same order", same)
+    print()
+
+
+def bench_ratelimit(server_limit=3, artist_count=60):
+    """Concurrent search configured faster than the server allows - nothing should be lost."""
+    names = load_artist_names()[:artist_count]
+    artists = [{'name': name, 'id': None, 'source': 'manual'} for name in names]
+    events = [event for name in names for event in fake_events(name)]
+    expected = {name: sorted(e['id'] for e in fake_events(name)) for name in names}
+
+    print("=" * 80)
+    print(f"RATE LIMIT: {len(artists)} artists, client starts at {config.TICKETMASTER_RATE_LIMIT * 2:g} req/s, "
+          f"server allows {server_limit} req/s")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            FakeTicketmasterServer(events, latency=0.05, rate_limit=server_limit) as server:
+        config.TICKETMASTER_BASE_URL = server.base_url
+        config.TICKETMASTER_API_KEY = 'benchmark'
+        config.RESPONSE_CACHE_ENABLED = False
+        config.SEARCH_MODE = 'concurrent'
+        config.TICKETMASTER_RATE_LIMIT *= 2
+        bot = ConcertBot(scratch_profile(tmp))
+
+        start = time.perf_counter()
+        # An artist that failed part-way comes round again in the retry pass
+        found = {}
+        for _, artist, found_events in bot._search_artists(artists):
+            found.setdefault(artist['name'], []).extend(e['id'] for e in found_events)
+        elapsed = time.perf_counter() - start
+        bot.http.close()
+
+    print(f"  {elapsed:.2f}s, {server.throttled_count} 429s, final rate {bot.rate_limiter.rate:.1f} req/s")
+    recovered = {name: sorted(ids) for name, ids in found.items()} == expected
+    report_check("Every artist's events recovered", recovered)
+    print()
+
+
+def bench_strategy(regional_events=3000):
+    """Per-artist keyword search vs one regional sweep: API calls and matched events."""
+    names = load_artist_names()
+    artists = [{'name': name, 'id': None, 'source': 'manual'} for name in names]
+    events = [event for name in names for event in fake_events(name)] + fake_regional_events(regional_events)
+
+    print("=" * 80)
+    print(f"STRATEGY: {len(artists)} artists, {len(events)} music events in the region")
+    print("=" * 80)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, FakeTicketmasterServer(events) as server:
+        config.TICKETMASTER_BASE_URL = server.base_url
+        config.TICKETMASTER_API_KEY = 'benchmark'
+        config.RESPONSE_CACHE_ENABLED = False
+        config.TICKETMASTER_RATE_LIMIT = 1000
+        config.SEARCH_MODE = 'serial'
+
+        # Estimate first, while no attraction IDs have been resolved yet
+        bot = ConcertBot(scratch_profile(tmp))
+        estimate = bot.compare_search_strategies(artists)
+        bot.http.close()
+
+        for strategy in ('artist', 'sweep'):
+            config.SEARCH_STRATEGY = strategy
+            bot = ConcertBot(scratch_profile(tmp))
+            before = server.request_count
+            start = time.perf_counter()
+            results[strategy] = [(artist['name'], sorted(e['id'] for e in found_events))
+                                 for _, artist, found_events in bot._search_artists(artists)]
+            elapsed = time.perf_counter() - start
+            bot.http.close()
+            print(f"  {strategy:<8} {server.request_count - before:5} API calls  {elapsed:6.2f}s  "
+                  f"(estimated ~{estimate[strategy]})")
+
+    same = results['artist'] == results['sweep']
+    report_check("Both strategies found the same events", same)
+    print()
+
+
+class FakeSpotifyFollows:
+    """In-memory stand-in for the followed-artists endpoints, 50 artists per page."""
+
+    def __init__(self, names):
+        self.items = [{'name': name, 'id': f"sp{i:06d}"} for i, name in enumerate(names)]
+
+    def _page(self, offset):
+        next_offset = offset + 50 if offset + 50 < len(self.items) else None
+        return {'artists': {'items': self.items[offset:offset + 50], 'total': len(self.items), 'next': next_offset}}
+
+    def current_user_followed_artists(self, limit=50):
+        return self._page(0)
+
+    def next(self, result):
+        return self._page(result['next'])
+
+
+class FakeSpotifyFollowWrites:
+    """Follow endpoint stand-in: fixed latency per request, and a whole request fails on any bad ID."""
+
+    def __init__(self, latency, bad_ids=()):
+        self.latency = latency
+        self.bad_ids = set(bad_ids)
+        self.requests = 0
+        self.followed = set()
+
+    def user_follow_artists(self, ids):
+        self.requests += 1
+        time.sleep(self.latency)
+        if len(ids) > 50:
+            raise ValueError('too many ids requested')
+        bad = self.bad_ids.intersection(ids)
+        if bad:
+            raise ValueError(f"invalid id {sorted(bad)[0]}")
+        self.followed.update(ids)
+
+
+def bench_follow(artist_count=150, latency=0.03):
+    """One request per artist with a 0.1s sleep (the old sync loop) vs 50-ID batches."""
+    artists = [{'name': f"Artist {i}", 'id': f"sp{i:06d}"} for i in range(artist_count)]
+    bad_ids = [artists[7]['id'], artists[99]['id']]
+
+    print("=" * 80)
+    print(f"FOLLOW: {artist_count} artists ({len(bad_ids)} bad IDs), {latency * 1000:.0f}ms per request")
+    print("=" * 80)
+
+    legacy = FakeSpotifyFollowWrites(latency, bad_ids)
+    start = time.perf_counter()
+    for artist in artists:
+        try:
+            legacy.user_follow_artists([artist['id']])
+            time.sleep(0.1)
+        except ValueError:
+            pass
+    legacy_elapsed = time.perf_counter() - start
+
+    batched = FakeSpotifyFollowWrites(latency, bad_ids)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, failed = apply_in_batches(batched.user_follow_artists, artists, 'Followed')
+    batched_elapsed = time.perf_counter() - start
+
+    print(f"  one at a time  {legacy_elapsed:6.2f}s  {legacy.requests:4d} requests  {len(legacy.followed)} followed")
+    print(f"  50-ID batches  {batched_elapsed:6.2f}s  {batched.requests:4d} requests  {len(batched.followed)} followed "
+          f"({legacy_elapsed / batched_elapsed:.1f}x faster)")
+    report_check("Bad IDs isolated", sorted(a['id'] for a in failed) == sorted(bad_ids))
+    print()
+
+
+class FakeSpotifySearch:
+    """Artist search stand-in with fixed latency; some names have a same-named namesake."""
+
+    def __init__(self, names, latency, namesakes=()):
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.artists = {name.lower(): [{'name': name, 'id': f"sp{i:06d}", 'followers': {'total': 1000},
+                                        'genres': ['rock']}]
+                        for i, name in enumerate(names)}
+        for name in namesakes:
+            self.artists[name.lower()].append({'name': name, 'id': f"dup{name[:8]}", 'followers': {'total': 12},
+                                               'genres': []})
+
+    def search(self, q, type='artist', limit=10):
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.latency)
+        name = q[len('artist:'):].lower()
+        return {'artists': {'items': self.artists.get(name, [])[:limit]}}
+
+
+def bench_resolve(artist_count=100, latency=0.25):
+    """Serial one-result lookups (the old sync loop) vs the cached, concurrent resolver."""
+    names = load_artist_names()[:artist_count]
+    namesakes = names[:3]
+
+    print("=" * 80)
+    print(f"RESOLVE: {len(names)} artist names, {latency * 1000:.0f}ms per Spotify search")
+    print("=" * 80)
+
+    spotify = FakeSpotifySearch(names, latency, namesakes)
+    start = time.perf_counter()
+    legacy = {}
+    for name in names:
+        items = spotify.search(q=f'artist:{name}', type='artist', limit=1)['artists']['items']
+        if items:
+            legacy[name] = items[0]['id']
+    print(f"  serial, limit=1      {time.perf_counter() - start:6.2f}s  {spotify.requests:4d} searches  "
+          f"{len(legacy)} resolved (namesakes picked blindly)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = os.path.join(tmp, 'ids.json')
+        for label in ('resolver, cold cache', 'resolver, warm cache'):
+            spotify = FakeSpotifySearch(names, latency, namesakes)
+            resolver = SpotifyIdResolver(spotify, cache_file, os.devnull,
+                                         workers=config.SPOTIFY_WORKERS, rate=config.SPOTIFY_RATE_LIMIT)
+            start = time.perf_counter()
+            resolved, _ = resolver.resolve_all(names)
+            resolver.save()
+            print(f"  {label:<20} {time.perf_counter() - start:6.2f}s  {spotify.requests:4d} searches  "
+                  f"{len(resolved)} resolved, {len(resolver.ambiguous)} held for review")
+    print()
+
+
+class FakeSpotifyTop:
+    """Top-artists endpoint stand-in: fixed latency, 50 per page, a different ranking per time range."""
+
+    def __init__(self, names, latency):
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.ranked = {time_range: [{'name': name, 'id': f"sp{i:06d}"} for i, name in enumerate(names)][shift::2]
+                       for shift, time_range in enumerate(TIME_RANGE_WEIGHTS)}
+
+    def current_user_top_artists(self, limit=20, offset=0, time_range='medium_term'):
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.latency)
+        items = self.ranked[time_range][offset:offset + limit]
+        more = offset + limit < len(self.ranked[time_range])
+        return {'items': items, 'next': 'more' if more else None}
+
+
+def bench_top(latency=0.3, depth=100):
+    """Three serial 50-artist requests (the old scripts) vs concurrent paged fetch vs the disk cache."""
+    names = load_artist_names()
+
+    print("=" * 80)
+    print(f"TOP ARTISTS: 3 time ranges, {depth} artists deep, {latency * 1000:.0f}ms per request")
+    print("=" * 80)
+
+    spotify = FakeSpotifyTop(names, latency)
+    start = time.perf_counter()
+    for time_range in TIME_RANGE_WEIGHTS:
+        spotify.current_user_top_artists(limit=50, time_range=time_range)
+    print(f"  serial, 50 deep     {time.perf_counter() - start:6.2f}s  {spotify.requests:2d} requests")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = os.path.join(tmp, 'top.json')
+        for label in ('concurrent, paged', 'cached'):
+            spotify = FakeSpotifyTop(names, latency)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                ranges = load_top_artists(spotify, limit=depth, cache_file=cache_file, ttl_hours=1)
+            scores = score_artists(ranges, depth=depth)
+            print(f"  {label:<19} {time.perf_counter() - start:6.2f}s  {spotify.requests:2d} requests  "
+                  f"{len(scores)} artists scored")
+    print()
+
+
+def bench_auth(runs=5):
+    """Token requests across several runs: refresh on every start (old bot) vs the shared token cache."""
+    names = load_artist_names()
+
+    print("=" * 80)
+    print(f"AUTH: {runs} runs each listing followed artists, then a token revoked mid-run")
+    print("=" * 80)
+
+    with FakeSpotifyServer(names) as server, tempfile.TemporaryDirectory() as tmp:
+        config.SPOTIFY_API_BASE_URL = server.api_url
+        config.SPOTIFY_TOKEN_URL = server.token_url
+        config.SPOTIFY_CLIENT_ID = config.SPOTIFY_CLIENT_ID or 'benchmark'
+        config.SPOTIFY_CLIENT_SECRET = config.SPOTIFY_CLIENT_SECRET or 'benchmark'
+        config.SPOTIFY_REFRESH_TOKEN = 'benchmark-refresh-token'
+
+        # Old _init_spotify: refresh_access_token on every run, then a fixed token
+        for _ in range(runs):
+            token = requests.post(server.token_url, data={'grant_type': 'refresh_token'}).json()['access_token']
+            requests.get(f"{server.api_url}me/following", params={'type': 'artist', 'limit': 50},
+                         headers={'Authorization': f"Bearer {token}"})
+        print(f"  refresh every run   {server.token_requests:2d} token requests")
+
+        config.SPOTIFY_TOKEN_CACHE_FILE = os.path.join(tmp, 'token.json')
+        before = server.token_requests
+        for _ in range(runs):
+            spotify_client().current_user_followed_artists(limit=50)
+        print(f"  shared token cache  {server.token_requests - before:2d} token requests")
+
+        spotify = spotify_client()
+        server.revoke_tokens()
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                spotify.current_user_followed_artists(limit=50)
+                recovered = 'yes'
+            except Exception as e:
+                recovered = f"NO ({e})"
+        print(f"  Recovered from a mid-run 401: {recovered}")
+    print()
+
+
+def bench_snapshot(followed_count=2000, latency=0.05):
+    """Paging every followed artist each run (old bot) vs the snapshot check, before and after a new follow."""
+    names = load_artist_names()
+    names += [f"Followed Artist {i}" for i in range(followed_count - len(names))]
+
+    print("=" * 80)
+    print(f"SNAPSHOT: {len(names)} followed artists, {latency * 1000:.0f}ms per Spotify request")
+    print("=" * 80)
+
+    with FakeSpotifyServer(names, latency=latency) as server, tempfile.TemporaryDirectory() as tmp:
+        config.SPOTIFY_API_BASE_URL = server.api_url
+        config.SPOTIFY_TOKEN_URL = server.token_url
+        config.SPOTIFY_CLIENT_ID = config.SPOTIFY_CLIENT_ID or 'benchmark'
+        config.SPOTIFY_CLIENT_SECRET = config.SPOTIFY_CLIENT_SECRET or 'benchmark'
+        config.SPOTIFY_REFRESH_TOKEN = 'benchmark-refresh-token'
+        config.SPOTIFY_TOKEN_CACHE_FILE = os.path.join(tmp, 'token.json')
+        spotify = spotify_client()
+        state = StateStore(':memory:')
+
+        start = time.perf_counter()
+        results = spotify.current_user_followed_artists(limit=50)
+        legacy = list(results['artists']['items'])
+        requests_made = 1
+        while results['artists']['next']:
+            results = spotify.next(results['artists'])
+            legacy.extend(results['artists']['items'])
+            requests_made += 1
+        print(f"  page through all       {time.perf_counter() - start:6.2f}s  {requests_made:3d} requests  "
+              f"{len(legacy)} artists")
+
+        for label in ('snapshot, first run', 'snapshot, unchanged', 'snapshot, new follow'):
+            if label.endswith('new follow'):
+                server.followed.append({'name': 'Brand New Follow', 'id': 'spnew0001'})
+            snapshot = FollowSnapshot(state)
+            start = time.perf_counter()
+            artists = snapshot.fetch(spotify)
+            print(f"  {label:<22} {time.perf_counter() - start:6.2f}s  {snapshot.requests:3d} requests  "
+                  f"{len(artists)} artists{' (reused)' if snapshot.reused else ''}")
+        state.close()
+    print()
+
+
+def bench_sources(artist_count=60, latency=0.15):
+    """Extra sources searched one artist at a time vs the per-source fan-out, plus a source that hangs."""
+    names = load_artist_names()[:artist_count]
+    artists = [{'name': name} for name in names]
+
+    print("=" * 80)
+    print(f"SOURCES: {len(names)} artists on Bandsintown + SeatGeek, {latency * 1000:.0f}ms per request")
+    print("=" * 80)
+
+    with FakeBandsintownServer(names, latency=latency) as bandsintown, \
+            FakeSeatGeekServer(names, latency=latency) as seatgeek:
+        def make_sources(bandsintown_timeout=10):
+            return [BandsintownSource(bandsintown.base_url, 'benchmark', 20, bandsintown_timeout, workers=4),
+                    SeatGeekSource(seatgeek.base_url, 'benchmark', 20, 10, workers=4)]
+
+        sources = make_sources()
+        start = time.perf_counter()
+        serial = {artist['name']: [event for source in sources for event in source.search(artist['name'])]
+                  for artist in artists}
+        print(f"  one at a time   {time.perf_counter() - start:6.2f}s  "
+              f"{sum(len(events) for events in serial.values())} events")
+
+        fanout = SourceFanout(make_sources())
+        start = time.perf_counter()
+        fanout.submit(artists)
+        fanned = {artist['name']: fanout.collect(artist['name']) for artist in artists}
+        elapsed = time.perf_counter() - start
+        fanout.close()
+        shows = {event_fingerprint(name, event) for name, events in fanned.items() for event in events}
+        print(f"  fan-out         {elapsed:6.2f}s  {sum(len(events) for events in fanned.values())} events, "
+              f"{len(shows)} distinct shows after cross-source dedupe")
+        report_check("Same events as one at a time", fanned == serial)
+
+        # Bandsintown now answers slower than its timeout: it should be dropped, not stall the run
+        bandsintown.latency = 2.0
+        with contextlib.redirect_stdout(io.StringIO()):
+            fanout = SourceFanout(make_sources(bandsintown_timeout=0.5), wait_seconds=1, max_failures=3)
+            start = time.perf_counter()
+            fanout.submit(artists)
+            for artist in artists:
+                fanout.collect(artist['name'])
+            elapsed = time.perf_counter() - start
+            fanout.close()
+        stats = fanout.stats
+        print(f"  hung Bandsintown {elapsed:5.2f}s  bandsintown: {stats['bandsintown']['failed']} failed, "
+              f"{stats['bandsintown']['late']} late, switched off: {'yes' if 'bandsintown' in fanout.disabled else 'no'}; "
+              f"seatgeek: {stats['seatgeek']['searched']} searched")
+    print()
+
+
+def bench_dedupe(copies=20):
+    """Alerts from ID-only dedupe vs show fingerprints, on listings with presale/mirror duplicates."""
+    names = load_artist_names()
+    events = [(name, event) for name in names for event in fake_events(name)]
+    listings = events + [(name, event) for name, main in events for event in fake_duplicate_listings([main])
+                         if event['id'] != main['id']][::3]
+
+    print("=" * 80)
+    print(f"DEDUPE: {len(events)} shows listed {len(listings)} times")
+    print("=" * 80)
+
+    seen_ids = {event['id'] for _, event in listings}
+    print(f"  event ID only     {len(seen_ids):5d} alerts")
+
+    state = StateStore(':memory:')
+    start = time.perf_counter()
+    for _ in range(copies):
+        index = DedupeIndex(state)
+        alerts = 0
+        for name, event in listings:
+            fingerprint = index.fingerprint(name, event)
+            if index.original(fingerprint) is not None:
+                index.collapse(name, event, index.original(fingerprint))
+                continue
+            alerts += 1
+            index.add(fingerprint, event['id'], event['dates']['start']['localDate'])
+        state.conn.rollback()
+    elapsed = time.perf_counter() - start
+    state.close()
+    print(f"  fingerprints      {alerts:5d} alerts, {len(index.collapsed)} listings collapsed "
+          f"({elapsed / (copies * len(listings)) * 1e6:.1f}µs per listing)")
+    print()
+
+
+def write_profiles(directory, lists):
+    """Profiles in `directory` from {name: (region, artist names[, polygon])}, with their artist files written."""
+    profiles = []
+    for name, (region, artists, *polygon) in lists.items():
+        os.makedirs(os.path.join(directory, name))
+        artists_file = os.path.join(directory, name, 'my_artists.txt')
+        with open(artists_file, 'w') as f:
+            f.write('\n'.join(artists))
+        profiles.append(Profile(name, region, (), artists_file, os.path.join(directory, name, 'state.db'),
+                                os.path.join(directory, name, 'notified.json'),
+                                os.path.join(directory, name, 'alerts.txt'), polygon=polygon[0] if polygon else None))
+    return profiles
+
+
+def bench_profiles(latency=0.02, artist_count=90):
+    """Discovery requests for several overlapping profiles: separate runs vs one run sharing searches."""
+    names = load_artist_names()[:artist_count]
+    events = [event for name in names for event in fake_events(name)]
+    los_angeles, new_york = Region(34.0522, -118.2437, 40), Region(40.7128, -74.0060, 30)
+    third = len(names) // 3
+    # Three LA profiles with overlapping lists and one NY profile sharing artists but not the region
+    lists = {'la-a': (los_angeles, names[:2 * third]), 'la-b': (los_angeles, names[third:]),
+             'la-c': (los_angeles, names[::2]), 'ny': (new_york, names[:third])}
+
+    print("=" * 80)
+    print(f"PROFILES: {len(lists)} profiles, {sum(len(artists) for _, artists in lists.values())} artist searches, "
+          f"{len({(region, name) for region, artists in lists.values() for name in artists})} unique (artist, region)")
+    print("=" * 80)
+
+    config.RESPONSE_CACHE_ENABLED = False
+    config.ATTRACTION_ID_MATCHING = False
+    config.SEARCH_STRATEGY = 'artist'
+    config.SEARCH_MODE = 'serial'
+    config.SKIP_SPOTIFY = True
+    config.EXTRA_SOURCES = []
+    config.NOTIFY_CHANNELS = []
+    config.TICKETMASTER_RATE_LIMIT = 50
+    results = {}
+    for label, shared in (('one run each', False), ('shared run', True)):
+        with tempfile.TemporaryDirectory() as tmp, FakeTicketmasterServer(events, latency=latency) as server:
+            config.TICKETMASTER_BASE_URL = server.base_url
+            config.TICKETMASTER_API_KEY = 'benchmark'
+            profiles = write_profiles(tmp, lists)
+
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                if shared:
+                    run_profiles(profiles)
+                else:
+                    for profile in profiles:
+                        run_profiles([profile])
+            elapsed = time.perf_counter() - start
+
+            alerts = {}
+            for profile in profiles:
+                with open(profile.notified_file) as f:
+                    alerts[profile.name] = sorted(json.load(f))
+            results[label] = alerts
+            print(f"  {label:<14} {server.request_count:4d} requests  {elapsed:6.2f}s  "
+                  f"({sum(len(ids) for ids in alerts.values())} alerts)")
+
+    same = results['one run each'] == results['shared run']
+    report_check("Same alerts per profile", same)
+    print()
+
+
+def bench_geo(venue_count=2000, event_count=20000, artist_count=60, latency=0.02):
+    """Area checks: per-event haversine vs the venue geo index; then per-region vs widened Discovery queries."""
+    venues = fake_venues(venue_count, 34.0522, -118.2437, 80)
+    events = place_events(fake_regional_events(event_count), venues)
+    hollywood = ((34.15, -118.40), (34.15, -118.25), (34.05, -118.25), (34.05, -118.40))
+    areas = {
+        'la-10': (Region(34.0522, -118.2437, 10), None),
+        'la-25': (Region(34.0522, -118.2437, 25), None),
+        'la-40': (Region(34.0522, -118.2437, 40), None),
+        'irvine-20': (Region(33.6846, -117.8265, 20), None),
+        'hollywood': (Region(*enclosing_region(hollywood)), hollywood),
+    }
+
+    print("=" * 80)
+    print(f"GEO: {len(events)} events at {venue_count} venues, {len(areas)} areas "
+          f"(numpy {'installed' if vectorized_available() else 'not installed, scalar fallback'})")
+    print("=" * 80)
+
+    start = time.perf_counter()
+    naive = {}
+    for name, (region, polygon) in areas.items():
+        inside = []
+        for event in events:
+            location = event['_embedded']['venues'][0]['location']
+            latitude, longitude = float(location['latitude']), float(location['longitude'])
+            if (distance_miles(region.latitude, region.longitude, latitude, longitude) <= region.radius
+                    and (polygon is None or point_in_polygon(latitude, longitude, polygon))):
+                inside.append(event['id'])
+        naive[name] = inside
+    naive_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = VenueIndex(None, config.GEO_CELL_DEGREES)
+    indexed = {name: [event['id'] for event in events if index.contains(region, polygon, event)]
+               for name, (region, polygon) in areas.items()}
+    elapsed = time.perf_counter() - start
+    print(f"  haversine per event  {naive_elapsed * 1000:8.1f}ms")
+    print(f"  venue geo index      {elapsed * 1000:8.1f}ms  ({naive_elapsed / elapsed:.1f}x faster, "
+          f"{len(index)} venues indexed)")
+    report_check("Same events per area", naive == indexed)
+
+    names = load_artist_names()[:artist_count]
+    shows = place_events([event for name in names for event in fake_events(name, count=6)], venues)
+    lists = {name: (region, names, polygon) for name, (region, polygon) in areas.items()}
+    config.RESPONSE_CACHE_ENABLED = False
+    config.ATTRACTION_ID_MATCHING = False
+    config.SEARCH_STRATEGY = 'artist'
+    config.SEARCH_MODE = 'serial'
+    config.SKIP_SPOTIFY = True
+    config.EXTRA_SOURCES = []
+    config.NOTIFY_CHANNELS = []
+    config.TICKETMASTER_RATE_LIMIT = 50
+    results = {}
+    for label, max_radius in (('query per region', 0), ('widened query', 75)):
+        config.GEO_MAX_QUERY_RADIUS = max_radius
+        with tempfile.TemporaryDirectory() as tmp, FakeTicketmasterServer(shows, latency=latency) as server:
+            config.TICKETMASTER_BASE_URL = server.base_url
+            config.TICKETMASTER_API_KEY = 'benchmark'
+            config.VENUES_FILE = os.path.join(tmp, 'venues.json')
+            profiles = write_profiles(tmp, lists)
+            with contextlib.redirect_stdout(io.StringIO()):
+                run_profiles(profiles)
+            alerts = {}
+            for profile in profiles:
+                with open(profile.notified_file) as f:
+                    alerts[profile.name] = sorted(json.load(f))
+            results[label] = alerts
+            print(f"  {label:<18} {server.request_count:4d} requests  "
+                  f"({sum(len(ids) for ids in alerts.values())} alerts over {len(profiles)} profiles)")
+    same = results['query per region'] == results['widened query']
+    report_check("Same alerts per profile", same)
+    print()
+
+
+def bench_notify(artist_count=60, latency=0.3):
+    """Bot runs delivering through a slow, flaky webhook and an SMTP server that's down for the first run."""
+    names = load_artist_names()[:artist_count]
+    events = [event for name in names for event in fake_events(name)]
+
+    print("=" * 80)
+    print(f"NOTIFY: {len(names)} artists, webhook answering in {latency * 1000:.0f}ms (first two posts fail), "
+          f"SMTP down for the first run")
+    print("=" * 80)
+
+    config.RESPONSE_CACHE_ENABLED = False
+    config.ATTRACTION_ID_MATCHING = False
+    config.SEARCH_STRATEGY = 'artist'
+    config.SEARCH_MODE = 'serial'
+    config.SKIP_SPOTIFY = True
+    config.EXTRA_SOURCES = []
+    config.TICKETMASTER_RATE_LIMIT = 50
+    config.SENDER_EMAIL = 'bot@example.com'
+    config.SMTP_HOST = '127.0.0.1'
+    config.SMTP_STARTTLS = False
+    config.SMTP_USERNAME = None
+    config.WEBHOOK_STYLE = 'json'
+    config.NOTIFY_RETRY_SECONDS = 0.1
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        closed_port = probe.getsockname()[1]
+
+    with tempfile.TemporaryDirectory() as tmp, FakeTicketmasterServer(events, latency=0.01) as server, \
+            FakeWebhookServer(failures=[500, 429], latency=latency) as webhook, FakeSmtpServer(failures=[451]) as smtp:
+        config.TICKETMASTER_BASE_URL = server.base_url
+        config.TICKETMASTER_API_KEY = 'benchmark'
+        config.WEBHOOK_URL = webhook.base_url + '/webhook'
+        region = Region(34.0522, -118.2437, 40)
+        quiet, profile = [dataclasses.replace(profile, recipients=('me@example.com',))
+                          for profile in write_profiles(tmp, {'quiet': (region, names), 'notify': (region, names)})]
+
+        def run(label, profile, channels, smtp_port):
+            config.NOTIFY_CHANNELS = channels
+            config.SMTP_PORT = smtp_port
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                run_profiles([profile])
+            print(f"  {label:<30} {time.perf_counter() - start:6.2f}s")
+            for line in output.getvalue().splitlines():
+                if line.startswith(('📨', '⚠️', '❌')):
+                    print(f"      {line}")
+
+        run('no notifications', quiet, [], closed_port)
+        run('webhook + SMTP (SMTP down)', profile, ['webhook', 'smtp'], closed_port)
+        run('next run (SMTP back up)', profile, ['webhook', 'smtp'], smtp.port)
+
+        with open(profile.notified_file) as f:
+            alerted = set(json.load(f))
+        posted = [alert['event_id'] for _, payload in webhook.received for alert in payload['alerts']]
+        mailed = sum(message.get_payload(0).get_payload(decode=True).decode().count('Artist: ')
+                     for _, _, message in smtp.messages)
+        print(f"  {len(alerted)} alerts: webhook delivered {len(set(posted) & alerted)} ({len(posted)} posted), "
+              f"SMTP {len(smtp.messages)} email(s) with {mailed} alerts")
+    print()
+
+
+def legacy_merge(curated, followed_items):
+    """The pre-registry merge: a linear any() scan per followed artist."""
+    artists = list(curated)
+    for item in followed_items:
+        if not any(a['name'].lower() == item['name'].lower() for a in artists):
+            artists.append({'name': item['name'], 'id': item['id'], 'source': 'spotify_followed'})
+    return artists
+
+
+def bench_registry(followed_count=10000):
+    """Merging curated artists with a large Spotify follow list: any() scan vs hashed registry."""
+    curated_names = load_artist_names()
+    # Half the curated list is also followed (so dedupe has work to do), the rest are new names
+    followed_names = curated_names[::2] + [f"Followed Artist {i}" for i in range(followed_count - len(curated_names[::2]))]
+
+    print("=" * 80)
+    print(f"REGISTRY: {len(curated_names)} curated + {len(followed_names)} followed artists")
+    print("=" * 80)
+
+    curated = [{'name': name, 'id': None, 'source': 'manual'} for name in curated_names]
+    start = time.perf_counter()
+    legacy = legacy_merge(curated, FakeSpotifyFollows(followed_names).items)
+    legacy_elapsed = time.perf_counter() - start
+    print(f"  any() scan      {legacy_elapsed * 1000:9.1f}ms  ({len(legacy)} artists)")
+
+    config.SKIP_SPOTIFY = False
+    with tempfile.TemporaryDirectory() as tmp:
+        bot = ConcertBot(scratch_profile(tmp))
+        bot.spotify = FakeSpotifyFollows(followed_names)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            merged = bot.get_favorite_artists()
+            elapsed = time.perf_counter() - start
+        bot.http.close()
+    print(f"  ArtistRegistry  {elapsed * 1000:9.1f}ms  ({len(merged)} artists, "
+          f"{legacy_elapsed / elapsed:.0f}x faster)")
+    print()
+
+
+def legacy_is_tribute_show(event):
+    """The pre-classifier tribute check: substring scan per keyword."""
+    event_name = event.get('name', '').lower()
+    tribute_keywords = ['tribute', 'tributes', 'cover', 'covers', 'experience', 'reimagined',
+                        'celebration', 'vs.', 'vs ', 'night with dj', 'starring']
+    return any(keyword in event_name for keyword in tribute_keywords)
+
+
+def legacy_is_artist_match(event, search_artist):
+    """The pre-classifier artist match: re-lowercases both names for every attraction."""
+    search_lower = search_artist.lower()
+    if '_embedded' not in event or 'attractions' not in event['_embedded']:
+        return search_lower in event.get('name', '').lower()
+    for attraction in event['_embedded']['attractions']:
+        attraction_name = attraction.get('name', '').lower()
+        if search_lower == attraction_name:
+            return True
+        if search_lower.replace('the ', '') == attraction_name.replace('the ', ''):
+            return True
+    return False
+
+
+# (event title, artist searched, expected tribute keyword or None)
+TRIBUTE_CASES = [
+    ("Celebrations of Queen", "Queen", 'celebrations'),
+    ("The Beatles Experiences", "The Beatles", 'experiences'),
+    ("Tributes to Prince", "Prince", 'tributes'),
+    ("Fleetwood Mac Covers Night", "Fleetwood Mac", 'covers'),
+    ("The Jimi Hendrix Experience", "The Jimi Hendrix Experience", None),
+    ("Whitesnake feat. David Coverdale", "Whitesnake", None),
+    ("Discover Radiohead Live", "Radiohead", None),
+]
+
+
+def bench_classify(rounds=5):
+    """Per-event cost of tribute filtering + artist matching, legacy checks vs EventClassifier."""
+    names = load_artist_names()
+    # Discovery-shaped payloads: every artist's shows, tribute acts and unrelated local events
+    events = [(name, event) for name in names for event in fake_events(name, count=8)]
+    for name in names[::4]:
+        for event in fake_events(f"{name} Tribute Night", count=2):
+            events.append((name, event))
+    events += [(names[i % len(names)], event) for i, event in enumerate(fake_regional_events(3000))]
+
+    print("=" * 80)
+    print(f"CLASSIFY: {len(events)} Discovery event payloads x {rounds} rounds")
+    print("=" * 80)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        legacy = [not legacy_is_tribute_show(e) and legacy_is_artist_match(e, a) for a, e in events]
+    legacy_per_event = (time.perf_counter() - start) / (rounds * len(events))
+
+    classifier = EventClassifier(names)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        compiled = [classifier.classify(e, a)[0] for a, e in events]
+    per_event = (time.perf_counter() - start) / (rounds * len(events))
+
+    print(f"  legacy checks    {legacy_per_event * 1e6:6.2f}us/event  ({sum(legacy)} accepted)")
+    print(f"  EventClassifier  {per_event * 1e6:6.2f}us/event  ({sum(compiled)} accepted)")
+
+    wrong = [(title, keyword) for title, artist, keyword in TRIBUTE_CASES
+             if classifier.tribute_reason({'name': title}, artist) != keyword]
+    for title, keyword in wrong:
+        print(f"  expected {keyword!r} for {title!r}")
+    report_check(f"Tribute keyword cases ({len(TRIBUTE_CASES)}) as expected", not wrong)
+    print()
+
+
+def bench_schedule(artist_count=300, weeks=52, touring_share=0.15, seed=7):
+    """Simulate a year of weekly runs: searches saved by incremental mode vs alerts it delays.
+
+    Touring artists announce a show most weeks, dormant ones rarely. Every
+    announcement is found eventually (the search returns all upcoming shows);
+    a delayed alert is one that didn't go out the week it was announced.
+    """
+    rng = random.Random(seed)
+    artists = [{'name': f"Artist {i}", 'id': None, 'source': 'manual'} for i in range(artist_count)]
+    touring = set(rng.sample(range(artist_count), int(artist_count * touring_share)))
+    announce_chance = [0.3 if i in touring else 0.01 for i in range(artist_count)]
+
+    print("=" * 80)
+    print(f"SCHEDULE: {artist_count} artists ({len(touring)} touring), {weeks} weekly runs")
+    print("=" * 80)
+
+    state = StateStore(':memory:')
+    scheduler = ArtistScheduler(state, config.SCHEDULE_BASE_DAYS, config.SCHEDULE_MAX_DAYS,
+                                audit_rate=config.SCHEDULE_AUDIT_RATE, rng=random.Random(seed))
+    start = datetime(2025, 1, 1, 20)
+    upcoming = {i: {} for i in range(artist_count)}  # event_id -> week announced
+    alerted = set()
+    searches = delayed = delay_weeks = announced = audited = audit_misses = 0
+
+    for week in range(weeks):
+        now = start + timedelta(weeks=week)
+        for i in range(artist_count):
+            # Shows stay on sale for ~20 weeks
+            upcoming[i] = {e: w for e, w in upcoming[i].items() if week - w < 20}
+            if rng.random() < announce_chance[i]:
+                upcoming[i][f"E{i}-{week}"] = week
+                announced += 1
+
+        planned = scheduler.plan(artists, now)
+        searches += len(planned)
+        for artist in planned:
+            i = int(artist['name'].split()[1])
+            new = [e for e in upcoming[i] if e not in alerted]
+            for event_id in new:
+                if upcoming[i][event_id] < week:
+                    delayed += 1
+                    delay_weeks += week - upcoming[i][event_id]
+                alerted.add(event_id)
+            scheduler.record(artist['name'], list(upcoming[i]), len(new), now)
+        audited += len(scheduler.audited)
+        audit_misses += len(scheduler.misses)
+        scheduler.misses = []
+
+    baseline = artist_count * weeks
+    print(f"  all mode          {baseline:6d} searches")
+    print(f"  incremental mode  {searches:6d} searches ({1 - searches / baseline:.0%} fewer)")
+    print(f"  alerts delayed    {delayed:6d} of {announced} "
+          f"({delayed / announced:.1%}, avg {delay_weeks / max(delayed, 1):.1f} weeks late)")
+    print(f"  audit miss rate   {audit_misses / max(audited, 1):6.1%}  ({audit_misses}/{audited} audited skips)")
+    print()
+
+
+def bench_decode(page_size=200, rounds=20):
+    """Full JSON decode vs selective decode of a recorded, full-size Discovery events page."""
+    events = fake_regional_events(page_size)
+    with FakeTicketmasterServer(events, full_payloads=True) as server:
+        # Record one page exactly as the server sent it
+        raw = requests.get(f"{server.base_url}/events.json", params={'size': page_size}).content
+
+    print("=" * 80)
+    print(f"DECODE: one {page_size}-event page, {len(raw) / 1024:.0f} KB "
+          f"({len(raw) / page_size / 1024:.1f} KB per event)")
+    print("=" * 80)
+
+    decoders = [('json (full page)', lambda: json.loads(raw)),
+                ('json + projection', lambda: decode_events_page(raw, streaming=False))]
+    if streaming_available():
+        decoders.append(('ijson streaming', lambda: decode_events_page(raw, streaming=True)))
+    else:
+        print("  (ijson not installed - pip install ijson to measure the streaming decoder)")
+
+    results = []
+    for label, decode in decoders:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            decode()
+        per_page = (time.perf_counter() - start) / rounds
+
+        tracemalloc.start()
+        data = decode()
+        kept, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append(data)
+        print(f"  {label:<18} {per_page * 1000:7.1f}ms/page  peak {peak / 1024:7.0f} KB  "
+              f"kept {kept / 1024:6.0f} KB")
+
+    projected = results[1:]
+    same = all(data == projected[0] for data in projected)
+    report_check("Projected pages identical", same)
+    print()
+
+
+BENCHMARKS = {
+    'search': bench_search,
+    'ratelimit': bench_ratelimit,
+    'strategy': bench_strategy,
+    'registry': bench_registry,
+    'classify': bench_classify,
+    'schedule': bench_schedule,
+    'decode': bench_decode,
+    'follow': bench_follow,
+    'resolve': bench_resolve,
+    'top': bench_top,
+    'auth': bench_auth,
+    'snapshot': bench_snapshot,
+    'sources': bench_sources,
+    'dedupe': bench_dedupe,
+    'profiles': bench_profiles,
+    'geo': bench_geo,
+    'notify': bench_notify,
+}
+
+if __name__ == '__main__':
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark: {name} (choose from {', '.join(BENCHMARKS)})")
+            sys.exit(1)
+        BENCHMARKS[name]()
+    if FAILED_CHECKS:
+        print(f"❌ {len(FAILED_CHECKS)} check(s) failed: {'; '.join(FAILED_CHECKS)}")
+        sys.exit(1)
@@ -0,0 +1,101 @@
+"""
+Concert record: the few event fields the bot uses, extracted once and rendered everywhere
+"""
+
+from dataclasses import asdict, dataclass
+
+from extract_event_ids import extract_event_id_from_url
+
+ALERT_RULE = '=' * 80
+
+
+@dataclass(slots=True, frozen=True)
+class Concert:
+    """One concert alert. Missing fields are None and shown as 'N/A'."""
+
+    artist: str
+    event_id: str | None
+    name: str | None
+    date: str | None  # YYYY-MM-DD
+    time: str | None  # HH:MM:SS
+    venue: str | None
+    city: str | None
+    url: str | None
+
+    @classmethod
+    def from_event(cls, artist_name, event):
+        """Build a record from a Discovery API event dict, keeping only the fields we render."""
+        start = event.get('dates', {}).get('start', {})
+        venues = event.get('_embedded', {}).get('venues') or [{}]
+        return cls(
+            artist=artist_name,
+            event_id=event.get('id'),
+            name=event.get('name'),
+            date=start.get('localDate'),
+            time=start.get('localTime'),
+            venue=venues[0].get('name'),
+            city=venues[0].get('city', {}).get('name'),
+            url=event.get('url'),
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def to_dict(self):
+        return asdict(self)
+
+    @property
+    def when(self):
+        return f"{self.date or 'N/A'} at {self.time or 'N/A'}"
+
+    @property
+    def where(self):
+        return f"{self.venue or 'N/A'}, {self.city or 'N/A'}"
+
+    def alert_text(self):
+        """The block appended to concert_alerts.txt (and used for the plain-text email)."""
+        return f"""
+{ALERT_RULE}
+🎵 NEW CONCERT ALERT!
+{ALERT_RULE}
+Artist: {self.artist}
+Event: {self.name or 'N/A'}
+Date: {self.when}
+Venue: {self.where}
+Tickets: {self.url or 'N/A'}
+{ALERT_RULE}
+"""
+
+
+def parse_alerts_file(filename):
+    """Read every Concert back out of concert_alerts.txt, in the order they were written."""
+    concerts = []
+    fields = {}
+    with open(filename, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('Artist: '):
+                fields = {'artist': line[len('Artist: '):]}
+            elif line.startswith('Event: '):
+                fields['name'] = line[len('Event: '):]
+            elif line.startswith('Date: '):
+                date, _, time = line[len('Date: '):].partition(' at ')
+                fields['date'], fields['time'] = date, time
+            elif line.startswith('Venue: '):
+                venue, _, city = line[len('Venue: '):].rpartition(', ')
+                fields['venue'], fields['city'] = (venue, city) if venue else (city, None)
+            elif line.startswith('Tickets: ') and 'artist' in fields:
+                url = line[len('Tickets: '):]
+                concerts.append(Concert(
+                    artist=fields['artist'],
+                    event_id=extract_event_id_from_url(url),
+                    name=fields.get('name'),
+                    date=fields.get('date'),
+                    time=fields.get('time'),
+                    venue=fields.get('venue'),
+                    city=fields.get('city'),
+                    url=url,
+                ))
+                fields = {}
+    return concerts
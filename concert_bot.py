@@ -4,153 +4,303 @@ Concert Alert Bot
 Monitors upcoming concerts for your favorite Spotify artists in your area.
 """
 
-import json
+import argparse
 import os
 import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from datetime import datetime, timedelta
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
 import requests
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, Email, To, Content
 import config
+from artist_registry import ArtistRegistry, normalize_artist_name
+from artist_scheduler import ArtistScheduler
+from attraction_ids import AttractionMap
+from concert import Concert
+from concert_sources import SourceFanout, configured_sources
+from dedupe_index import DedupeIndex
+from discovery_decode import decode_events_page
+from event_matcher import EventClassifier, title_pattern
+from extract_event_ids import parse_concert_alerts
+from follow_snapshot import FollowSnapshot
+from http_session import PooledSession
+from notifications import NotificationDispatcher, configured_channels
+from profiles import DiscoveryClients, Profile, SharedSearches, load_profiles
+from rate_limiter import AdaptiveRateLimiter, retry_after_seconds
+from response_cache import ResponseCache, make_cache_key
+from spotify_auth import spotify_client
+from state_store import StateStore
+from venue_index import VenueIndex
 
 # Suppress SSL warnings
 warnings.filterwarnings('ignore', message='urllib3 v2 only supports OpenSSL')
 
 
+# Discovery API refuses to page past this many results for one query
+DISCOVERY_PAGING_LIMIT = 1000
+
+
+class SearchFailedError(Exception):
+    """Raised when a Discovery search still fails after every retry."""
+
+
 class ConcertBot:
-    def __init__(self):
+    def __init__(self, profile=None, shared=None):
+        # Whose artists, region, recipients and state this bot works with
+        self.profile = profile or Profile.from_config()
+        # Search results and Discovery clients shared with other profiles in a multi-profile run
+        self.shared = shared
         self.spotify = None  # Lazy initialization
-        self.notified_concerts = self._load_notified_concerts()
+        self.state = self._load_notified_concerts()
+        self.classifier = EventClassifier()
+        if shared and shared.clients:
+            clients = shared.clients
+            self.rate_limiter, self.http, self.cache = clients.rate_limiter, clients.http, clients.cache
+            self.attractions, self.venues = clients.attractions, clients.venues
+        else:
+            self._init_clients()
+            if shared:
+                shared.clients = DiscoveryClients(rate_limiter=self.rate_limiter, http=self.http, cache=self.cache,
+                                                  attractions=self.attractions, venues=self.venues)
+        self.sweep_calls = 0
+        # Bandsintown/SeatGeek searches running alongside Ticketmaster (set up per run)
+        self.fanout = None
+        # Artists whose search failed this run (not journaled as complete)
+        self.incomplete_artists = set()
+        # Background delivery of this run's alerts (set up per run)
+        self.notifier = None
+
+    @property
+    def query_region(self):
+        """The circle sent to the API: the profile's region, or a wider one shared with nearby profiles."""
+        return self.shared.query_region(self.profile.region) if self.shared else self.profile.region
+
+    @property
+    def local_filter(self):
+        """Whether results need checking against the profile's area (a polygon, or a widened query)."""
+        return bool(self.profile.polygon) or self.query_region != self.profile.region
+
+    def in_area(self, event):
+        """False if the event's venue is known to be outside the profile's area (unknown venues pass)."""
+        if not self.local_filter:
+            return True
+        return self.venues.contains(self.profile.region, self.profile.polygon, event) is not False
+
+    def _init_clients(self):
+        """Create the rate limiter, HTTP pool, response cache and attraction map for Discovery calls."""
+        # Shared by every search worker so concurrent mode stays under the API quota
+        self.rate_limiter = AdaptiveRateLimiter(config.TICKETMASTER_RATE_LIMIT)
+        # One keep-alive connection pool for every Discovery API call
+        self.http = PooledSession(
+            pool_size=max(config.HTTP_POOL_SIZE, config.SEARCH_WORKERS),
+            connect_timeout=config.HTTP_CONNECT_TIMEOUT,
+            read_timeout=config.HTTP_READ_TIMEOUT
+        )
+        self.attractions = AttractionMap(
+            config.ATTRACTION_IDS_FILE,
+            config.ATTRACTION_OVERRIDES_FILE,
+            config.ATTRACTION_ID_TTL_DAYS
+        )
+        self.cache = None
+        if config.RESPONSE_CACHE_ENABLED or config.OFFLINE:
+            self.cache = ResponseCache(config.RESPONSE_CACHE_DIR, config.RESPONSE_CACHE_MAX_MB * 1024 * 1024)
+        self.venues = VenueIndex(config.VENUES_FILE, config.GEO_CELL_DEGREES)
 
     def _init_spotify(self):
-        """Initialize Spotify client with OAuth (lazy)."""
+        """Initialize Spotify client (lazy), reusing the shared cached token if it's still valid."""
         if self.spotify is None:
-            # If refresh token is provided (e.g., in GitHub Actions), use it
-            if config.SPOTIFY_REFRESH_TOKEN:
-                auth_manager = SpotifyOAuth(
-                    client_id=config.SPOTIFY_CLIENT_ID,
-                    client_secret=config.SPOTIFY_CLIENT_SECRET,
-                    redirect_uri=config.SPOTIFY_REDIRECT_URI,
-                    scope=config.SPOTIFY_SCOPES
-                )
-                # Manually set the refresh token
-                token_info = auth_manager.refresh_access_token(config.SPOTIFY_REFRESH_TOKEN)
-                self.spotify = spotipy.Spotify(auth=token_info['access_token'])
-            else:
-                # Normal OAuth flow (requires browser)
-                self.spotify = spotipy.Spotify(auth_manager=SpotifyOAuth(
-                    client_id=config.SPOTIFY_CLIENT_ID,
-                    client_secret=config.SPOTIFY_CLIENT_SECRET,
-                    redirect_uri=config.SPOTIFY_REDIRECT_URI,
-                    scope=config.SPOTIFY_SCOPES
-                ))
+            self.spotify = spotify_client()
         return self.spotify
 
     def _load_notified_concerts(self):
-        """Load previously notified concerts from file."""
-        if os.path.exists(config.NOTIFIED_CONCERTS_FILE):
-            with open(config.NOTIFIED_CONCERTS_FILE, 'r') as f:
-                data = json.load(f)
-                # Handle both old format (list of IDs) and new format (dict with dates)
-                if isinstance(data, list):
-                    # Old format - convert to new format
-                    return {event_id: None for event_id in data}
-                return data
-        return {}
+        """Open the state database, importing notified_concerts.json if it's new or changed."""
+        # Offline replays work on an in-memory copy so nothing is written back
+        directory = os.path.dirname(self.profile.state_db)
+        if directory and not config.OFFLINE:
+            os.makedirs(directory, exist_ok=True)
+        state = StateStore(self.profile.state_db, scratch=config.OFFLINE)
+        imported = state.import_json(self.profile.notified_file)
+        if imported:
+            print(f"Imported {imported} tracked concerts from {self.profile.notified_file}")
+        return state
 
     def _save_notified_concerts(self):
-        """Save notified concerts to file."""
-        with open(config.NOTIFIED_CONCERTS_FILE, 'w') as f:
-            json.dump(self.notified_concerts, f, indent=2)
+        """Dump notified concerts to the JSON file that gets committed to git."""
+        self.state.dump_json(self.profile.notified_file)
 
-    def _cleanup_past_concerts(self):
-        """Remove concerts that have already happened from tracking."""
-        today = datetime.now().date()
-        to_remove = []
+    def _start_run(self):
+        """Start a new run, or pick up one that was interrupted.
 
-        for event_id, event_date in self.notified_concerts.items():
-            if event_date:
-                try:
-                    concert_date = datetime.strptime(event_date, '%Y-%m-%d').date()
-                    if concert_date < today:
-                        to_remove.append(event_id)
-                except (ValueError, TypeError):
-                    # If we can't parse the date, keep it for now
-                    pass
+        Returns (run_id, names of artists already checked, recovered alerts).
+        Alerts journaled by an interrupted run are always recovered, since
+        their events are already marked as notified. Its finished artists are
+        only skipped if it started within RESUME_WINDOW_HOURS.
+        """
+        interrupted = [] if config.OFFLINE else self.state.interrupted_runs()
+        if not interrupted:
+            return self.state.start_run(), set(), []
 
-        for event_id in to_remove:
-            del self.notified_concerts[event_id]
+        run_id, started_at = interrupted[-1]
+        recovered = [Concert.from_dict(alert) for alert in self.state.journaled_alerts(run_id)]
+        if datetime.now() - datetime.fromisoformat(started_at) <= timedelta(hours=config.RESUME_WINDOW_HOURS):
+            return run_id, self.state.completed_artists(run_id), recovered
+        return self.state.start_run(), set(), recovered
 
-        if to_remove:
-            print(f"Cleaned up {len(to_remove)} past concerts from tracking")
+    def _cleanup_past_concerts(self):
+        """Remove concerts that have already happened from tracking. Returns how many were removed.
+
+        Undated entries (from the old list format) are dated first where
+        possible. Any still undated after UNDATED_EXPIRY_DAYS are dropped:
+        they were found within the search window, so they're over by then.
+        """
+        self._backfill_event_dates()
+
+        # Indexed range deletes, so only the expired rows are touched
+        removed = self.state.delete_events_before(datetime.now().strftime('%Y-%m-%d'))
+        cutoff = datetime.now() - timedelta(days=config.UNDATED_EXPIRY_DAYS)
+        removed_undated = self.state.delete_undated_before(cutoff.isoformat(timespec='seconds'))
+
+        if removed or removed_undated:
+            print(f"Cleaned up {removed + removed_undated} past concerts from tracking"
+                  + (f" ({removed_undated} undated, tracked over {config.UNDATED_EXPIRY_DAYS} days)"
+                     if removed_undated else ""))
+        return removed + removed_undated
+
+    def _backfill_event_dates(self):
+        """Date undated tracked concerts from concert_alerts.txt, then from Ticketmaster.
+
+        Event detail lookups are capped at BACKFILL_LOOKUPS_PER_RUN so a large
+        legacy backlog is worked through over several runs. IDs whose lookup
+        fails go to the back of the queue, and after BACKFILL_MAX_LOOKUPS
+        failures they're left to expire.
+        """
+        undated = self.state.undated_ids()
+        if not undated:
+            return
+        lookable = set(self.state.undated_ids(max_lookups=config.BACKFILL_MAX_LOOKUPS))
+
+        dates = {}
+        if os.path.exists(self.profile.output_file):
+            alert_dates = parse_concert_alerts(self.profile.output_file)
+            dates = {event_id: alert_dates[event_id] for event_id in undated if event_id in alert_dates}
+
+        lookups = [event_id for event_id in undated
+                   if event_id not in dates and event_id in lookable][:config.BACKFILL_LOOKUPS_PER_RUN]
+        failed = []
+        for event_id in lookups:
+            params = {'apikey': config.TICKETMASTER_API_KEY}
+            data = self._discovery_get(f'events/{event_id}.json', params, f'event {event_id}') or {}
+            event_date = data.get('dates', {}).get('start', {}).get('localDate')
+            if event_date:
+                dates[event_id] = event_date
+            else:
+                failed.append(event_id)
+
+        self.state.record_failed_lookups(failed)
+        filled = self.state.backfill_dates(dates)
+        if filled:
+            print(f"Backfilled dates for {filled} of {len(undated)} undated tracked concerts")
+
+    def print_schedule_report(self, limit=20):
+        """Print how many searches incremental mode skipped and the miss rate its audits measured."""
+        scheduler = ArtistScheduler(self.state, config.SCHEDULE_BASE_DAYS, config.SCHEDULE_MAX_DAYS)
+        entries = scheduler.schedule.values()
+        hot = sum(1 for entry in entries if scheduler.interval_days(entry) == 0)
+        print(f"Schedule: {len(scheduler.schedule)} artists searched so far, {hot} checked every run, "
+              f"{len(scheduler.schedule) - hot} on a decaying schedule")
+
+        runs = [run for run in self.state.recent_runs(limit) if run['finished_at'] and run['artists_skipped'] is not None]
+        if not runs:
+            print("No incremental runs yet (set SCHEDULE_MODE=incremental)")
+            return
+        print(f"\n{'Run':<12}{'Searched':>10}{'Skipped':>9}{'Audited':>9}{'Missed':>8}")
+        for run in reversed(runs):
+            print(f"{run['started_at'][:10]:<12}{run['artists_checked']:>10}{run['artists_skipped']:>9}"
+                  f"{run['audited_artists']:>9}{run['audit_misses']:>8}")
+
+        searched = sum(run['artists_checked'] for run in runs)
+        skipped = sum(run['artists_skipped'] for run in runs)
+        audited = sum(run['audited_artists'] for run in runs)
+        misses = sum(run['audit_misses'] for run in runs)
+        total = searched + skipped
+        print(f"\nSkipped {skipped / total if total else 0:.0%} of artist searches over {len(runs)} run(s)")
+        if audited:
+            print(f"Estimated miss rate: {misses / audited:.1%} of skipped artists had a new show "
+                  f"({misses}/{audited} audited)")
+
+    def print_tracker_report(self, limit=20):
+        """Print how many concerts are tracked now and how that changed over recent runs."""
+        stats = self.state.tracker_stats()
+        print(f"Tracking {stats['tracked']} concerts ({stats['undated']} undated)")
+        if stats['earliest']:
+            print(f"Dated concerts run from {stats['earliest']} to {stats['latest']}")
+
+        runs = [run for run in self.state.recent_runs(limit) if run['finished_at']]
+        if not runs:
+            return
+        print(f"\n{'Run':<12}{'Tracked':>9}{'Undated':>9}{'New':>6}{'Expired':>9}{'Collapsed':>11}")
+        for run in reversed(runs):
+            print(f"{run['started_at'][:10]:<12}{run['tracked_events']:>9}{run['undated_events'] or 0:>9}"
+                  f"{run['new_concerts']:>6}{run['expired_events'] or 0:>9}{run['duplicates_collapsed'] or 0:>11}")
 
     def _load_curated_artists(self):
-        """Load artists from manually curated text file."""
-        artists = []
-        with open(config.MY_ARTISTS_FILE, 'r') as f:
+        """Load artists from manually curated text file into an ArtistRegistry."""
+        registry = ArtistRegistry()
+        with open(self.profile.artists_file, 'r') as f:
             for line in f:
                 line = line.strip()
                 # Skip empty lines and comments
                 if line and not line.startswith('#'):
-                    artists.append({
+                    registry.add({
                         'name': line,
                         'id': None,  # We don't need Spotify ID for Ticketmaster search
                         'source': 'manual'
                     })
-        return artists
+        return registry
 
     def get_favorite_artists(self):
         """Get user's curated artists merged with Spotify followed artists."""
-        artists = []
+        registry = ArtistRegistry()
 
         # Load curated artist list
-        if os.path.exists(config.MY_ARTISTS_FILE):
-            print(f"Loading curated artist list from {config.MY_ARTISTS_FILE}...")
-            curated_artists = self._load_curated_artists()
-            artists.extend(curated_artists)
-            print(f"Loaded {len(curated_artists)} curated artists")
+        if os.path.exists(self.profile.artists_file):
+            print(f"Loading curated artist list from {self.profile.artists_file}...")
+            registry = self._load_curated_artists()
+            print(f"Loaded {len(registry)} curated artists")
 
         # Skip Spotify if flag is set (useful for GitHub Actions)
-        if config.SKIP_SPOTIFY:
-            print("Skipping Spotify authentication (SKIP_SPOTIFY=true)")
-            if not artists:
+        if not self.profile.spotify:
+            if config.SKIP_SPOTIFY:
+                print("Skipping Spotify authentication (SKIP_SPOTIFY=true)")
+            else:
+                print(f"Skipping Spotify (profile '{self.profile.name}' doesn't use it)")
+            if not registry:
                 print("⚠️  Warning: No artists found! Create my_artists.txt with your favorite artists.")
             else:
-                print(f"Monitoring {len(artists)} artists total")
-            return artists
+                print(f"Monitoring {len(registry)} artists total")
+            return registry.to_list()
 
         # Also fetch followed artists from Spotify to catch any new additions
         print("Checking Spotify for followed artists...")
         try:
             self._init_spotify()
 
-            followed = self.spotify.current_user_followed_artists(limit=50)
+            snapshot = FollowSnapshot(self.state, config.FOLLOW_SNAPSHOT_MAX_DAYS)
+            followed = snapshot.fetch(self.spotify)
             spotify_count = 0
-            for item in followed['artists']['items']:
-                # Add if not already in list (case-insensitive comparison)
-                if not any(a['name'].lower() == item['name'].lower() for a in artists):
-                    artists.append({
-                        'name': item['name'],
-                        'id': item['id'],
-                        'source': 'spotify_followed'
-                    })
+            for item in followed:
+                # Add if not already in list (normalized name or Spotify ID)
+                if registry.add({
+                    'name': item['name'],
+                    'id': item['id'],
+                    'source': 'spotify_followed'
+                }):
                     spotify_count += 1
 
-            # Handle pagination for followed artists
-            while followed['artists']['next']:
-                followed = self.spotify.next(followed['artists'])
-                for item in followed['artists']['items']:
-                    if not any(a['name'].lower() == item['name'].lower() for a in artists):
-                        artists.append({
-                            'name': item['name'],
-                            'id': item['id'],
-                            'source': 'spotify_followed'
-                        })
-                        spotify_count += 1
-
+            if snapshot.reused:
+                print(f"Spotify follows unchanged since the last full fetch ({len(followed)} artists, 1 request)")
+            else:
+                print(f"Fetched {len(followed)} followed artists from Spotify ({snapshot.requests} requests)")
             if spotify_count > 0:
                 print(f"Added {spotify_count} new artists from Spotify follows")
             else:
@@ -160,18 +310,45 @@ class ConcertBot:
             print(f"⚠️  Could not connect to Spotify: {e}")
             print("Continuing with curated artist list only...")
 
+        artists = registry.to_list()
         print(f"Monitoring {len(artists)} artists total")
 
         # Cache artists
-        with open(config.ARTISTS_CACHE_FILE, 'w') as f:
-            json.dump(artists, f, indent=2)
+        self.state.save_artists(artists)
 
         return artists
 
     def search_concerts(self, artist_name):
-        """Search for concerts by artist name using Ticketmaster API."""
-        url = f"{config.TICKETMASTER_BASE_URL}/events.json"
+        """Search for concerts by artist name using Ticketmaster API.
+
+        Returns None if the search kept failing (e.g. rate limited) so it can be retried.
+        """
+        try:
+            return list(self.iter_concerts(artist_name))
+        except SearchFailedError:
+            return None
+
+    def iter_concerts(self, artist_name):
+        """Yield every event for an artist, fetching Discovery pages lazily.
+
+        Follows the page numbers until the last page (or the API's deep paging
+        limit). Raises SearchFailedError if a page can't be fetched.
+
+        In a multi-profile run, an artist other profiles also search in this
+        region is fetched in full once and replayed for the others.
+        """
+        region = self.query_region
+        if self.shared and self.shared.is_shared(artist_name, region):
+            events = self.shared.get('ticketmaster', artist_name, region)
+            if events is None:
+                events = list(self._fetch_pages(artist_name))
+                self.shared.put('ticketmaster', artist_name, region, events)
+            yield from events
+            return
+        yield from self._fetch_pages(artist_name)
 
+    def _fetch_pages(self, artist_name):
+        """Yield the artist's events page by page (see iter_concerts)."""
         # Calculate date range
         start_date = datetime.now().strftime('%Y-%m-%dT%H:%M:%SZ')
         end_date = (datetime.now() + timedelta(days=30 * config.SEARCH_WINDOW_MONTHS)).strftime('%Y-%m-%dT%H:%M:%SZ')
@@ -179,267 +356,653 @@ class ConcertBot:
         params = {
             'apikey': config.TICKETMASTER_API_KEY,
             'keyword': artist_name,
-            'latlong': f'{config.LATITUDE},{config.LONGITUDE}',
-            'radius': config.SEARCH_RADIUS,
+            'latlong': f'{self.query_region.latitude},{self.query_region.longitude}',
+            'radius': self.query_region.radius,
             'unit': 'miles',
             'classificationName': 'music',
             'startDateTime': start_date,
             'endDateTime': end_date,
-            'sort': 'date,asc'
+            'sort': 'date,asc',
+            'size': config.SEARCH_PAGE_SIZE
         }
 
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            # Rate limiting: wait 0.5 seconds between requests
-            time.sleep(0.5)
-
-            if '_embedded' in data and 'events' in data['_embedded']:
-                return data['_embedded']['events']
-            return []
-        except requests.exceptions.RequestException as e:
-            print(f"Error searching concerts for {artist_name}: {e}")
-            # If rate limited, wait longer before next request
-            if '429' in str(e):
-                print("  Rate limited - waiting 5 seconds...")
-                time.sleep(5)
-            return []
-
-    def is_concert_notified(self, event_id):
-        """Check if concert has already been notified."""
-        return event_id in self.notified_concerts
-
-    def add_notified_concert(self, event_id, event_date):
-        """Add concert to notified list with its date."""
-        if event_id not in self.notified_concerts:
-            self.notified_concerts[event_id] = event_date
-
-    def is_tribute_show(self, event):
-        """Check if event is a tribute band/cover show."""
-        event_name = event.get('name', '').lower()
+        # Querying by attraction ID returns only the artist's own events
+        attraction_ids = self.resolve_attraction_ids(artist_name) if config.ATTRACTION_ID_MATCHING else None
+        if attraction_ids:
+            del params['keyword']
+            params['attractionId'] = ','.join(attraction_ids)
+
+        page = 0
+        while True:
+            data = self._discovery_get('events.json', dict(params, page=page), artist_name)
+            if data is None:
+                raise SearchFailedError(artist_name)
+
+            events = data.get('_embedded', {}).get('events', [])
+            yield from events
+
+            page += 1
+            if not events or page >= data.get('page', {}).get('totalPages', 1):
+                return
+            if (page + 1) * config.SEARCH_PAGE_SIZE > DISCOVERY_PAGING_LIMIT:
+                return
+
+    def resolve_attraction_ids(self, artist_name):
+        """Return the artist's Ticketmaster attraction IDs, resolving them if missing or stale.
+
+        Only attractions whose normalized name equals the artist's count, so
+        "Drake" never resolves to "Drake Bell". Returns an empty list when
+        nothing matched (callers fall back to keyword search).
+        """
+        if not self.attractions.needs_refresh(artist_name):
+            return self.attractions.get(artist_name)
 
-        # Keywords that indicate tribute/cover shows
-        tribute_keywords = [
-            'tribute', 'tributes', 'cover', 'covers',
-            'experience', 'reimagined', 'celebration',
-            'vs.', 'vs ', 'night with dj', 'starring'
+        params = {
+            'apikey': config.TICKETMASTER_API_KEY,
+            'keyword': artist_name,
+            'classificationName': 'music',
+            'size': 20
+        }
+        data = self._discovery_get('attractions.json', params, artist_name)
+        if data is None:
+            # Keep whatever we had (if anything) and try again next run
+            return self.attractions.get(artist_name) or []
+
+        artist_key = normalize_artist_name(artist_name)
+        ids = [
+            attraction['id'] for attraction in data.get('_embedded', {}).get('attractions', [])
+            if attraction.get('id') and normalize_artist_name(attraction.get('name', '')) == artist_key
         ]
+        self.attractions.set(artist_name, ids)
+        return ids
 
-        for keyword in tribute_keywords:
-            if keyword in event_name:
-                return True
-
-        return False
-
-    def is_artist_match(self, event, search_artist):
-        """Verify the performing artist matches the search query."""
-        search_lower = search_artist.lower()
-
-        # Check if attractions (performers) data exists
-        if '_embedded' not in event or 'attractions' not in event['_embedded']:
-            # No performer data, fall back to name matching
-            event_name = event.get('name', '').lower()
-            return search_lower in event_name
+    def _discovery_get(self, endpoint, params, label):
+        """GET a Discovery API endpoint with caching, rate limiting, back-off and retries.
 
-        # Check actual performers
-        for attraction in event['_embedded']['attractions']:
-            attraction_name = attraction.get('name', '').lower()
-
-            # Exact match or very close match
-            if search_lower == attraction_name:
-                return True
+        Fresh cached responses are returned without a request; stale ones are
+        revalidated with their ETag/Last-Modified when the server sent one.
+        Returns the decoded JSON ({} on a non-retryable error), or None if every
+        attempt was throttled or failed so the caller can retry later.
+        """
+        cache_key = make_cache_key(endpoint, params) if self.cache else None
+        cached = self.cache.get(cache_key) if self.cache else None
+        if cached and (cached['fresh'] or config.OFFLINE):
+            self.cache.count('fresh')
+            return cached['data']
+        if config.OFFLINE:
+            # Replay mode: anything not in the cache simply has no results
+            return {}
+
+        headers = {}
+        if cached and cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached and cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+
+        url = f"{config.TICKETMASTER_BASE_URL}/{endpoint}"
+        attempts = config.TICKETMASTER_MAX_RETRIES + 1
+
+        for attempt in range(attempts):
+            # Rate limiting: wait for a token from the shared bucket
+            self.rate_limiter.acquire()
+            try:
+                response = self.http.get(url, params=params, headers=headers)
+                if response.status_code == 429:
+                    # acquire() makes every worker wait out the pause before the next try
+                    delay = self.rate_limiter.on_throttled(attempt, retry_after_seconds(response.headers))
+                    print(f"  Rate limited on {label} - backing off {delay:.1f}s...")
+                    continue
+                if response.status_code == 304 and cached:
+                    self.rate_limiter.on_success(response.headers)
+                    self.cache.refresh(cache_key, self._cache_ttl(cached['data']))
+                    self.cache.count('revalidated')
+                    return cached['data']
+                response.raise_for_status()
+                if endpoint == 'events.json':
+                    # Only the handful of event fields we read are decoded and cached
+                    data = decode_events_page(response.content, config.STREAMING_DECODE)
+                else:
+                    data = response.json()
+            except (requests.exceptions.RequestException, ValueError) as e:
+                # Malformed JSON (ValueError) is retried like a dropped connection
+                error_response = getattr(e, 'response', None)
+                status = error_response.status_code if error_response is not None else None
+                if status is not None and status < 500:
+                    print(f"Error searching concerts for {label}: {e}")
+                    return {}
+                # Timeouts, dropped connections and 5xx are worth another try
+                delay = self.rate_limiter.backoff_delay(attempt)
+                print(f"Error searching concerts for {label}: {e} - retrying in {delay:.1f}s...")
+                time.sleep(delay)
+                continue
+
+            self.rate_limiter.on_success(response.headers)
+            if self.cache:
+                self.cache.put(cache_key, data, self._cache_ttl(data),
+                               etag=response.headers.get('ETag'),
+                               last_modified=response.headers.get('Last-Modified'))
+                self.cache.count('fetched')
+            return data
+
+        print(f"⚠️  Giving up on {label} for now after {attempts} attempts")
+        return None
+
+    def _cache_ttl(self, data):
+        """Seconds to trust a cached response: searches with events go stale sooner."""
+        if data.get('_embedded'):
+            return config.RESPONSE_CACHE_TTL_HOURS * 3600
+        return config.RESPONSE_CACHE_EMPTY_TTL_HOURS * 3600
+
+    def _search_artists(self, artists):
+        """Yield (position, artist, events) for each artist, in list order.
+
+        Uses the configured SEARCH_STRATEGY: one keyword search per artist, or a
+        single sweep of every music event in the region matched locally. In
+        serial mode `events` is a lazy iterator, so pages are only fetched as
+        the caller works through them.
+
+        Artists whose searches ran out of retries are searched again at the
+        end (after the rate limiter has cooled down) instead of being dropped.
+        """
+        if config.SEARCH_STRATEGY == 'sweep':
+            for position, (artist, events) in enumerate(self._sweep_artists(artists), 1):
+                yield position, artist, events
+            return
 
-            # Handle cases like "The Weeknd" vs "Weeknd"
-            if search_lower.replace('the ', '') == attraction_name.replace('the ', ''):
-                return True
+        deferred = []
+        for position, (artist, events) in enumerate(self._search_pass(artists), 1):
+            yield position, artist, self._track_failures(position, artist, events, deferred)
+
+        if deferred:
+            print(f"\nRetrying {len(deferred)} artist(s) that failed earlier...")
+            for position, artist in deferred:
+                events = self.search_concerts(artist['name'])
+                if events is None:
+                    print(f"⚠️  Could not search {artist['name']} this run - will try again next run")
+                    events = []
+                else:
+                    self.incomplete_artists.discard(artist['name'])
+                yield position, artist, events
+
+    def _track_failures(self, position, artist, events, deferred):
+        """Pass events through, deferring the artist if its search fails part-way."""
+        try:
+            if events is None:
+                raise SearchFailedError(artist['name'])
+            yield from events
+        except SearchFailedError:
+            deferred.append((position, artist))
+            self.incomplete_artists.add(artist['name'])
+
+    def _search_pass(self, artists):
+        """Search every artist once, serially or concurrently, yielding in list order."""
+        if config.SEARCH_MODE == 'concurrent' and config.SEARCH_WORKERS > 1:
+            with ThreadPoolExecutor(max_workers=config.SEARCH_WORKERS) as executor:
+                # map() returns results in submission order, so alerts and
+                # notified_concerts.json come out the same as a serial run
+                results = executor.map(lambda artist: self.search_concerts(artist['name']), artists)
+                yield from zip(artists, results)
+        else:
+            for artist in artists:
+                yield artist, self.iter_concerts(artist['name'])
 
-        return False
+    def _region_params(self, start, end):
+        """Discovery query parameters for every music event in the region between two datetimes."""
+        return {
+            'apikey': config.TICKETMASTER_API_KEY,
+            'latlong': f'{self.query_region.latitude},{self.query_region.longitude}',
+            'radius': self.query_region.radius,
+            'unit': 'miles',
+            'classificationName': 'music',
+            'startDateTime': start.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'endDateTime': end.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'sort': 'date,asc',
+            'size': config.SWEEP_PAGE_SIZE,
+        }
 
-    def format_concert_alert(self, artist_name, event):
-        """Format concert information for notification."""
-        event_name = event.get('name', 'N/A')
-        event_date = event.get('dates', {}).get('start', {}).get('localDate', 'N/A')
-        event_time = event.get('dates', {}).get('start', {}).get('localTime', 'N/A')
-        venue = event.get('_embedded', {}).get('venues', [{}])[0].get('name', 'N/A')
-        city = event.get('_embedded', {}).get('venues', [{}])[0].get('city', {}).get('name', 'N/A')
-        url = event.get('url', 'N/A')
-
-        alert = f"""
-{'='*80}
-🎵 NEW CONCERT ALERT!
-{'='*80}
-Artist: {artist_name}
-Event: {event_name}
-Date: {event_date} at {event_time}
-Venue: {venue}, {city}
-Tickets: {url}
-{'='*80}
-"""
-        return alert
+    def _sweep_region(self, start, end):
+        """Stream every music event in the region between start and end, page by page.
 
-    def send_email(self, new_concerts):
-        """Send email notification via SendGrid."""
-        if not config.SEND_EMAIL_NOTIFICATIONS:
+        Discovery refuses to page past 1,000 results, so windows holding more
+        than that are split into equal date slices and swept one at a time.
+        """
+        label = f"region sweep {start:%Y-%m-%d}..{end:%Y-%m-%d}"
+        params = self._region_params(start, end)
+        first = self._discovery_get('events.json', dict(params, page=0), label)
+        if first is None:
+            print(f"⚠️  Region sweep missed {start:%Y-%m-%d}..{end:%Y-%m-%d} - will try again next run")
             return
-
-        if not config.SENDGRID_API_KEY or not config.SENDER_EMAIL or not config.RECIPIENT_EMAIL:
-            print("⚠️  Email notifications enabled but missing configuration. Skipping email.")
+        self.sweep_calls += 1
+
+        page_info = first.get('page', {})
+        total = page_info.get('totalElements', 0)
+        if total > DISCOVERY_PAGING_LIMIT and end - start > timedelta(days=1):
+            slices = -(-total // DISCOVERY_PAGING_LIMIT)
+            step = (end - start) / slices
+            for i in range(slices):
+                yield from self._sweep_region(start + step * i, min(end, start + step * (i + 1)))
             return
 
-        if not new_concerts:
+        yield from first.get('_embedded', {}).get('events', [])
+        for page in range(1, page_info.get('totalPages', 1)):
+            if (page + 1) * config.SWEEP_PAGE_SIZE > DISCOVERY_PAGING_LIMIT:
+                break
+            data = self._discovery_get('events.json', dict(params, page=page), label)
+            if data is None:
+                print(f"⚠️  Region sweep missed page {page + 1} of {label} - will try again next run")
+                continue
+            self.sweep_calls += 1
+            yield from data.get('_embedded', {}).get('events', [])
+
+    def _sweep_artists(self, artists):
+        """Sweep the whole region once and match events to artists locally.
+
+        Yields (artist, events) in artist-list order with each artist's events
+        in date order, the same shape the per-artist search produces.
+        """
+        # Local artist index keyed by normalized name
+        registry = ArtistRegistry(artists)
+        id_index = self.attractions.artist_for_id() if config.ATTRACTION_ID_MATCHING else {}
+        # Whole-word title patterns for events without performer data, built once per run
+        title_patterns = [(key, title_pattern(key)) for key in {normalize_artist_name(a['name']) for a in registry}]
+        matched = {}
+        seen = set()
+        self.sweep_calls = 0
+        start = datetime.now()
+        end = start + timedelta(days=30 * config.SEARCH_WINDOW_MONTHS)
+
+        print(f"Sweeping all music events within {self.query_region.radius} miles...")
+        region = self.query_region
+        events = self._sweep_region(start, end)
+        if self.shared and self.shared.is_shared(None, region):
+            # Another profile uses this region: sweep it once and match each profile's artists locally
+            events = self.shared.get('sweep', None, region)
+            if events is None:
+                events = list(self._sweep_region(start, end))
+                self.shared.put('sweep', None, region, events)
+        for event in events:
+            # Slice boundaries can overlap, so skip repeats
+            if event.get('id') in seen:
+                continue
+            seen.add(event.get('id'))
+
+            keys = set()
+            attractions = event.get('_embedded', {}).get('attractions')
+            if attractions:
+                for attraction in attractions:
+                    # Known attraction IDs first, then the normalized name
+                    key = id_index.get(attraction.get('id'))
+                    if key is None or key not in registry:
+                        key = normalize_artist_name(attraction.get('name', ''))
+                    if key in registry:
+                        keys.add(key)
+            else:
+                # No performer data, fall back to name matching
+                event_name = normalize_artist_name(event.get('name'))
+                keys.update(key for key, pattern in title_patterns if pattern.search(event_name))
+
+            for key in keys:
+                matched.setdefault(key, []).append(event)
+
+        print(f"Swept {len(seen)} events with {self.sweep_calls} API calls "
+              f"(per-artist search would need at least {len(artists)})")
+        for artist in artists:
+            yield artist, matched.get(normalize_artist_name(artist['name']), [])
+
+    def compare_search_strategies(self, artists):
+        """Report which strategy needs fewer API calls for this artist list and region."""
+        start = datetime.now()
+        end = start + timedelta(days=30 * config.SEARCH_WINDOW_MONTHS)
+        data = self._discovery_get('events.json', dict(self._region_params(start, end), size=1), 'region size')
+        total = (data or {}).get('page', {}).get('totalElements', 0)
+
+        # Each slice holds at most DISCOVERY_PAGING_LIMIT events, fetched SWEEP_PAGE_SIZE at a time
+        slices = max(1, -(-total // DISCOVERY_PAGING_LIMIT))
+        sweep_calls = max(1, -(-total // config.SWEEP_PAGE_SIZE)) + (slices if slices > 1 else 0)
+        # Per-artist search also looks up attraction IDs that are missing or stale
+        lookups = 0
+        if config.ATTRACTION_ID_MATCHING:
+            lookups = sum(1 for artist in artists if self.attractions.needs_refresh(artist['name']))
+        artist_calls = len(artists) + lookups
+
+        print(f"Region: {total} music events within {self.query_region.radius} miles over {config.SEARCH_WINDOW_MONTHS} months")
+        print(f"  Per-artist search: ~{artist_calls} API calls ({len(artists)} artists, 1+ page each, "
+              f"{lookups} attraction ID lookups)")
+        print(f"  Regional sweep:    ~{sweep_calls} API calls ({config.SWEEP_PAGE_SIZE} events per page)")
+        better = 'sweep' if sweep_calls < artist_calls else 'artist'
+        print(f"  Fewer calls: SEARCH_STRATEGY={better}")
+        return {'artist': artist_calls, 'sweep': sweep_calls, 'events': total}
+
+    def _extra_source_events(self, artist_name):
+        """The artist's events from the extra sources, waited for only once Ticketmaster's are done."""
+        if not self.fanout:
+            return
+        region = self.query_region
+        if self.shared and self.shared.is_shared(artist_name, region):
+            events = self.shared.get('sources', artist_name, region)
+            if events is None:
+                events = self.fanout.collect(artist_name)
+                self.shared.put('sources', artist_name, region, events)
+            yield from events
             return
+        yield from self.fanout.collect(artist_name)
 
-        # Build email content
-        subject = f"🎵 {len(new_concerts)} New Concert Alert{'s' if len(new_concerts) > 1 else ''}!"
-
-        # Create HTML content
-        html_content = """
-        <html>
-        <head>
-            <style>
-                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
-                .header { background-color: #1DB954; color: white; padding: 20px; text-align: center; }
-                .concert { border: 1px solid #ddd; margin: 15px 0; padding: 15px; border-radius: 5px; }
-                .artist { font-size: 18px; font-weight: bold; color: #1DB954; }
-                .event { font-size: 16px; margin: 5px 0; }
-                .details { color: #666; margin: 5px 0; }
-                .button { background-color: #1DB954; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px; display: inline-block; margin-top: 10px; }
-                .footer { text-align: center; margin-top: 30px; color: #999; font-size: 12px; }
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>🎵 New Concert Alerts</h1>
-                <p>You have """ + str(len(new_concerts)) + """ new concert""" + ("s" if len(new_concerts) > 1 else "") + """ to check out!</p>
-            </div>
-        """
+    def is_concert_notified(self, event_id):
+        """Check if concert has already been notified."""
+        return self.state.is_notified(event_id)
 
-        for alert in new_concerts:
-            # Parse the alert text to extract concert info
-            lines = alert.strip().split('\n')
-            artist = venue = event = date = url = ""
-
-            for line in lines:
-                if line.startswith('Artist: '):
-                    artist = line.replace('Artist: ', '')
-                elif line.startswith('Event: '):
-                    event = line.replace('Event: ', '')
-                elif line.startswith('Date: '):
-                    date = line.replace('Date: ', '')
-                elif line.startswith('Venue: '):
-                    venue = line.replace('Venue: ', '')
-                elif line.startswith('Tickets: '):
-                    url = line.replace('Tickets: ', '')
-
-            html_content += f"""
-            <div class="concert">
-                <div class="artist">{artist}</div>
-                <div class="event">{event}</div>
-                <div class="details">📅 {date}</div>
-                <div class="details">📍 {venue}</div>
-                <a href="{url}" class="button">Get Tickets</a>
-            </div>
-            """
-
-        html_content += """
-            <div class="footer">
-                <p>You're receiving this because you set up Concert Alert Bot.</p>
-                <p>Happy concert-going! 🎶</p>
-            </div>
-        </body>
-        </html>
-        """
+    def add_notified_concert(self, event_id, event_date):
+        """Add concert to notified list with its date."""
+        self.state.add_notified(event_id, event_date)
 
-        # Create plain text version
-        text_content = f"You have {len(new_concerts)} new concert alert{'s' if len(new_concerts) > 1 else ''}!\n\n"
-        text_content += "\n".join(new_concerts)
+    def is_tribute_show(self, event, artist_name=None):
+        """Check if event is a tribute band/cover show."""
+        return self.classifier.tribute_reason(event, artist_name) is not None
 
-        try:
-            message = Mail(
-                from_email=Email(config.SENDER_EMAIL),
-                to_emails=To(config.RECIPIENT_EMAIL),
-                subject=subject,
-                plain_text_content=Content("text/plain", text_content),
-                html_content=Content("text/html", html_content)
-            )
-
-            sg = SendGridAPIClient(config.SENDGRID_API_KEY)
-            response = sg.send(message)
-
-            if response.status_code == 202:
-                print(f"✅ Email sent successfully to {config.RECIPIENT_EMAIL}")
-            else:
-                print(f"⚠️  Email sent with status code: {response.status_code}")
+    def is_artist_match(self, event, search_artist):
+        """Verify the performing artist matches the search query."""
+        return self.classifier.match_reason(event, search_artist, self._attraction_ids(search_artist)) is not None
 
-        except Exception as e:
-            print(f"❌ Error sending email: {e}")
+    def _attraction_ids(self, artist_name):
+        """Known attraction IDs for matching, or None when ID matching is off or unresolved."""
+        if not config.ATTRACTION_ID_MATCHING:
+            return None
+        return self.attractions.get(artist_name)
+
+    def format_concert_alert(self, concert):
+        """Format concert information for notification."""
+        return concert.alert_text()
 
     def run(self):
         """Main execution function."""
         print("Starting Concert Alert Bot...")
-        print(f"Searching for concerts within {config.SEARCH_RADIUS} miles of Los Angeles (lat/long: {config.LATITUDE},{config.LONGITUDE})")
+        if config.OFFLINE:
+            print("📼 Offline mode: replaying cached Ticketmaster responses (no files, email or state are updated)")
+        print(f"Searching for concerts within {self.profile.label}")
+        if self.local_filter:
+            query = self.query_region
+            print(f"Querying {query.radius} miles of {query.latitude},{query.longitude} and checking venues locally "
+                  f"({len(self.venues)} venues indexed)")
         print()
+        run_id, done, recovered = self._start_run()
 
         # Clean up past concerts from tracking
-        self._cleanup_past_concerts()
+        expired = self._cleanup_past_concerts()
 
         # Get artists
         artists = self.get_favorite_artists()
 
-        new_concerts = []
+        # Precompute normalized artist keys once for the whole run
+        self.classifier = EventClassifier(artist['name'] for artist in artists)
+
+        new_concerts = list(recovered)
+        if recovered:
+            print(f"\n⏯️  Recovered {len(recovered)} alert(s) from an interrupted run")
+        to_search = artists
+        if done:
+            to_search = [artist for artist in artists if artist['name'] not in done]
+            print(f"⏯️  Resuming run #{run_id}: {len(artists) - len(to_search)} artist(s) already checked")
+
+        # Every search updates the schedule; incremental mode also uses it to skip dormant artists
+        scheduler = ArtistScheduler(
+            self.state,
+            base_days=config.SCHEDULE_BASE_DAYS,
+            max_days=config.SCHEDULE_MAX_DAYS,
+            audit_rate=config.SCHEDULE_AUDIT_RATE
+        )
+        incremental = config.SCHEDULE_MODE == 'incremental' and config.SEARCH_STRATEGY != 'sweep'
+        if incremental:
+            planned = scheduler.plan(to_search)
+            print(f"📅 Incremental mode: searching {len(planned)} of {len(to_search)} artists "
+                  f"({len(scheduler.audited)} skipped artist(s) audited)")
+            to_search = planned
+
+        # Extra sources are searched in the background while Ticketmaster runs
+        sources = [] if config.OFFLINE else configured_sources(self.query_region)
+        if sources:
+            self.fanout = SourceFanout(sources, config.SOURCE_WAIT_SECONDS, config.SOURCE_MAX_FAILURES)
+            # Artists another profile already searched in this region are replayed, not queued again
+            self.fanout.submit([artist for artist in to_search if not self.shared
+                                or not self.shared.has('sources', artist['name'], self.query_region)])
+            print(f"\nAlso searching {', '.join(source.name for source in sources)} for each artist")
+
+        # Alerts are queued in the outbox with each checkpoint and delivered in the background
+        channels = [] if config.OFFLINE else configured_channels(self.profile)
+        if channels:
+            self.notifier = NotificationDispatcher(self.profile.state_db, channels, config.NOTIFY_RETRIES,
+                                                   config.NOTIFY_MAX_ATTEMPTS, config.NOTIFY_RETRY_SECONDS)
+            # Alerts recovered from an interrupted run were queued when found; this only adds any that weren't
+            self.state.queue_alerts(self.notifier.channel_names, [concert.to_dict() for concert in recovered])
+            self.notifier.start(config.NOTIFY_KEEP_DAYS)
+            print(f"\nSending alerts through {', '.join(self.notifier.channel_names)}")
+
+        # Fingerprints of every show alerted on, to catch the same show under another event ID
+        dedupe = DedupeIndex(self.state, config.DEDUPE_TIME_BUCKET_HOURS)
+        outside = 0
 
         # Search for concerts
-        print("\nSearching for concerts...")
-        for i, artist in enumerate(artists, 1):
-            print(f"[{i}/{len(artists)}] Checking {artist['name']}...")
-
-            events = self.search_concerts(artist['name'])
-
-            for event in events:
+        if config.SEARCH_STRATEGY == 'sweep':
+            print("\nSearching for concerts (regional sweep)...")
+        elif config.SEARCH_MODE == 'concurrent':
+            print(f"\nSearching for concerts ({config.SEARCH_WORKERS} concurrent workers)...")
+        else:
+            print("\nSearching for concerts...")
+        for position, artist, events in self._search_artists(to_search):
+            print(f"[{position}/{len(to_search)}] Checking {artist['name']}...")
+
+            found = []
+            seen_ids = set()
+            for event in chain(events, self._extra_source_events(artist['name'])):
+                # Widened or polygon searches: drop venues outside this profile's area
+                if not self.in_area(event):
+                    outside += 1
+                    continue
                 event_id = event.get('id')
+                fingerprint = dedupe.fingerprint(artist['name'], event)
 
-                # Skip if already notified
+                # Skip if already notified (indexing its show, so other listings of it are caught)
                 if self.is_concert_notified(event_id):
+                    seen_ids.add(event_id)
+                    dedupe.add(fingerprint, event_id, event.get('dates', {}).get('start', {}).get('localDate'))
                     continue
 
-                # Filter out tribute shows
-                if self.is_tribute_show(event):
+                # The same show under another ID: presale vs general listing, a mirror site or another source
+                original_id = dedupe.original(fingerprint)
+                if original_id is not None:
+                    seen_ids.add(event_id)
+                    dedupe.collapse(artist['name'], event, original_id)
+                    self.add_notified_concert(event_id, event.get('dates', {}).get('start', {}).get('localDate'))
                     continue
 
-                # Verify artist match
-                if not self.is_artist_match(event, artist['name']):
+                # Filter out tribute shows and verify the artist match (attraction IDs are Ticketmaster's)
+                attraction_ids = None if event.get('source') else self._attraction_ids(artist['name'])
+                accepted, _reason = self.classifier.classify(event, artist['name'], attraction_ids)
+                if not accepted:
                     continue
+                seen_ids.add(event_id)
 
                 # This is a valid concert!
-                event_date = event.get('dates', {}).get('start', {}).get('localDate', 'N/A')
-                alert = self.format_concert_alert(artist['name'], event)
-                new_concerts.append(alert)
-                self.add_notified_concert(event_id, event_date)
-                print(f"  ✓ Found new concert: {event.get('name')}")
+                concert = Concert.from_event(artist['name'], event)
+                found.append(concert)
+                self.add_notified_concert(event_id, concert.date)
+                dedupe.add(fingerprint, event_id, concert.date)
+                print(f"  ✓ Found new concert: {concert.name}")
+
+            # Commit this artist's progress so a crash later in the run loses nothing
+            complete = artist['name'] not in self.incomplete_artists
+            if complete:
+                scheduler.record(artist['name'], seen_ids, len(found))
+            self.state.checkpoint_artist(run_id, artist['name'], [concert.to_dict() for concert in found], complete,
+                                         self.notifier.channel_names if self.notifier else ())
+            if found and self.notifier:
+                self.notifier.wake()
+            new_concerts.extend(found)
+
+        if incremental:
+            skipped = len(scheduler.skipped) - len(scheduler.audited)
+            self.state.record_schedule_metrics(run_id, skipped, len(scheduler.audited), len(scheduler.misses))
+            print(f"\n📅 Skipped {skipped} dormant artist(s)")
+            if scheduler.audited:
+                print(f"   Audit: {len(scheduler.misses)} of {len(scheduler.audited)} skipped artist(s) "
+                      f"had a new show ({scheduler.miss_rate():.0%} miss rate)")
+                for name in scheduler.misses:
+                    print(f"   - {name} would have been missed")
+
+        if outside:
+            print(f"\n📍 Skipped {outside} listing(s) at venues outside {self.profile.label}")
+
+        if dedupe.collapsed:
+            print(f"\n🧹 Collapsed {len(dedupe.collapsed)} near-duplicate listing(s) onto shows already alerted:")
+            for artist_name, event_name, event_id, original_id in dedupe.collapsed[:10]:
+                print(f"   - {artist_name}: {event_name} ({event_id}, same show as {original_id})")
+            if len(dedupe.collapsed) > 10:
+                print(f"   ... and {len(dedupe.collapsed) - 10} more")
+
+        if config.OFFLINE:
+            for concert in new_concerts:
+                print(self.format_concert_alert(concert))
+            self._print_run_stats()
+            print(f"\n✅ Done! {len(new_concerts)} concert(s) found in the offline replay.")
+            return
+
+        # Email channels send now, while the files and state are written
+        if self.notifier:
+            self.notifier.flush()
 
         # Write alerts to file
         if new_concerts:
             timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            with open(config.OUTPUT_FILE, 'a') as f:
+            with open(self.profile.output_file, 'a') as f:
                 f.write(f"\n\nRun at: {timestamp}\n")
                 f.write(f"Found {len(new_concerts)} new concert(s)\n")
-                for alert in new_concerts:
-                    f.write(alert)
-
-            print(f"\n✅ Found {len(new_concerts)} new concert(s)! Check {config.OUTPUT_FILE}")
+                for concert in new_concerts:
+                    f.write(self.format_concert_alert(concert))
 
-            # Send email notification
-            self.send_email(new_concerts)
+            print(f"\n✅ Found {len(new_concerts)} new concert(s)! Check {self.profile.output_file}")
         else:
             print("\n📭 No new concerts found.")
 
-        # Save notified concerts
+        # Save notified concerts and any newly resolved attraction IDs
+        self.state.finish_run(run_id, len(to_search), len(new_concerts), self.http.request_count, expired,
+                              len(dedupe.collapsed))
         self._save_notified_concerts()
+        tracker = self.state.tracker_stats()
+        print(f"\nTracking {tracker['tracked']} concerts ({tracker['undated']} undated) - "
+              f"see --tracker-report for the trend")
+        if self.attractions.resolved_count:
+            self.attractions.save()
+            print(f"\nResolved attraction IDs for {self.attractions.resolved_count} artist(s)")
+        self.venues.save()
+
+        if self.notifier:
+            print()
+            finished = self.notifier.close(config.NOTIFY_WAIT_SECONDS)
+            self.notifier.print_report(finished)
+
+        self._print_run_stats()
         print("\n✅ Done!")
 
+    def _print_run_stats(self):
+        """Print rate limit, cache and connection stats, then release the HTTP pool and state database."""
+        if self.rate_limiter.throttle_count:
+            print(f"\nRate limited {self.rate_limiter.throttle_count} time(s); "
+                  f"finished at {self.rate_limiter.rate:.1f} requests/second")
+
+        if self.cache:
+            self.cache.save()
+            cache = self.cache.stats
+            print(f"\nCache: {cache['fresh']} fresh, {cache['revalidated']} revalidated, "
+                  f"{cache['fetched']} fetched, {cache['evicted']} evicted")
+
+        if self.fanout:
+            print()
+            for name, stats in self.fanout.stats.items():
+                print(f"{name}: {stats['searched']} artists searched, {stats['events']} events, "
+                      f"{stats['failed']} failed, {stats['late']} too slow"
+                      f"{' (switched off)' if name in self.fanout.disabled else ''}")
+            self.fanout.close()
+
+        self.state.close()
+        if self.shared:
+            # The HTTP pool is shared with the other profiles; run_profiles() reports and closes it
+            return
+        stats = self.http.connection_stats()
+        print(f"\nHTTP: {stats['requests']} requests over {stats['connections']} connection(s) "
+              f"({stats['reused']} reused)")
+        self.http.close()
+
+
+def run_profiles(profiles, action=ConcertBot.run):
+    """Run the bot (or a report) once per profile, searching each (artist, region) pair only once.
+
+    Every profile keeps its own artist list, region, recipients and state.
+    Their curated artists are registered up front, so searches two or more
+    profiles need are fetched once and replayed, and API calls grow with the
+    unique (artist, region) pairs rather than with the number of profiles.
+    Nearby regions are searched as one circle of up to GEO_MAX_QUERY_RADIUS
+    miles and each profile's area is checked against the venue index.
+    """
+    shared = SharedSearches()
+    bots = [ConcertBot(profile, shared) for profile in profiles]
+    for bot in bots:
+        artists = bot._load_curated_artists() if os.path.exists(bot.profile.artists_file) else []
+        shared.register(bot.profile.region, [artist['name'] for artist in artists])
+    shared.plan(config.GEO_MAX_QUERY_RADIUS)
+
+    pairs = sum(count for (key, _region), count in shared.interest.items() if key is not None)
+    unique = sum(1 for key, _region in shared.interest if key is not None)
+    regions = len({profile.region for profile in profiles})
+    queries = len({region for _key, region in shared.interest})
+    print(f"👥 {len(profiles)} profile(s) in {regions} region(s), searched as {queries} query region(s): "
+          f"{pairs} artist searches, {unique} unique (artist, query region) pairs")
+
+    for bot in bots:
+        print()
+        print("=" * 80)
+        print(f"Profile '{bot.profile.name}': {bot.profile.label}")
+        print("=" * 80)
+        action(bot)
+
+    if shared.fetched:
+        print(f"\n👥 Shared searches: {shared.fetched} fetched once for several profiles, "
+              f"{shared.reused} replayed instead of queried again")
+    http = shared.clients.http
+    stats = http.connection_stats()
+    print(f"HTTP: {stats['requests']} requests over {stats['connections']} connection(s) "
+          f"({stats['reused']} reused) for all profiles")
+    http.close()
+
 
 if __name__ == '__main__':
-    bot = ConcertBot()
-    bot.run()
+    parser = argparse.ArgumentParser(description='Concert Alert Bot')
+    parser.add_argument('--offline', action='store_true',
+                        help='Replay cached Ticketmaster responses without network calls')
+    parser.add_argument('--compare-strategies', action='store_true',
+                        help='Report whether per-artist search or a regional sweep needs fewer API calls')
+    parser.add_argument('--tracker-report', action='store_true',
+                        help='Show how many concerts are tracked and how that changed over recent runs')
+    parser.add_argument('--schedule-report', action='store_true',
+                        help='Show how many searches incremental mode skipped and its measured miss rate')
+    parser.add_argument('--profiles', nargs='?', const=config.PROFILES_FILE, metavar='FILE',
+                        help=f'Run for every profile in FILE (default: {config.PROFILES_FILE}), '
+                             'searching artists shared between profiles once')
+    args = parser.parse_args()
+
+    if args.offline:
+        config.OFFLINE = True
+        config.SKIP_SPOTIFY = True
+
+    def action(bot):
+        if args.tracker_report:
+            bot.print_tracker_report()
+        elif args.schedule_report:
+            bot.print_schedule_report()
+        elif args.compare_strategies:
+            bot.compare_search_strategies(bot.get_favorite_artists())
+        else:
+            bot.run()
+
+    if args.profiles:
+        run_profiles(load_profiles(args.profiles), action)
+    else:
+        action(ConcertBot())
@@ -0,0 +1,259 @@
+"""
+Extra concert sources (Bandsintown, SeatGeek) searched in parallel alongside Ticketmaster
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from urllib.parse import quote
+
+import requests
+
+import config
+from http_session import PooledSession
+from rate_limiter import TokenBucket
+from venue_index import distance_miles
+
+
+def discovery_event(source, event_id, name, url, local_datetime, venue, city, performers, location=None):
+    """Reshape a provider's event into the Discovery nesting the rest of the bot reads.
+
+    IDs are prefixed with the source so they can't collide with Ticketmaster's
+    in the notified list. `location` is the venue's (latitude, longitude).
+    """
+    date, _, time = (local_datetime or '').partition('T')
+    start = {'localDate': date} if date else {}
+    if time:
+        start['localTime'] = time[:8]
+    venue = {'name': venue, 'city': {'name': city}}
+    if location:
+        venue['location'] = {'latitude': str(location[0]), 'longitude': str(location[1])}
+    return {
+        'id': f"{source}:{event_id}",
+        'source': source,
+        'name': name,
+        'url': url,
+        'dates': {'start': start},
+        '_embedded': {
+            'venues': [venue],
+            'attractions': [{'name': performer} for performer in performers],
+        },
+    }
+
+
+class ConcertSource:
+    """One extra concert provider, with its own rate limiter, connection pool and timeouts.
+
+    Subclasses set `name` and implement search(artist_name), returning
+    Discovery-shaped events (see discovery_event) within `region` (latitude,
+    longitude, radius in miles; the configured location by default) and the
+    search window. Errors are raised as requests exceptions or ValueError.
+    """
+
+    name = None
+
+    def __init__(self, base_url, key, rate, timeout=10, workers=2, region=None):
+        self.base_url = base_url.rstrip('/')
+        self.latitude, self.longitude, self.radius = region or (config.LATITUDE, config.LONGITUDE,
+                                                                config.SEARCH_RADIUS)
+        self.key = key
+        self.workers = workers
+        self.bucket = TokenBucket(rate, capacity=workers)
+        self.http = PooledSession(pool_size=workers, connect_timeout=timeout, read_timeout=timeout)
+
+    def get(self, path, params):
+        self.bucket.acquire()
+        response = self.http.get(f"{self.base_url}/{path}", params=params)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    def window(self):
+        start = datetime.now()
+        return start, start + timedelta(days=30 * config.SEARCH_WINDOW_MONTHS)
+
+    def search(self, artist_name):
+        raise NotImplementedError
+
+
+class BandsintownSource(ConcertSource):
+    """Bandsintown artist events, filtered to the search radius by venue coordinates."""
+
+    name = 'bandsintown'
+
+    def search(self, artist_name):
+        start, end = self.window()
+        data = self.get(f"artists/{quote(artist_name, safe='')}/events",
+                        {'app_id': self.key, 'date': f"{start:%Y-%m-%d},{end:%Y-%m-%d}"})
+        # Unknown artists come back as a 404 or an {"errorMessage": ...} object
+        if not isinstance(data, list):
+            return []
+
+        events = []
+        for item in data:
+            if not isinstance(item, dict) or item.get('id') is None:
+                continue
+            venue = item.get('venue') or {}
+            try:
+                latitude, longitude = float(venue['latitude']), float(venue['longitude'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if distance_miles(self.latitude, self.longitude, latitude, longitude) > self.radius:
+                continue
+            events.append(discovery_event(
+                self.name, item['id'],
+                item.get('title') or f"{artist_name} at {venue.get('name')}",
+                item.get('url'), item.get('datetime'),
+                venue.get('name'), venue.get('city'),
+                item.get('lineup') or [artist_name], (latitude, longitude)
+            ))
+        return events
+
+
+class SeatGeekSource(ConcertSource):
+    """SeatGeek concert search, filtered to the search radius server-side."""
+
+    name = 'seatgeek'
+    PAGE_SIZE = 100
+    MAX_PAGES = 5
+
+    def search(self, artist_name):
+        start, end = self.window()
+        params = {
+            'client_id': self.key,
+            'q': artist_name,
+            'taxonomies.name': 'concert',
+            'lat': self.latitude,
+            'lon': self.longitude,
+            'range': f"{self.radius}mi",
+            'datetime_local.gte': start.strftime('%Y-%m-%dT%H:%M:%S'),
+            'datetime_local.lte': end.strftime('%Y-%m-%dT%H:%M:%S'),
+            'per_page': self.PAGE_SIZE,
+        }
+
+        events = []
+        for page in range(1, self.MAX_PAGES + 1):
+            data = self.get('events', dict(params, page=page)) or {}
+            items = data.get('events') or []
+            for item in items:
+                venue = item.get('venue') or {}
+                location = venue.get('location') or {}
+                if item.get('id') is None:
+                    continue
+                local_datetime = item.get('datetime_local')
+                if item.get('time_tbd') and local_datetime:
+                    local_datetime = local_datetime.partition('T')[0]
+                events.append(discovery_event(
+                    self.name, item['id'],
+                    item.get('title') or f"{artist_name} at {venue.get('name')}",
+                    item.get('url'), local_datetime,
+                    venue.get('name'), venue.get('city'),
+                    [performer.get('name', '') for performer in item.get('performers') or []],
+                    (location['lat'], location['lon']) if 'lat' in location and 'lon' in location else None
+                ))
+            total = (data.get('meta') or {}).get('total', 0)
+            if not items or page * self.PAGE_SIZE >= total:
+                break
+        return events
+
+
+SOURCE_TYPES = {source.name: source for source in (BandsintownSource, SeatGeekSource)}
+
+
+def configured_sources(region=None):
+    """Instantiate the EXTRA_SOURCES that have keys configured, warning about the rest."""
+    settings = {
+        'bandsintown': (config.BANDSINTOWN_BASE_URL, config.BANDSINTOWN_APP_ID, config.BANDSINTOWN_RATE_LIMIT),
+        'seatgeek': (config.SEATGEEK_BASE_URL, config.SEATGEEK_CLIENT_ID, config.SEATGEEK_RATE_LIMIT),
+    }
+    sources = []
+    for name in config.EXTRA_SOURCES:
+        if name not in SOURCE_TYPES:
+            print(f"⚠️  Unknown concert source '{name}' (choose from {', '.join(SOURCE_TYPES)})")
+            continue
+        base_url, key, rate = settings[name]
+        if not key:
+            print(f"⚠️  Skipping {name}: no API key configured")
+            continue
+        sources.append(SOURCE_TYPES[name](base_url, key, rate, config.SOURCE_TIMEOUT, config.SOURCE_WORKERS, region))
+    return sources
+
+
+class SourceFanout:
+    """Searches every extra source for every artist in the background, handing results back per artist.
+
+    Each source has its own thread pool and rate limiter, so a slow source
+    only backs up its own queue. collect() waits at most `wait_seconds` for
+    an artist's results; late ones are dropped for this run. A source that
+    fails or is late `max_failures` times in a row is switched off for the
+    rest of the run, so its queued searches return immediately.
+    """
+
+    def __init__(self, sources, wait_seconds=15, max_failures=5):
+        self.sources = sources
+        self.wait_seconds = wait_seconds
+        self.max_failures = max_failures
+        self.executors = {source.name: ThreadPoolExecutor(max_workers=source.workers) for source in sources}
+        self.futures = {}
+        self.stats = {source.name: {'searched': 0, 'events': 0, 'failed': 0, 'late': 0} for source in sources}
+        self.disabled = set()
+        self._failures = {source.name: 0 for source in sources}
+        self._lock = threading.Lock()
+
+    def submit(self, artists):
+        """Queue a search of every source for each artist, in list order."""
+        for source in self.sources:
+            for artist in artists:
+                key = (source.name, artist['name'])
+                if key not in self.futures:
+                    self.futures[key] = self.executors[source.name].submit(self._search, source, artist['name'])
+
+    def _record_failure(self, name, kind):
+        """Count a failure or late result (caller holds the lock)."""
+        self.stats[name][kind] += 1
+        self._failures[name] += 1
+        if self._failures[name] >= self.max_failures and name not in self.disabled:
+            self.disabled.add(name)
+            print(f"⚠️  {name} failed {self._failures[name]} times in a row - not using it for the rest of this run")
+
+    def _search(self, source, artist_name):
+        if source.name in self.disabled:
+            return []
+        try:
+            events = source.search(artist_name)
+        except Exception as e:  # A malformed or failing secondary source must never abort the run
+            reason = e if isinstance(e, (requests.exceptions.RequestException, ValueError)) \
+                else f"{type(e).__name__}: {e}"
+            with self._lock:
+                print(f"  {source.name} search failed for {artist_name}: {reason}")
+                self._record_failure(source.name, 'failed')
+            return []
+        with self._lock:
+            self._failures[source.name] = 0
+            self.stats[source.name]['searched'] += 1
+            self.stats[source.name]['events'] += len(events)
+        return events
+
+    def collect(self, artist_name):
+        """Return the artist's events from every source that answered in time, in source order."""
+        futures = [(source.name, self.futures.get((source.name, artist_name))) for source in self.sources]
+        futures = [(name, future) for name, future in futures if future is not None]
+        wait([future for _, future in futures], timeout=self.wait_seconds)
+
+        events = []
+        for name, future in futures:
+            if future.done():
+                if not future.cancelled() and future.exception() is None:
+                    events.extend(future.result())
+            else:
+                future.cancel()
+                with self._lock:
+                    self._record_failure(name, 'late')
+        return events
+
+    def close(self):
+        for executor in self.executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        for source in self.sources:
+            source.http.close()
@@ -9,22 +9,145 @@ SPOTIFY_CLIENT_ID = os.getenv('SPOTIFY_CLIENT_ID')
 SPOTIFY_CLIENT_SECRET = os.getenv('SPOTIFY_CLIENT_SECRET')
 SPOTIFY_REDIRECT_URI = 'http://127.0.0.1:8888/callback'
 SPOTIFY_REFRESH_TOKEN = os.getenv('SPOTIFY_REFRESH_TOKEN')  # For GitHub Actions
+SPOTIFY_TOKEN_CACHE_FILE = os.getenv('SPOTIFY_TOKEN_CACHE_FILE', '.cache')  # Access token shared by the bot and scripts
+SPOTIFY_API_BASE_URL = os.getenv('SPOTIFY_API_BASE_URL', 'https://api.spotify.com/v1/')
+SPOTIFY_TOKEN_URL = os.getenv('SPOTIFY_TOKEN_URL', 'https://accounts.spotify.com/api/token')
 
 # Ticketmaster Configuration
 TICKETMASTER_API_KEY = os.getenv('TICKETMASTER_API_KEY')
-TICKETMASTER_BASE_URL = 'https://app.ticketmaster.com/discovery/v2'
+TICKETMASTER_BASE_URL = os.getenv('TICKETMASTER_BASE_URL', 'https://app.ticketmaster.com/discovery/v2')
+
+# Extra Concert Sources, searched alongside Ticketmaster (e.g. for small-venue shows)
+# Comma-separated: 'bandsintown', 'seatgeek'; a source is only used when its key is set
+EXTRA_SOURCES = [s.strip().lower() for s in os.getenv('EXTRA_SOURCES', '').split(',') if s.strip()]
+BANDSINTOWN_APP_ID = os.getenv('BANDSINTOWN_APP_ID')
+BANDSINTOWN_BASE_URL = os.getenv('BANDSINTOWN_BASE_URL', 'https://rest.bandsintown.com')
+BANDSINTOWN_RATE_LIMIT = float(os.getenv('BANDSINTOWN_RATE_LIMIT', '2'))  # Requests per second
+SEATGEEK_CLIENT_ID = os.getenv('SEATGEEK_CLIENT_ID')
+SEATGEEK_BASE_URL = os.getenv('SEATGEEK_BASE_URL', 'https://api.seatgeek.com/2')
+SEATGEEK_RATE_LIMIT = float(os.getenv('SEATGEEK_RATE_LIMIT', '2'))  # Requests per second
+SOURCE_WORKERS = int(os.getenv('SOURCE_WORKERS', '2'))  # Threads per extra source
+SOURCE_TIMEOUT = float(os.getenv('SOURCE_TIMEOUT', '10'))  # Connect/read timeout per request, seconds
+# Longest a finished Ticketmaster search waits for an artist's other sources; late results are picked up next run
+SOURCE_WAIT_SECONDS = float(os.getenv('SOURCE_WAIT_SECONDS', '15'))
+# A source that fails or is late this many times in a row is dropped for the rest of the run
+SOURCE_MAX_FAILURES = int(os.getenv('SOURCE_MAX_FAILURES', '5'))
+
+# Ticketmaster Search Concurrency
+# 'serial' checks one artist at a time, 'concurrent' keeps SEARCH_WORKERS requests in flight
+SEARCH_MODE = os.getenv('SEARCH_MODE', 'serial')
+SEARCH_WORKERS = int(os.getenv('SEARCH_WORKERS', '4'))
+# Requests per second shared by all workers (Discovery API quota is 5/second)
+TICKETMASTER_RATE_LIMIT = float(os.getenv('TICKETMASTER_RATE_LIMIT', '4'))
+# Retries per request on 429s, timeouts and 5xx (exponential back-off with jitter)
+TICKETMASTER_MAX_RETRIES = int(os.getenv('TICKETMASTER_MAX_RETRIES', '4'))
+
+# Search Strategy
+# 'artist' runs one keyword search per artist; 'sweep' pages through every music
+# event in the region once and matches artists locally (fewer calls for big lists)
+SEARCH_STRATEGY = os.getenv('SEARCH_STRATEGY', 'artist')
+SWEEP_PAGE_SIZE = int(os.getenv('SWEEP_PAGE_SIZE', '200'))  # Discovery API max is 200
+
+# Pagination for per-artist searches
+SEARCH_PAGE_SIZE = int(os.getenv('SEARCH_PAGE_SIZE', '50'))  # Discovery API max is 200
+
+# Attraction ID Matching
+# Resolve each artist to their Ticketmaster attraction ID(s) once, then search and match by ID
+ATTRACTION_ID_MATCHING = os.getenv('ATTRACTION_ID_MATCHING', 'true').lower() == 'true'
+ATTRACTION_ID_TTL_DAYS = int(os.getenv('ATTRACTION_ID_TTL_DAYS', '30'))  # re-resolve after this long
+
+# Decode only the event fields the bot reads, streaming with ijson when it's installed
+# (pip install ijson); without it, pages are decoded whole and then trimmed
+STREAMING_DECODE = os.getenv('STREAMING_DECODE', 'true').lower() == 'true'
+
+# HTTP Connection Settings (shared keep-alive session for all Discovery API calls)
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))  # seconds
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '20'))  # seconds
 
 # Location Configuration (Los Angeles)
 LATITUDE = float(os.getenv('LATITUDE', '34.0522'))
 LONGITUDE = float(os.getenv('LONGITUDE', '-118.2437'))
 SEARCH_RADIUS = int(os.getenv('SEARCH_RADIUS', '40'))  # in miles
+# Optional area inside the radius, checked locally: 'lat,lon;lat,lon;lat,lon;...'
+SEARCH_POLYGON = [tuple(float(x) for x in point.split(',')) for point in os.getenv('SEARCH_POLYGON', '').split(';')
+                  if point.strip()]
+
+# Venue Geo Index (local area checks, so one wider query can serve several regions or polygons)
+VENUES_FILE = 'venues.json'  # Cached venue names, cities and coordinates
+GEO_CELL_DEGREES = float(os.getenv('GEO_CELL_DEGREES', '0.5'))  # Grid cell size for the venue index
+# With --profiles, nearby regions are searched as one circle of up to this many miles and filtered locally
+GEO_MAX_QUERY_RADIUS = int(os.getenv('GEO_MAX_QUERY_RADIUS', '75'))
+
+# Response Cache (on-disk, so weekly runs only re-query artists whose results are stale)
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+RESPONSE_CACHE_DIR = os.getenv('RESPONSE_CACHE_DIR', '.ticketmaster_cache')
+RESPONSE_CACHE_MAX_MB = int(os.getenv('RESPONSE_CACHE_MAX_MB', '50'))
+# Both TTLs stay under the weekly run interval, so a scheduled run always re-checks every artist
+# (revalidating where possible); longer TTLs save quota but delay alerts by up to a run
+RESPONSE_CACHE_TTL_HOURS = float(os.getenv('RESPONSE_CACHE_TTL_HOURS', '144'))  # artists with shows
+RESPONSE_CACHE_EMPTY_TTL_HOURS = float(os.getenv('RESPONSE_CACHE_EMPTY_TTL_HOURS', '144'))  # artists without
+
+# Crash Recovery
+# Progress is journaled per artist; a run that dies part-way is resumed by the next
+# run started within this many hours (0 = always start over, alerts are still recovered)
+RESUME_WINDOW_HOURS = float(os.getenv('RESUME_WINDOW_HOURS', '12'))
+
+# Incremental Search Schedule
+# 'all' searches every artist each run; 'incremental' searches touring artists every run and
+# dormant ones on a schedule that doubles from SCHEDULE_BASE_DAYS up to SCHEDULE_MAX_DAYS
+SCHEDULE_MODE = os.getenv('SCHEDULE_MODE', 'all')
+SCHEDULE_BASE_DAYS = int(os.getenv('SCHEDULE_BASE_DAYS', '7'))
+SCHEDULE_MAX_DAYS = int(os.getenv('SCHEDULE_MAX_DAYS', '28'))
+# Share of skipped artists searched anyway to measure the miss rate
+SCHEDULE_AUDIT_RATE = float(os.getenv('SCHEDULE_AUDIT_RATE', '0.1'))
+
+# Tracked Concert Expiry
+# Concerts tracked without a date (old list format) are dated from concert_alerts.txt or
+# Ticketmaster's event details (at most this many lookups per run)...
+BACKFILL_LOOKUPS_PER_RUN = int(os.getenv('BACKFILL_LOOKUPS_PER_RUN', '20'))
+# An event whose lookup 404s or has no date this many times isn't looked up again
+BACKFILL_MAX_LOOKUPS = int(os.getenv('BACKFILL_MAX_LOOKUPS', '3'))
+# ...and any still undated are dropped this long after they were first tracked
+UNDATED_EXPIRY_DAYS = int(os.getenv('UNDATED_EXPIRY_DAYS', '400'))
+
+# Near-Duplicate Listings
+# The same artist at the same venue on the same date within one block of this many hours
+# (e.g. presale vs general listing, or another source) is alerted once
+DEDUPE_TIME_BUCKET_HOURS = int(os.getenv('DEDUPE_TIME_BUCKET_HOURS', '3'))
+
+# Spotify Follow Snapshot
+# Followed artists are re-fetched in full only when the first page or total count changes,
+# or when the stored list is this old
+FOLLOW_SNAPSHOT_MAX_DAYS = int(os.getenv('FOLLOW_SNAPSHOT_MAX_DAYS', '28'))
+
+# Multi-Profile Mode (--profiles): several people/cities from one job, each (artist, region) searched once
+PROFILES_FILE = os.getenv('PROFILES_FILE', 'profiles.json')  # JSON list of profiles
+PROFILES_DIR = os.getenv('PROFILES_DIR', 'profiles')  # Each profile's artist list, state and alerts: <dir>/<name>/
+
+# Offline mode replays cached responses without any network calls (set by --offline)
+OFFLINE = False
 
 # Data Files
 MY_ARTISTS_FILE = 'my_artists.txt'  # Manual curated list (takes priority)
-ARTISTS_CACHE_FILE = 'artists_cache.json'
-NOTIFIED_CONCERTS_FILE = 'notified_concerts.json'
+STATE_DB_FILE = os.getenv('STATE_DB_FILE', 'concert_state.db')  # Notified events, artist cache, run history
+NOTIFIED_CONCERTS_FILE = 'notified_concerts.json'  # Sorted dump of notified events (committed to git)
+ATTRACTION_IDS_FILE = 'artist_attractions.json'  # Resolved artist -> attraction IDs
+ATTRACTION_OVERRIDES_FILE = 'my_artist_attractions.txt'  # Manual 'Artist = ID' overrides
 OUTPUT_FILE = 'concert_alerts.txt'
 
+# Spotify Artist ID Lookups (sync_spotify_follows.py)
+SPOTIFY_IDS_FILE = 'spotify_artist_ids.json'  # Cached artist name -> Spotify ID
+SPOTIFY_ID_OVERRIDES_FILE = 'my_spotify_ids.txt'  # Manual 'Artist = SPOTIFY_ID' overrides
+SPOTIFY_ID_REVIEW_FILE = 'spotify_id_review.txt'  # Ambiguous matches to check by hand
+SPOTIFY_WORKERS = int(os.getenv('SPOTIFY_WORKERS', '4'))
+SPOTIFY_RATE_LIMIT = float(os.getenv('SPOTIFY_RATE_LIMIT', '10'))  # Requests per second
+
+# Spotify Listening Data (analyze_listening.py, organize_artists.py)
+TOP_ARTISTS_CACHE_FILE = 'top_artists_cache.json'
+TOP_ARTISTS_CACHE_TTL_HOURS = float(os.getenv('TOP_ARTISTS_CACHE_TTL_HOURS', '24'))
+TOP_ARTISTS_LIMIT = int(os.getenv('TOP_ARTISTS_LIMIT', '100'))  # Ranked artists per time range (50 per request)
+
 # Spotify Scopes
 SPOTIFY_SCOPES = 'user-top-read user-follow-read'
 
@@ -36,6 +159,39 @@ SENDGRID_API_KEY = os.getenv('SENDGRID_API_KEY')
 SENDER_EMAIL = os.getenv('SENDER_EMAIL')  # Must be verified in SendGrid
 RECIPIENT_EMAIL = os.getenv('RECIPIENT_EMAIL')
 SEND_EMAIL_NOTIFICATIONS = os.getenv('SEND_EMAIL_NOTIFICATIONS', 'false').lower() == 'true'
+# Base URL of the SendGrid API (override to point at a local stub)
+SENDGRID_API_URL = os.getenv('SENDGRID_API_URL', 'https://api.sendgrid.com')
+
+# Notification Channels
+# Comma-separated: 'sendgrid', 'smtp', 'webhook' (Discord/Slack); defaults to 'sendgrid'
+# when SEND_EMAIL_NOTIFICATIONS is true. Alerts wait in the state database's outbox until
+# a channel accepts them, so a failed send is retried by the next run
+# (an empty value, e.g. an unset Actions secret, also means the default)
+NOTIFY_CHANNELS = [name.strip().lower() for name in (
+    os.getenv('NOTIFY_CHANNELS') or ('sendgrid' if SEND_EMAIL_NOTIFICATIONS else '')).split(',') if name.strip()]
+# SMTP (e.g. smtp.gmail.com with an app password); the sender defaults to SENDER_EMAIL
+SMTP_HOST = os.getenv('SMTP_HOST')
+SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
+SMTP_USERNAME = os.getenv('SMTP_USERNAME')
+SMTP_PASSWORD = os.getenv('SMTP_PASSWORD')
+SMTP_SENDER = os.getenv('SMTP_SENDER')
+SMTP_STARTTLS = os.getenv('SMTP_STARTTLS', 'true').lower() == 'true'
+# Discord or Slack incoming webhook; style is 'auto', 'discord', 'slack' or 'json'
+WEBHOOK_URL = os.getenv('WEBHOOK_URL')
+WEBHOOK_STYLE = os.getenv('WEBHOOK_STYLE', 'auto').lower()
+# Alerts per webhook message (Discord allows at most 10)
+WEBHOOK_BATCH_SIZE = int(os.getenv('WEBHOOK_BATCH_SIZE', '10'))
+# Seconds before a send is abandoned as failed
+NOTIFY_TIMEOUT = float(os.getenv('NOTIFY_TIMEOUT', '15'))
+# Retries of a failed send within a run (jittered exponential back-off from NOTIFY_RETRY_SECONDS)...
+NOTIFY_RETRIES = int(os.getenv('NOTIFY_RETRIES', '3'))
+NOTIFY_RETRY_SECONDS = float(os.getenv('NOTIFY_RETRY_SECONDS', '2'))
+# ...and attempts across runs before an alert is given up on
+NOTIFY_MAX_ATTEMPTS = int(os.getenv('NOTIFY_MAX_ATTEMPTS', '10'))
+# Longest the end of a run waits for deliveries; the rest stay queued for the next run
+NOTIFY_WAIT_SECONDS = float(os.getenv('NOTIFY_WAIT_SECONDS', '60'))
+# Delivered alerts are kept in the outbox this long
+NOTIFY_KEEP_DAYS = int(os.getenv('NOTIFY_KEEP_DAYS', '30'))
 
 # Skip Spotify (useful for GitHub Actions where OAuth doesn't work)
 SKIP_SPOTIFY = os.getenv('SKIP_SPOTIFY', 'false').lower() == 'true'
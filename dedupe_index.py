@@ -0,0 +1,69 @@
+"""
+Show fingerprints: one alert per real show, however many listings (presale, mirror site, other source) it has
+"""
+
+from artist_registry import normalize_artist_name
+
+
+def event_fingerprint(artist_name, event, bucket_hours=3):
+    """Canonical key for the show an event lists: artist, venue, local date and time bucket.
+
+    The venue is compared by normalized name (IDs differ between sources),
+    falling back to its ID. Start times are grouped into `bucket_hours`
+    blocks so an early and a late show on the same night stay apart while a
+    listing that's a few minutes off still matches; a missing time is its
+    own bucket. Returns None if the event has no date or venue.
+    """
+    start = event.get('dates', {}).get('start', {})
+    venues = event.get('_embedded', {}).get('venues') or [{}]
+    venue = normalize_artist_name(venues[0].get('name') or '')
+    if not venue and venues[0].get('id'):
+        venue = f"id:{venues[0]['id']}"
+    if not venue or not start.get('localDate'):
+        return None
+
+    bucket = '?'
+    local_time = start.get('localTime') or ''
+    if local_time[:2].isdigit():
+        first_hour = int(local_time[:2]) // bucket_hours * bucket_hours
+        bucket = f"{first_hour:02d}-{first_hour + bucket_hours:02d}"
+    return '|'.join((normalize_artist_name(artist_name), venue, start['localDate'], bucket))
+
+
+class DedupeIndex:
+    """In-memory view of the persisted fingerprint table, so every lookup is a dict hit.
+
+    New fingerprints are written through to the state store without a
+    commit; they're committed with the artist's checkpoint, like its
+    notified events. Listings collapsed onto an earlier one are kept for the
+    end-of-run report.
+    """
+
+    def __init__(self, state, bucket_hours=3):
+        self.state = state
+        self.bucket_hours = bucket_hours
+        self._index = state.load_fingerprints()
+        self.collapsed = []
+
+    def __len__(self):
+        return len(self._index)
+
+    def fingerprint(self, artist_name, event):
+        return event_fingerprint(artist_name, event, self.bucket_hours)
+
+    def original(self, fingerprint):
+        """The event ID already alerted for this fingerprint, or None."""
+        if fingerprint is None:
+            return None
+        return self._index.get(fingerprint)
+
+    def add(self, fingerprint, event_id, event_date):
+        """Remember the event behind a fingerprint (the first one recorded is kept)."""
+        if fingerprint is None or fingerprint in self._index:
+            return
+        self._index[fingerprint] = event_id
+        self.state.add_fingerprint(fingerprint, event_id, event_date)
+
+    def collapse(self, artist_name, event, original_id):
+        """Note a listing that was skipped as a near-duplicate of original_id."""
+        self.collapsed.append((artist_name, event.get('name'), event.get('id'), original_id))
@@ -0,0 +1,89 @@
+"""
+Selective decoding of Discovery API event pages: keep only the event fields the bot reads
+"""
+
+import json
+
+try:
+    import ijson
+except ImportError:  # optional: pip install ijson
+    ijson = None
+
+EVENT_PREFIX = '_embedded.events.item'
+
+
+def streaming_available():
+    return ijson is not None
+
+
+def project_event(event):
+    """Copy just id, name, url, start date/time, venue IDs/names/cities/locations and attractions out of an event.
+
+    The result keeps the Discovery nesting, so code reading the full payload
+    reads the projection the same way.
+    """
+    projected = {key: event[key] for key in ('id', 'name', 'url') if key in event}
+    start = event.get('dates', {}).get('start', {})
+    projected['dates'] = {'start': {key: start[key] for key in ('localDate', 'localTime') if key in start}}
+
+    embedded = event.get('_embedded', {})
+    projected['_embedded'] = {}
+    if 'venues' in embedded:
+        venues = []
+        for venue in embedded['venues']:
+            slim = {key: venue[key] for key in ('id', 'name') if key in venue}
+            if 'name' in venue.get('city', {}):
+                slim['city'] = {'name': venue['city']['name']}
+            if 'location' in venue:
+                slim['location'] = {key: venue['location'][key] for key in ('latitude', 'longitude')
+                                    if key in venue['location']}
+            venues.append(slim)
+        projected['_embedded']['venues'] = venues
+    if 'attractions' in embedded:
+        projected['_embedded']['attractions'] = [
+            {key: attraction[key] for key in ('id', 'name') if key in attraction}
+            for attraction in embedded['attractions']
+        ]
+    return projected
+
+
+def project_page(data):
+    """Project every event in a decoded events.json page; paging info is kept as is."""
+    page = {key: value for key, value in data.items() if key == 'page'}
+    events = data.get('_embedded', {}).get('events')
+    if events:
+        page['_embedded'] = {'events': [project_event(event) for event in events]}
+    return page
+
+
+def _stream_page(raw):
+    """Project events one at a time as the parser reaches them, never building the full page.
+
+    Only one full event dict exists at a time, so peak memory stays near the
+    size of the projected page rather than several times the raw body.
+    """
+    events = [project_event(event) for event in ijson.items(raw, EVENT_PREFIX, use_float=True)]
+    page = {}
+    # Discovery sends paging info last, so this is a second (C-level) scan
+    paging = next(ijson.items(raw, 'page', use_float=True), None)
+    if paging is not None:
+        page['page'] = paging
+    if events:
+        page['_embedded'] = {'events': events}
+    return page
+
+
+def decode_events_page(raw, streaming=True):
+    """Decode an events.json response body (bytes) into a projected page.
+
+    Uses the incremental ijson parser when it's installed and `streaming` is
+    on; otherwise decodes the whole body with json and projects it. Raises
+    ValueError on malformed JSON either way.
+    """
+    if streaming and ijson is not None:
+        try:
+            return _stream_page(raw)
+        except ijson.JSONError as e:
+            # Same exception type as the json fallback raises
+            raise ValueError(f"Invalid JSON in events page: {e}") from e
+    return project_page(json.loads(raw))
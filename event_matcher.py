@@ -0,0 +1,119 @@
+"""
+Compiled event classification: tribute/cover filtering and artist matching, built once per run
+"""
+
+import re
+
+from artist_registry import normalize_artist_name
+
+# Keywords that indicate tribute/cover shows
+TRIBUTE_KEYWORDS = [
+    'tribute', 'tributes', 'cover', 'covers',
+    'experience', 'reimagined', 'celebration',
+    'vs.', 'vs', 'night with dj', 'starring'
+]
+
+
+def title_pattern(key):
+    """Regex for a normalized artist key as whole words in a normalized event title.
+
+    Plain substring checks let "air" match "county fair" or "hairspray".
+    """
+    return re.compile(rf'(?<!\w){re.escape(key)}(?!\w)')
+
+
+def compile_keywords(keywords):
+    """One alternation regex for all keywords, matching whole words only.
+
+    Longest keywords come first so 'tributes' wins over 'tribute', and the
+    boundaries stop 'cover' from firing inside 'discover' or 'Coverdale'.
+    An optional trailing 's' keeps plurals like 'celebrations' and
+    'experiences'. Keywords must be lowercase and start with a word
+    character; match against lowercased text.
+    """
+    alternatives = '|'.join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+    return re.compile(rf'\b(?:{alternatives})s?(?!\w)')
+
+
+class EventClassifier:
+    """Decides whether an event is a real show by one of our artists, and why.
+
+    Artist keys are normalized once up front; classify() returns an
+    (accepted, reason) tuple so callers can log why an event was kept or skipped.
+    """
+
+    def __init__(self, artist_names=(), tribute_keywords=TRIBUTE_KEYWORDS):
+        self._tribute_re = compile_keywords(tribute_keywords)
+        self._keys = {name: normalize_artist_name(name) for name in artist_names}
+        self._name_patterns = {}
+        self._title_patterns = {}
+
+    def _key(self, artist_name):
+        key = self._keys.get(artist_name)
+        if key is None:
+            key = self._keys[artist_name] = normalize_artist_name(artist_name)
+        return key
+
+    def _name_pattern(self, artist_name):
+        """Regex for an artist's own name inside an event title (compiled once per artist)."""
+        pattern = self._name_patterns.get(artist_name)
+        if pattern is None:
+            pattern = self._name_patterns[artist_name] = re.compile(re.escape(artist_name.lower()))
+        return pattern
+
+    def _title_pattern(self, artist_name):
+        """Word-bounded regex for the artist's key in a normalized title (compiled once per artist)."""
+        pattern = self._title_patterns.get(artist_name)
+        if pattern is None:
+            pattern = self._title_patterns[artist_name] = title_pattern(self._key(artist_name))
+        return pattern
+
+    def tribute_reason(self, event, artist_name=None):
+        """Return the tribute keyword found in the event name, or None.
+
+        The artist's own name is removed first, so "The Jimi Hendrix Experience"
+        isn't flagged as a tribute to itself.
+        """
+        event_name = (event.get('name') or '').lower()
+        match = self._tribute_re.search(event_name)
+        if match and artist_name:
+            # Only pay for the name strip when a keyword actually appeared
+            match = self._tribute_re.search(self._name_pattern(artist_name).sub(' ', event_name))
+        return match.group(0) if match else None
+
+    def match_reason(self, event, artist_name, attraction_ids=None):
+        """Return why the event belongs to the artist, or None if it doesn't.
+
+        With the artist's Ticketmaster attraction IDs the match is exact by ID;
+        otherwise performer names are compared by normalized key.
+        """
+        search_key = self._key(artist_name)
+
+        attractions = event.get('_embedded', {}).get('attractions')
+        if attraction_ids and attractions:
+            for attraction in attractions:
+                if attraction.get('id') in attraction_ids:
+                    return f"attraction ID {attraction['id']} ('{attraction.get('name')}')"
+            return None
+
+        if not attractions:
+            # No performer data, fall back to name matching
+            if self._title_pattern(artist_name).search(normalize_artist_name(event.get('name'))):
+                return 'artist name in event title (no performer data)'
+            return None
+
+        for attraction in attractions:
+            if normalize_artist_name(attraction.get('name', '')) == search_key:
+                return f"performer '{attraction.get('name')}'"
+        return None
+
+    def classify(self, event, artist_name, attraction_ids=None):
+        """Return (accepted, reason) for an event found while searching for artist_name."""
+        keyword = self.tribute_reason(event, artist_name)
+        if keyword:
+            return False, f"tribute/cover show (keyword '{keyword}')"
+
+        reason = self.match_reason(event, artist_name, attraction_ids)
+        if reason is None:
+            return False, 'no performer matches the artist'
+        return True, reason
@@ -0,0 +1,64 @@
+"""
+Spotify follow list sync against a stored snapshot: one request when nothing changed, a full fetch when it did
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+
+# The followed-artists endpoint returns at most 50 per page
+PAGE_SIZE = 50
+
+
+def page_fingerprint(page):
+    """Fingerprint a first page of /me/following: the total count plus the artist IDs on it."""
+    ids = ','.join(item['id'] for item in page['items'])
+    return hashlib.sha1(f"{page['total']}|{ids}".encode('utf-8')).hexdigest()
+
+
+class FollowSnapshot:
+    """Fetches the user's followed artists, reusing the last full list when it can.
+
+    The first page (and its total count) is always requested. If its
+    fingerprint matches the one stored with the snapshot, the stored list is
+    returned without paging through the rest. Otherwise the remaining pages
+    are followed with the `after` cursor and the snapshot is replaced.
+
+    Changes that keep the count and first page the same (an unfollow and a
+    follow deep in the list) go unnoticed until the snapshot is `max_age_days`
+    old, when a full fetch happens regardless.
+    """
+
+    def __init__(self, state, max_age_days=28):
+        self.state = state
+        self.max_age_days = max_age_days
+        self.requests = 0
+        self.reused = False
+
+    def _is_fresh(self, taken_at):
+        if not taken_at:
+            return False
+        return datetime.now() - datetime.fromisoformat(taken_at) < timedelta(days=self.max_age_days)
+
+    def fetch(self, spotify):
+        """Return the followed artists as [{'name', 'id'}, ...]."""
+        results = spotify.current_user_followed_artists(limit=PAGE_SIZE)
+        self.requests = 1
+        fingerprint = page_fingerprint(results['artists'])
+
+        snapshot = self.state.load_follow_snapshot()
+        if snapshot:
+            stored_fingerprint, taken_at, artists = snapshot
+            if stored_fingerprint == fingerprint and self._is_fresh(taken_at):
+                self.reused = True
+                return artists
+
+        artists = []
+        while True:
+            artists.extend({'name': item['name'], 'id': item['id']} for item in results['artists']['items'])
+            if not results['artists']['next']:
+                break
+            results = spotify.next(results['artists'])
+            self.requests += 1
+
+        self.state.save_follow_snapshot(fingerprint, artists)
+        return artists
@@ -6,39 +6,22 @@ Format concert alerts into a more readable format
 import json
 from datetime import datetime
 
+from concert import parse_alerts_file
+
 # Read notified concerts to get event details
 with open('notified_concerts.json', 'r') as f:
     event_ids = json.load(f)
 
 # Parse the concert_alerts.txt file
-concerts = []
-current_concert = {}
-
-with open('concert_alerts.txt', 'r') as f:
-    for line in f:
-        line = line.strip()
-        if line.startswith('Artist: '):
-            current_concert['artist'] = line.replace('Artist: ', '')
-        elif line.startswith('Event: '):
-            current_concert['event'] = line.replace('Event: ', '')
-        elif line.startswith('Date: '):
-            date_str = line.replace('Date: ', '').split(' at ')
-            current_concert['date'] = date_str[0]
-            current_concert['time'] = date_str[1] if len(date_str) > 1 else ''
-        elif line.startswith('Venue: '):
-            current_concert['venue'] = line.replace('Venue: ', '')
-        elif line.startswith('Tickets: '):
-            current_concert['url'] = line.replace('Tickets: ', '')
-            concerts.append(current_concert.copy())
-            current_concert = {}
+concerts = parse_alerts_file('concert_alerts.txt')
 
 # Sort by date
-concerts.sort(key=lambda x: x.get('date', ''))
+concerts.sort(key=lambda x: x.date or '')
 
 # Count concerts per artist
 artist_counts = {}
 for concert in concerts:
-    artist = concert['artist']
+    artist = concert.artist
     artist_counts[artist] = artist_counts.get(artist, 0) + 1
 
 # Sort artists alphabetically
@@ -63,12 +46,12 @@ with open('concert_alerts_formatted.txt', 'w') as f:
     for concert in concerts:
         # Parse date
         try:
-            date_obj = datetime.strptime(concert['date'], '%Y-%m-%d')
+            date_obj = datetime.strptime(concert.date, '%Y-%m-%d')
             month_year = date_obj.strftime('%B %Y')
             formatted_date = date_obj.strftime('%a, %b %d, %Y')
         except:
             month_year = "TBD"
-            formatted_date = concert['date']
+            formatted_date = concert.date
 
         # Print month header
         if month_year != current_month:
@@ -80,15 +63,15 @@ with open('concert_alerts_formatted.txt', 'w') as f:
             current_month = month_year
 
         # Print concert in compact format
-        f.write(f"{formatted_date} @ {concert.get('time', 'TBD')}\n")
-        f.write(f"  {concert['artist']}\n")
+        f.write(f"{formatted_date} @ {concert.time or 'TBD'}\n")
+        f.write(f"  {concert.artist}\n")
 
         # Only show event name if different from artist name
-        if concert['event'] != concert['artist']:
-            f.write(f"  {concert['event']}\n")
+        if concert.name != concert.artist:
+            f.write(f"  {concert.name}\n")
 
-        f.write(f"  {concert['venue']}\n")
-        f.write(f"  {concert['url']}\n")
+        f.write(f"  {concert.where}\n")
+        f.write(f"  {concert.url}\n")
         f.write("\n")
 
     f.write("=" * 100 + "\n")
@@ -0,0 +1,53 @@
+"""
+Long-lived HTTP session with connection pooling and keep-alive for API calls
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class PooledSession:
+    """requests.Session wrapper that reuses TCP/TLS connections and always sets a timeout."""
+
+    def __init__(self, pool_size=10, connect_timeout=5, read_timeout=20):
+        self.timeout = (connect_timeout, read_timeout)
+        self.request_count = 0
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        # pool_block keeps concurrent workers waiting for a free connection
+        # instead of opening (and then discarding) extra ones
+        self._adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount('https://', self._adapter)
+        self.session.mount('http://', self._adapter)
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        })
+
+    def get(self, url, **kwargs):
+        """GET through the pool; a (connect, read) timeout is applied unless one is given."""
+        kwargs.setdefault('timeout', self.timeout)
+        with self._lock:
+            self.request_count += 1
+        return self.session.get(url, **kwargs)
+
+    def connection_stats(self):
+        """Return how many requests were served and how many new connections that took."""
+        pools = self._adapter.poolmanager.pools
+        connections = 0
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+        return {
+            'requests': self.request_count,
+            'connections': connections,
+            'reused': max(0, self.request_count - connections),
+        }
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,438 @@
+"""
+Alert delivery: notification channels (SendGrid, SMTP, Discord/Slack webhooks) fed from the state database's outbox
+"""
+
+import html
+import random
+import smtplib
+import sqlite3
+import threading
+import time
+from email.message import EmailMessage
+
+import requests
+from python_http_client.exceptions import HTTPError
+from sendgrid import SendGridAPIClient
+from sendgrid.helpers.mail import Mail, Email, To, Content
+
+import config
+from concert import Concert
+from rate_limiter import retry_after_seconds
+from state_store import StateStore
+
+EMAIL_STYLE = """
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .header { background-color: #1DB954; color: white; padding: 20px; text-align: center; }
+        .concert { border: 1px solid #ddd; margin: 15px 0; padding: 15px; border-radius: 5px; }
+        .artist { font-size: 18px; font-weight: bold; color: #1DB954; }
+        .event { font-size: 16px; margin: 5px 0; }
+        .details { color: #666; margin: 5px 0; }
+        .button { background-color: #1DB954; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px; display: inline-block; margin-top: 10px; }
+        .footer { text-align: center; margin-top: 30px; color: #999; font-size: 12px; }
+"""
+
+# Discord rejects messages with more than this many embeds
+DISCORD_MAX_EMBEDS = 10
+
+
+class NotificationError(Exception):
+    """A channel refused a batch; `retry_after` is how long the server asked us to wait, if it said."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def alert_subject(concerts):
+    return f"🎵 {len(concerts)} New Concert Alert{'s' if len(concerts) > 1 else ''}!"
+
+
+def render_text(concerts):
+    """Plain-text body: a count, then each concert's alert block."""
+    header = f"You have {len(concerts)} new concert alert{'s' if len(concerts) > 1 else ''}!\n\n"
+    return header + "\n".join(concert.alert_text() for concert in concerts)
+
+
+def render_html(concerts):
+    """HTML email body, assembled from parts and joined once."""
+    parts = [
+        f"<html>\n<head>\n    <style>{EMAIL_STYLE}    </style>\n</head>\n<body>\n",
+        '    <div class="header">\n'
+        '        <h1>🎵 New Concert Alerts</h1>\n'
+        f"        <p>You have {len(concerts)} new concert{'s' if len(concerts) > 1 else ''} to check out!</p>\n"
+        '    </div>\n',
+    ]
+    for concert in concerts:
+        parts.append(
+            '    <div class="concert">\n'
+            f'        <div class="artist">{html.escape(concert.artist)}</div>\n'
+            f'        <div class="event">{html.escape(concert.name or "N/A")}</div>\n'
+            f'        <div class="details">📅 {html.escape(concert.when)}</div>\n'
+            f'        <div class="details">📍 {html.escape(concert.where)}</div>\n'
+            f'        <a href="{html.escape(concert.url or "N/A")}" class="button">Get Tickets</a>\n'
+            '    </div>\n'
+        )
+    parts.append(
+        '    <div class="footer">\n'
+        "        <p>You're receiving this because you set up Concert Alert Bot.</p>\n"
+        '        <p>Happy concert-going! 🎶</p>\n'
+        '    </div>\n'
+        '</body>\n</html>\n'
+    )
+    return ''.join(parts)
+
+
+class NotificationChannel:
+    """One way of delivering alerts.
+
+    Subclasses set `name` and implement send(concerts), delivering the batch
+    as one message and raising on failure (NotificationError, or their
+    library's own errors). `batch_size` caps the alerts per message (None
+    sends everything pending at once). Channels that `stream` deliver while
+    the search is still running; the rest wait for the end of the run, so
+    each run sends one email. `target` describes where alerts go.
+    """
+
+    name = None
+    batch_size = None
+    streams = False
+    target = ''
+
+    def send(self, concerts):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SendGridChannel(NotificationChannel):
+    """HTML + plain-text email through the SendGrid API, one client reused for every send."""
+
+    name = 'sendgrid'
+
+    def __init__(self, api_key, sender, recipients, base_url='https://api.sendgrid.com', timeout=15):
+        self.sender = sender
+        self.recipients = recipients
+        self.target = ', '.join(recipients)
+        self.client = SendGridAPIClient(api_key, host=base_url)
+        self.client.client.timeout = timeout
+
+    def send(self, concerts):
+        message = Mail(
+            from_email=Email(self.sender),
+            to_emails=[To(recipient) for recipient in self.recipients],
+            subject=alert_subject(concerts),
+            plain_text_content=Content("text/plain", render_text(concerts)),
+            html_content=Content("text/html", render_html(concerts)),
+            # One personalization per recipient, so nobody sees the rest of the list
+            is_multiple=True
+        )
+        try:
+            response = self.client.send(message)
+        except HTTPError as e:
+            raise NotificationError(f"SendGrid answered {e.status_code}", retry_after_seconds(e.headers)) from e
+        if response.status_code != 202:
+            raise NotificationError(f"SendGrid answered {response.status_code}")
+
+
+class SmtpChannel(NotificationChannel):
+    """HTML + plain-text email through any SMTP server (e.g. Gmail with an app password)."""
+
+    name = 'smtp'
+
+    def __init__(self, host, port, sender, recipients, username=None, password=None, starttls=True, timeout=15):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = recipients
+        self.target = ', '.join(recipients)
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def send(self, concerts):
+        message = EmailMessage()
+        message['Subject'] = alert_subject(concerts)
+        message['From'] = self.sender
+        # Recipients go on the envelope only, so nobody sees the rest of the list
+        message['To'] = self.sender
+        message.set_content(render_text(concerts))
+        message.add_alternative(render_html(concerts), subtype='html')
+
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            smtp.send_message(message, to_addrs=self.recipients)
+
+
+class WebhookChannel(NotificationChannel):
+    """Chat messages through a Discord or Slack incoming webhook, sent as alerts are found.
+
+    `style` is 'discord' (one embed per concert), 'slack' (mrkdwn text) or
+    'json' (the raw alert records, for your own endpoint); 'auto' picks
+    Slack for hooks.slack.com URLs and Discord otherwise.
+    """
+
+    name = 'webhook'
+    streams = True
+
+    def __init__(self, url, style='auto', batch_size=10, timeout=15):
+        self.url = url
+        self.style = style if style != 'auto' else ('slack' if 'hooks.slack.com' in url else 'discord')
+        self.target = f"{self.style} webhook"
+        self.batch_size = min(batch_size, DISCORD_MAX_EMBEDS) if self.style == 'discord' else batch_size
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def payload(self, concerts):
+        header = f"🎵 {len(concerts)} new concert{'s' if len(concerts) > 1 else ''}"
+        if self.style == 'slack':
+            lines = [f"*{header}*"]
+            for concert in concerts:
+                title = f"{concert.artist}: {concert.name or 'N/A'}"
+                lines.append(f"• <{concert.url}|{title}>" if concert.url else f"• {title}")
+                lines.append(f"    📅 {concert.when}  📍 {concert.where}")
+            return {'text': '\n'.join(lines)}
+        if self.style == 'discord':
+            return {'content': header, 'embeds': [{
+                'title': f"{concert.artist}: {concert.name or 'N/A'}"[:256],
+                'url': concert.url,
+                'description': f"📅 {concert.when}\n📍 {concert.where}",
+                'color': 0x1DB954,
+            } for concert in concerts]}
+        return {'alerts': [concert.to_dict() for concert in concerts]}
+
+    def send(self, concerts):
+        response = self.session.post(self.url, json=self.payload(concerts), timeout=self.timeout)
+        if response.status_code >= 400:
+            raise NotificationError(f"webhook answered {response.status_code}",
+                                    retry_after_seconds(response.headers))
+
+    def close(self):
+        self.session.close()
+
+
+def configured_channels(profile):
+    """Instantiate the NOTIFY_CHANNELS that are fully configured for a profile, warning about the rest."""
+    channels = []
+    for name in config.NOTIFY_CHANNELS:
+        if name == 'sendgrid':
+            if not config.SENDGRID_API_KEY or not config.SENDER_EMAIL or not profile.recipients:
+                print("⚠️  Skipping sendgrid: needs SENDGRID_API_KEY, SENDER_EMAIL and a recipient")
+                continue
+            channels.append(SendGridChannel(config.SENDGRID_API_KEY, config.SENDER_EMAIL, profile.recipients,
+                                            config.SENDGRID_API_URL, config.NOTIFY_TIMEOUT))
+        elif name == 'smtp':
+            if not config.SMTP_HOST or not (config.SMTP_SENDER or config.SENDER_EMAIL) or not profile.recipients:
+                print("⚠️  Skipping smtp: needs SMTP_HOST, a sender address and a recipient")
+                continue
+            channels.append(SmtpChannel(config.SMTP_HOST, config.SMTP_PORT, config.SMTP_SENDER or config.SENDER_EMAIL,
+                                        profile.recipients, config.SMTP_USERNAME, config.SMTP_PASSWORD,
+                                        config.SMTP_STARTTLS, config.NOTIFY_TIMEOUT))
+        elif name == 'webhook':
+            url = profile.webhook_url or config.WEBHOOK_URL
+            if not url:
+                print("⚠️  Skipping webhook: no WEBHOOK_URL configured")
+                continue
+            channels.append(WebhookChannel(url, config.WEBHOOK_STYLE, config.WEBHOOK_BATCH_SIZE,
+                                           config.NOTIFY_TIMEOUT))
+        else:
+            print(f"⚠️  Unknown notification channel '{name}' (choose from sendgrid, smtp, webhook)")
+    return channels
+
+
+class NotificationDispatcher:
+    """Delivers alerts from the outbox in the background, one worker thread per channel.
+
+    Alerts are queued in the state database in the same commit as the
+    artist checkpoint that found them (see StateStore.checkpoint_artist) and
+    marked sent only once a channel accepts them, so delivery is
+    at-least-once: an alert whose send failed, timed out or was cut off by a
+    crash is retried by the next run, until it has failed `max_attempts`
+    times. (A crash between a send and its bookkeeping repeats it.)
+
+    Streaming channels send whenever they're woken; the others send
+    everything pending once flush() is called. A failed batch is retried
+    `retries` times with jittered exponential back-off (or the server's
+    Retry-After, if longer) before the channel gives up until the next run.
+    The workers use their own connection to the database, so their commits
+    never include the search loop's uncommitted writes. That connection
+    waits up to `busy_timeout` seconds for the search loop's transaction,
+    and bookkeeping that still can't be written is retried rather than
+    killing the worker: a batch that was sent is never sent again this
+    run, and is marked sent as soon as the database allows.
+    """
+
+    def __init__(self, state_path, channels, retries=3, max_attempts=10, retry_seconds=2.0, max_delay=60.0,
+                 busy_timeout=60.0):
+        self.state_path = state_path
+        self.channels = channels
+        self.retries = retries
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.max_delay = max_delay
+        self.busy_timeout = busy_timeout
+        self.state = None
+        self.stats = {channel.name: {'sent': 0, 'messages': 0, 'retried': 0, 'given_up': 0, 'error': None}
+                      for channel in channels}
+        self.undelivered = {}
+        # Outbox IDs sent this run whose 'sent' mark couldn't be written yet
+        self._unrecorded = {channel.name: set() for channel in channels}
+        self._wake = threading.Condition()
+        # Channels with (possibly) new alerts to look at; every channel starts with last run's leftovers
+        self._woken = {channel.name for channel in channels}
+        self._flushing = False
+        self._deadline = None
+        self._threads = []
+
+    @property
+    def channel_names(self):
+        return [channel.name for channel in self.channels]
+
+    def start(self, keep_days=30):
+        """Open the outbox, drop old delivered alerts and start a worker per channel."""
+        self.state = StateStore(self.state_path, busy_timeout=self.busy_timeout)
+        self.state.prune_outbox(keep_days)
+        for channel in self.channels:
+            thread = threading.Thread(target=self._work, args=(channel,), name=f"notify-{channel.name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def wake(self):
+        """Tell the workers that new alerts were queued."""
+        with self._wake:
+            self._woken.update(self.channel_names)
+            self._wake.notify_all()
+
+    def flush(self):
+        """Have every channel send what's pending and then stop."""
+        with self._wake:
+            self._flushing = True
+            self._wake.notify_all()
+
+    def close(self, timeout):
+        """Flush, then wait up to `timeout` seconds for delivery. Returns False if a worker was still sending.
+
+        Whatever wasn't delivered stays in the outbox for the next run.
+        """
+        with self._wake:
+            self._deadline = time.monotonic() + timeout
+        self.flush()
+        for thread in self._threads:
+            thread.join(max(0.0, self._deadline - time.monotonic()))
+        finished = not any(thread.is_alive() for thread in self._threads)
+        if finished:
+            for channel in self.channels:
+                self._record_unrecorded(channel)
+        self.undelivered = {channel: max(0, counts.get('pending', 0) - len(self._unrecorded.get(channel, ())))
+                            for channel, counts in self.state.outbox_stats().items()}
+        if finished:
+            for channel in self.channels:
+                channel.close()
+            self.state.close()
+        return finished
+
+    def print_report(self, finished=True):
+        for channel in self.channels:
+            stats = self.stats[channel.name]
+            if stats['messages']:
+                retried = f" after {stats['retried']} retr{'y' if stats['retried'] == 1 else 'ies'}" \
+                    if stats['retried'] else ''
+                print(f"📨 {channel.name}: {stats['sent']} alert(s) delivered to {channel.target} "
+                      f"in {stats['messages']} message(s){retried}")
+            if stats['given_up']:
+                print(f"❌ {channel.name}: gave up on {stats['given_up']} alert(s) after {self.max_attempts} "
+                      f"attempts ({stats['error']})")
+            if self._unrecorded[channel.name]:
+                print(f"⚠️  {channel.name}: {len(self._unrecorded[channel.name])} delivered alert(s) couldn't be "
+                      f"marked sent ({stats['error']}) - the next run will send them again")
+            pending = self.undelivered.get(channel.name, 0)
+            if pending:
+                reason = stats['error'] or ('still sending' if not finished else 'not attempted')
+                print(f"⚠️  {channel.name}: {pending} alert(s) not delivered yet ({reason}) - will retry next run")
+
+    def _work(self, channel):
+        try:
+            self._work_loop(channel)
+        except Exception as e:  # Never leave a channel silently dead; its alerts stay queued
+            self.stats[channel.name]['error'] = f"worker stopped: {e}"
+
+    def _work_loop(self, channel):
+        unrecorded = self._unrecorded[channel.name]
+        while True:
+            with self._wake:
+                self._wake.wait_for(lambda: self._flushing or channel.name in self._woken)
+                self._woken.discard(channel.name)
+                flushing = self._flushing
+            if not (channel.streams or flushing):
+                continue
+            self._record_unrecorded(channel)
+            # Batches already sent but not yet marked are skipped, so they aren't sent twice
+            limit = None if channel.batch_size is None else channel.batch_size + len(unrecorded)
+            batch = [(outbox_id, alert) for outbox_id, alert in self.state.pending_alerts(channel.name, limit)
+                     if outbox_id not in unrecorded][:channel.batch_size]
+            if not batch:
+                if flushing:
+                    return
+                continue
+            if not self._deliver(channel, batch):
+                return
+            # A full batch may have left more behind
+            with self._wake:
+                self._woken.add(channel.name)
+
+    def _record(self, channel, method, *args, attempts=3):
+        """Write delivery bookkeeping, retrying while the database is busy. Returns None if it couldn't."""
+        for attempt in range(attempts):
+            try:
+                return method(*args)
+            except sqlite3.Error as e:
+                self.stats[channel.name]['error'] = f"outbox write failed: {e}"
+                if attempt + 1 < attempts:
+                    time.sleep(1)
+        return None
+
+    def _record_unrecorded(self, channel):
+        unrecorded = self._unrecorded[channel.name]
+        if unrecorded and self._record(channel, self.state.mark_sent, sorted(unrecorded), attempts=1) is not None:
+            unrecorded.clear()
+
+    def _deliver(self, channel, batch):
+        """Send one batch, retrying with back-off. Returns False once the channel should stop for this run."""
+        outbox_ids = [outbox_id for outbox_id, _ in batch]
+        concerts = [Concert.from_dict(alert) for _, alert in batch]
+        stats = self.stats[channel.name]
+        for attempt in range(self.retries + 1):
+            try:
+                channel.send(concerts)
+            except Exception as e:  # SMTP, HTTP and SendGrid each raise their own errors
+                stats['error'] = str(e) or type(e).__name__
+                given_up = self._record(channel, self.state.mark_failed, outbox_ids, stats['error'],
+                                        self.max_attempts)
+                if given_up:
+                    # Some alerts are out of attempts; look at what's still pending afresh
+                    stats['given_up'] += given_up
+                    return True
+                if attempt == self.retries:
+                    return False
+                delay = random.uniform(0, min(self.max_delay, self.retry_seconds * 2 ** attempt))
+                retry_after = getattr(e, 'retry_after', None)
+                if retry_after is not None:
+                    delay = max(delay, min(retry_after, self.max_delay))
+                with self._wake:
+                    deadline = self._deadline
+                if deadline is not None and time.monotonic() + delay > deadline:
+                    return False
+                stats['retried'] += 1
+                time.sleep(delay)
+                continue
+            stats['sent'] += len(batch)
+            stats['messages'] += 1
+            if self._record(channel, self.state.mark_sent, outbox_ids) is None:
+                self._unrecorded[channel.name].update(outbox_ids)
+            return True
+        return False
@@ -3,44 +3,15 @@
 Organize artists: listened-to artists at top, others below for review
 """
 
-import json
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
-import config
+import argparse
 
-def get_top_artists_all_ranges(spotify):
-    """Get top artists across all time ranges"""
-    artist_scores = {}
+from spotify_data import get_artist_scores
 
-    time_ranges = {
-        'short_term': 3,
-        'medium_term': 2,
-        'long_term': 1
-    }
+parser = argparse.ArgumentParser(description='Reorder my_artists.txt: listened-to artists first, the rest for review')
+parser.add_argument('--refresh', action='store_true', help='Ignore the cached listening data and refetch it')
+args = parser.parse_args()
 
-    for time_range, weight in time_ranges.items():
-        top = spotify.current_user_top_artists(limit=50, time_range=time_range)
-        for idx, item in enumerate(top['items']):
-            artist_name = item['name']
-            rank_score = (50 - idx) * weight
-
-            if artist_name in artist_scores:
-                artist_scores[artist_name]['score'] += rank_score
-            else:
-                artist_scores[artist_name] = {'score': rank_score}
-
-    return artist_scores
-
-# Initialize Spotify
-spotify = spotipy.Spotify(auth_manager=SpotifyOAuth(
-    client_id=config.SPOTIFY_CLIENT_ID,
-    client_secret=config.SPOTIFY_CLIENT_SECRET,
-    redirect_uri=config.SPOTIFY_REDIRECT_URI,
-    scope=config.SPOTIFY_SCOPES
-))
-
-print("Fetching your listening data...")
-artist_scores = get_top_artists_all_ranges(spotify)
+artist_scores = get_artist_scores(refresh=args.refresh)
 
 # Load current artist list
 with open('my_artists.txt', 'r') as f:
@@ -0,0 +1,215 @@
+"""
+Bot profiles (artist list, region, recipients and state per person), and the search results they share in one run
+"""
+
+import json
+import math
+import os
+import threading
+from collections import Counter, namedtuple
+from dataclasses import dataclass
+
+import config
+from artist_registry import normalize_artist_name
+from venue_index import distance_miles, enclosing_region
+
+Region = namedtuple('Region', ['latitude', 'longitude', 'radius'])
+DiscoveryClients = namedtuple('DiscoveryClients', ['rate_limiter', 'http', 'cache', 'attractions', 'venues'])
+
+
+@dataclass(slots=True, frozen=True)
+class Profile:
+    """Who gets alerts for which artists where, and where their bot state lives."""
+
+    name: str
+    region: Region
+    recipients: tuple
+    artists_file: str
+    state_db: str
+    notified_file: str
+    output_file: str
+    spotify: bool = False
+    polygon: tuple = None  # (latitude, longitude) vertices narrowing the region, checked locally
+    webhook_url: str = None  # Discord/Slack webhook for this profile's alerts (WEBHOOK_URL by default)
+
+    @property
+    def label(self):
+        label = f"{self.region.radius} miles of {self.region.latitude},{self.region.longitude}"
+        if self.polygon:
+            label += f" (inside a {len(self.polygon)}-point area)"
+        return label
+
+    @classmethod
+    def from_config(cls):
+        """The single profile described by config.py / .env (the default, non-profile mode)."""
+        return cls(
+            name='default',
+            region=Region(config.LATITUDE, config.LONGITUDE, config.SEARCH_RADIUS),
+            recipients=(config.RECIPIENT_EMAIL,) if config.RECIPIENT_EMAIL else (),
+            artists_file=config.MY_ARTISTS_FILE,
+            state_db=config.STATE_DB_FILE,
+            notified_file=config.NOTIFIED_CONCERTS_FILE,
+            output_file=config.OUTPUT_FILE,
+            spotify=not config.SKIP_SPOTIFY,
+            polygon=tuple(config.SEARCH_POLYGON) or None,
+        )
+
+
+def parse_polygon(points):
+    """A polygon from [[latitude, longitude], ...] as a tuple of float pairs (at least three)."""
+    polygon = tuple((float(latitude), float(longitude)) for latitude, longitude in points)
+    if len(polygon) < 3:
+        raise ValueError("a polygon needs at least three points")
+    return polygon
+
+
+def load_profiles(path, profiles_dir=None):
+    """Read profiles from a JSON list.
+
+    Each entry needs a unique `name`, plus `latitude`, `longitude` and
+    `radius` (miles) and/or a `polygon` of [latitude, longitude] points; a
+    polygon alone is searched through the smallest circle around it.
+    `recipients` (a list of emails), `webhook_url`, `artists_file` and
+    `spotify` are optional. Unless given, a profile's artist list, state database,
+    notified list and alerts file live in `profiles_dir/<name>/`. Spotify
+    follows use the one shared token, so only one profile should set it.
+    Raises ValueError on a malformed file.
+    """
+    profiles_dir = profiles_dir or config.PROFILES_DIR
+    with open(path, 'r') as f:
+        entries = json.load(f)
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{path} should hold a non-empty JSON list of profiles")
+
+    profiles = []
+    for entry in entries:
+        try:
+            name = entry['name']
+            polygon = parse_polygon(entry['polygon']) if 'polygon' in entry else None
+            if polygon and 'radius' not in entry:
+                region = Region(*enclosing_region(polygon))
+            else:
+                region = Region(float(entry['latitude']), float(entry['longitude']), int(entry['radius']))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Bad profile in {path}: {entry!r} ({e})") from e
+        if any(profile.name == name for profile in profiles):
+            raise ValueError(f"Duplicate profile name in {path}: {name}")
+
+        directory = os.path.join(profiles_dir, name)
+        recipients = entry.get('recipients', [])
+        profiles.append(Profile(
+            name=name,
+            region=region,
+            recipients=tuple([recipients] if isinstance(recipients, str) else recipients),
+            artists_file=entry.get('artists_file', os.path.join(directory, 'my_artists.txt')),
+            state_db=entry.get('state_db', os.path.join(directory, 'concert_state.db')),
+            notified_file=entry.get('notified_file', os.path.join(directory, 'notified_concerts.json')),
+            output_file=entry.get('output_file', os.path.join(directory, 'concert_alerts.txt')),
+            spotify=bool(entry.get('spotify', False)) and not config.SKIP_SPOTIFY,
+            polygon=polygon,
+            webhook_url=entry.get('webhook_url'),
+        ))
+    return profiles
+
+
+def plan_query_regions(regions, max_radius):
+    """Map each region to the circle actually sent to the API, letting one wider query serve several regions.
+
+    Largest first, a region uses a query circle that already covers it, or
+    widens one to the smallest circle around both if that stays within
+    `max_radius` miles; otherwise it gets its own query. Events are then
+    filtered to each region locally (see VenueIndex).
+    """
+    queries = []  # [query region, member regions]
+    for region in sorted(set(regions), key=lambda region: -region.radius):
+        for entry in queries:
+            query, members = entry
+            distance = distance_miles(query.latitude, query.longitude, region.latitude, region.longitude)
+            if distance + region.radius <= query.radius:
+                members.append(region)
+                break
+            radius = math.ceil((distance + query.radius + region.radius) / 2)
+            if radius > max_radius:
+                continue
+            # Slide the centre toward the new region until both circles fit
+            share = (radius - query.radius) / distance
+            widened = Region(round(query.latitude + (region.latitude - query.latitude) * share, 4),
+                             round(query.longitude + (region.longitude - query.longitude) * share, 4), radius)
+            if all(distance_miles(widened.latitude, widened.longitude, member.latitude, member.longitude)
+                   + member.radius <= widened.radius for member in members + [region]):
+                entry[0] = widened
+                members.append(region)
+                break
+        else:
+            queries.append([region, [region]])
+    return {member: query for query, members in queries for member in members}
+
+
+class SharedSearches:
+    """Search results for one multi-profile run, keyed by (artist, region), so each pair is queried once.
+
+    Profiles register their artists up front, then plan() works out the
+    query regions (nearby profile regions can share one wider query, see
+    plan_query_regions). A pair wanted by more than one
+    profile is fetched in full by the first profile to reach it (no early
+    stop at already-notified pages, since what's notified differs per
+    profile) and replayed for the rest. Pairs only one profile wants are
+    searched as usual and not kept. A region sweep is shared the same way
+    when several profiles use the region.
+
+    Also holds the DiscoveryClients (rate limiter, HTTP pool, response cache,
+    attraction IDs, venue index) once the first bot has created them, so
+    every profile draws on the same quota and connections.
+    """
+
+    def __init__(self):
+        self.clients = None
+        self.interest = Counter()
+        self.query_regions = {}
+        self.results = {}
+        self.fetched = 0
+        self.reused = 0
+        self._registered = []
+        self._lock = threading.Lock()
+
+    def register(self, region, artist_names):
+        """Note that a profile searches these artists in this region."""
+        self._registered.append((region, {normalize_artist_name(name) for name in artist_names}))
+
+    def plan(self, max_radius):
+        """Pick the query region for every registered region and count the interest in each pair."""
+        self.query_regions = plan_query_regions([region for region, _ in self._registered], max_radius)
+        self.interest = Counter()
+        for region, keys in self._registered:
+            query = self.query_regions[region]
+            self.interest[(None, query)] += 1
+            for key in keys:
+                self.interest[(key, query)] += 1
+
+    def query_region(self, region):
+        """The region actually searched on behalf of `region`."""
+        return self.query_regions.get(region, region)
+
+    def is_shared(self, artist_name, region):
+        """Whether more than one profile wants this artist (or, for None, this region's sweep)."""
+        key = None if artist_name is None else normalize_artist_name(artist_name)
+        return self.interest[(key, region)] > 1
+
+    def has(self, kind, artist_name, region):
+        key = None if artist_name is None else normalize_artist_name(artist_name)
+        return (kind, key, region) in self.results
+
+    def get(self, kind, artist_name, region):
+        """Events already fetched for the pair from `kind` ('ticketmaster', 'sources', 'sweep'), or None."""
+        key = None if artist_name is None else normalize_artist_name(artist_name)
+        with self._lock:
+            events = self.results.get((kind, key, region))
+            if events is not None:
+                self.reused += 1
+        return events
+
+    def put(self, kind, artist_name, region, events):
+        key = None if artist_name is None else normalize_artist_name(artist_name)
+        with self._lock:
+            self.results[(kind, key, region)] = events
+            self.fetched += 1
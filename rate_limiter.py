@@ -0,0 +1,115 @@
+"""
+Rate limiting shared by every worker that talks to the same API
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        """Add the tokens earned since the last update (caller holds the lock)."""
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available, then take them."""
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def retry_after_seconds(headers):
+    """Parse a Retry-After header (seconds or HTTP date) into seconds, or None."""
+    value = headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """Token bucket that backs off on 429s and speeds back up while the quota has headroom.
+
+    Rate changes are AIMD: a 429 halves the rate (down to `min_rate`) and pauses every
+    worker for an exponential, jittered delay (or Retry-After, whichever is longer);
+    each successful response with headroom adds `increase_step` back, up to `max_rate`.
+    """
+
+    def __init__(self, rate, min_rate=0.5, increase_step=0.1, base_delay=1.0, max_delay=60.0):
+        super().__init__(rate)
+        self.max_rate = self.rate
+        self.min_rate = min(min_rate, self.rate)
+        self.increase_step = increase_step
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.throttle_count = 0
+        self._paused_until = 0.0
+
+    def acquire(self, tokens=1):
+        """Wait out any active back-off pause, then take a token."""
+        while True:
+            with self._lock:
+                wait = self._paused_until - time.monotonic()
+            if wait <= 0:
+                break
+            time.sleep(wait)
+        super().acquire(tokens)
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """Exponential back-off with full jitter; a longer Retry-After always wins."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    def on_throttled(self, attempt, retry_after=None):
+        """Record a 429: slow down and pause every worker. Returns the pause in seconds."""
+        delay = self.backoff_delay(attempt, retry_after)
+        with self._lock:
+            self.throttle_count += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            # No tokens accrue while paused, so workers don't burst the moment it ends
+            self._tokens = 0.0
+            self._updated = self._paused_until
+        return delay
+
+    def on_success(self, headers):
+        """Speed back up unless Ticketmaster's quota headers say we're nearly out."""
+        try:
+            limit = int(headers.get('Rate-Limit', ''))
+            available = int(headers.get('Rate-Limit-Available', ''))
+        except ValueError:
+            limit = available = None
+
+        with self._lock:
+            if limit and available is not None and available < limit * 0.05:
+                # Under 5% of the quota left - ease off instead of speeding up
+                self.rate = max(self.min_rate, self.rate * 0.9)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
@@ -0,0 +1,131 @@
+"""
+On-disk cache of API responses with per-entry TTLs, conditional revalidation and LRU eviction
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+# Parameters that change every run without changing the answer
+VOLATILE_PARAMS = {'apikey', 'startDateTime', 'endDateTime'}
+
+
+def make_cache_key(endpoint, params):
+    """Hash an endpoint and its query parameters into a stable cache key.
+
+    The API key is dropped and the moving start/end dates are replaced by the
+    window's offset from today and its length in days, so the same search made
+    a week later hits the same entry.
+    """
+    normalized = {k: str(v).strip().lower() for k, v in params.items() if k not in VOLATILE_PARAMS}
+    if 'startDateTime' in params and 'endDateTime' in params:
+        fmt = '%Y-%m-%dT%H:%M:%SZ'
+        start = datetime.strptime(params['startDateTime'], fmt)
+        end = datetime.strptime(params['endDateTime'], fmt)
+        normalized['offset_days'] = str(round((start - datetime.now()).total_seconds() / 86400))
+        normalized['window_days'] = str((end - start).days)
+    raw = json.dumps([endpoint, sorted(normalized.items())])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Caches decoded JSON responses under `directory`, one file per entry.
+
+    An index.json alongside the entries tracks expiry, validators (ETag /
+    Last-Modified) and last use. Once the entries exceed `max_bytes` the least
+    recently used ones are evicted. Call save() at the end of a run.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.stats = {'fresh': 0, 'revalidated': 0, 'fetched': 0, 'evicted': 0}
+        self._lock = threading.Lock()
+        self._index_file = os.path.join(directory, 'index.json')
+        os.makedirs(directory, exist_ok=True)
+        self._index = {}
+        if os.path.exists(self._index_file):
+            try:
+                with open(self._index_file, 'r') as f:
+                    self._index = json.load(f)
+            except (ValueError, OSError):
+                # A corrupt index just means a cold cache
+                self._index = {}
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """Return {'data', 'fresh', 'etag', 'last_modified'} for a cached entry, or None."""
+        with self._lock:
+            meta = self._index.get(key)
+            if meta is None:
+                return None
+            try:
+                with open(self._path(key), 'r') as f:
+                    data = json.load(f)
+            except (ValueError, OSError):
+                del self._index[key]
+                return None
+            meta['last_used'] = time.time()
+            return {
+                'data': data,
+                'fresh': meta['expires'] > time.time(),
+                'etag': meta.get('etag'),
+                'last_modified': meta.get('last_modified'),
+            }
+
+    def put(self, key, data, ttl, etag=None, last_modified=None):
+        """Store a response for `ttl` seconds and evict old entries if over budget."""
+        body = json.dumps(data, separators=(',', ':'))
+        with self._lock:
+            tmp_path = f"{self._path(key)}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(body)
+            os.replace(tmp_path, self._path(key))
+            now = time.time()
+            self._index[key] = {
+                'size': len(body),
+                'expires': now + ttl,
+                'last_used': now,
+                'etag': etag,
+                'last_modified': last_modified,
+            }
+            self._evict()
+
+    def refresh(self, key, ttl):
+        """Extend an entry's lifetime after the server confirmed it is unchanged (304)."""
+        with self._lock:
+            if key in self._index:
+                self._index[key]['expires'] = time.time() + ttl
+
+    def count(self, outcome):
+        """Tally a lookup outcome ('fresh', 'revalidated' or 'fetched') for the run summary."""
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def _evict(self):
+        """Drop least recently used entries until under max_bytes (caller holds the lock)."""
+        total = sum(meta['size'] for meta in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key in sorted(self._index, key=lambda k: self._index[k]['last_used']):
+            if total <= self.max_bytes:
+                break
+            total -= self._index.pop(key)['size']
+            self.stats['evicted'] += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def save(self):
+        """Write the index atomically."""
+        with self._lock:
+            tmp_path = f"{self._index_file}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self._index, f)
+            os.replace(tmp_path, self._index_file)
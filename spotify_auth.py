@@ -0,0 +1,117 @@
+"""
+Shared Spotify auth: one persisted token for the bot and the curation scripts, refreshed only when it expires
+"""
+
+import threading
+
+import spotipy
+from spotipy.cache_handler import CacheFileHandler
+from spotipy.exceptions import SpotifyException
+from spotipy.oauth2 import SpotifyOAuth
+
+import config
+
+
+class SharedTokenOAuth(SpotifyOAuth):
+    """SpotifyOAuth that can share its token cache between clients with different scopes.
+
+    spotipy labels every token with the scope the current client asked for,
+    so a token saved by the bot (read scopes) looks unusable to the follow
+    sync (read + modify) and vice versa. This keeps the scope Spotify says it
+    granted instead, so any client whose scope is covered reuses the token.
+    Token checks are serialized, so concurrent requests refresh it once.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._token_lock = threading.Lock()
+
+    def _add_custom_values_to_token_info(self, token_info):
+        granted = token_info.get('scope')
+        token_info = super()._add_custom_values_to_token_info(token_info)
+        if granted:
+            token_info['scope'] = granted
+        return token_info
+
+    def get_access_token(self, *args, **kwargs):
+        with self._token_lock:
+            return super().get_access_token(*args, **kwargs)
+
+    def seed_refresh_token(self, refresh_token):
+        """Use a refresh token from the environment (e.g. GitHub Actions) when nothing is cached.
+
+        The seeded token is marked expired, so the first request refreshes it
+        and every later request reuses the cached access token until it expires.
+        """
+        if self.cache_handler.get_cached_token():
+            return
+        self.cache_handler.save_token_to_cache({
+            'access_token': None,
+            'token_type': 'Bearer',
+            'refresh_token': refresh_token,
+            'scope': self.scope,
+            'expires_at': 0,
+        })
+
+    def force_refresh(self, rejected_token):
+        """Replace a rejected access token, even if it hasn't reached its expiry time.
+
+        If another thread already replaced it, the new token is kept as is.
+        """
+        with self._token_lock:
+            token_info = self.cache_handler.get_cached_token()
+            if not token_info or not token_info.get('refresh_token'):
+                return False
+            if token_info.get('access_token') == rejected_token:
+                self.refresh_access_token(token_info['refresh_token'])
+            return True
+
+
+class RetryingSpotify(spotipy.Spotify):
+    """Spotify client that refreshes the token and retries once when a request gets a 401.
+
+    Tokens are refreshed shortly before they expire, but one can still be
+    rejected mid-run (revoked, or the clock is off); this keeps long runs going.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sent = threading.local()
+
+    def _auth_headers(self):
+        headers = super()._auth_headers()
+        self._sent.token = headers.get('Authorization', '')[len('Bearer '):]
+        return headers
+
+    def _internal_call(self, method, url, payload, params):
+        try:
+            return super()._internal_call(method, url, payload, params)
+        except SpotifyException as e:
+            if e.http_status != 401 or not isinstance(self.auth_manager, SharedTokenOAuth):
+                raise
+            print("  Spotify rejected the access token - refreshing and retrying")
+            if not self.auth_manager.force_refresh(self._sent.token):
+                raise
+            return super()._internal_call(method, url, payload, params)
+
+
+def spotify_client(scope=config.SPOTIFY_SCOPES):
+    """Spotify client sharing the persisted token in SPOTIFY_TOKEN_CACHE_FILE.
+
+    Nothing is sent until the first API call. A valid cached token is reused
+    as is; an expired one is refreshed; only with no usable token (and no
+    SPOTIFY_REFRESH_TOKEN) does it fall back to the browser login.
+    """
+    auth_manager = SharedTokenOAuth(
+        client_id=config.SPOTIFY_CLIENT_ID,
+        client_secret=config.SPOTIFY_CLIENT_SECRET,
+        redirect_uri=config.SPOTIFY_REDIRECT_URI,
+        scope=scope,
+        cache_handler=CacheFileHandler(cache_path=config.SPOTIFY_TOKEN_CACHE_FILE)
+    )
+    auth_manager.OAUTH_TOKEN_URL = config.SPOTIFY_TOKEN_URL
+    if config.SPOTIFY_REFRESH_TOKEN:
+        auth_manager.seed_refresh_token(config.SPOTIFY_REFRESH_TOKEN)
+    spotify = RetryingSpotify(auth_manager=auth_manager)
+    spotify.prefix = config.SPOTIFY_API_BASE_URL
+    return spotify
@@ -0,0 +1,51 @@
+"""
+Batched Spotify follow/unfollow: up to 50 artist IDs per request, with bad IDs isolated
+"""
+
+import time
+
+# The follow/unfollow endpoints accept at most 50 IDs per request
+BATCH_SIZE = 50
+
+
+def chunked(items, size=BATCH_SIZE):
+    """Split a list into consecutive chunks of at most `size` items."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def apply_in_batches(action, artists, label, batch_size=BATCH_SIZE):
+    """Call action(ids) for the artists' Spotify IDs, batch_size at a time.
+
+    A batch that fails is retried one ID at a time, so a single bad ID only
+    fails itself instead of its whole batch. Prints a timing line per batch.
+    Returns (done, failed): lists of the artist dicts, with each failed
+    artist's error message under 'error'.
+    """
+    done, failed = [], []
+    batches = chunked(artists, batch_size)
+    started = time.perf_counter()
+
+    for number, batch in enumerate(batches, 1):
+        batch_start = time.perf_counter()
+        try:
+            action([artist['id'] for artist in batch])
+            done.extend(batch)
+            status = 'ok'
+        except Exception as e:
+            ok = 0
+            for artist in batch:
+                try:
+                    action([artist['id']])
+                    done.append(artist)
+                    ok += 1
+                except Exception as artist_error:
+                    failed.append(dict(artist, error=str(artist_error)))
+            status = f"batch failed ({e}); retried one by one: {ok}/{len(batch)} ok"
+        elapsed = time.perf_counter() - batch_start
+        print(f"  [{number}/{len(batches)}] {label} {len(batch)} artists in {elapsed * 1000:.0f}ms - {status}")
+
+    if batches:
+        total = time.perf_counter() - started
+        print(f"  {label} {len(done)}/{len(artists)} artists in {len(batches)} request batch(es), "
+              f"{total:.1f}s total ({total / len(batches) * 1000:.0f}ms per batch)")
+    return done, failed
@@ -0,0 +1,118 @@
+"""
+Spotify listening data for the curation scripts: top artists per time range, cached on disk, with weighted scoring
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import config
+from spotify_auth import spotify_client
+
+# Weight: short_term (last 4 weeks) gets highest weight
+# medium_term (last 6 months) gets medium weight
+# long_term (several years) gets lowest weight
+TIME_RANGE_WEIGHTS = {
+    'short_term': 3,    # Last 4 weeks - most important
+    'medium_term': 2,   # Last 6 months
+    'long_term': 1      # All time
+}
+
+# The top-items endpoint returns at most 50 per request
+PAGE_SIZE = 50
+
+
+def fetch_time_range(spotify, time_range, limit=config.TOP_ARTISTS_LIMIT):
+    """Fetch up to `limit` ranked top artists for one time range, paging by offset past 50."""
+    artists = []
+    while len(artists) < limit:
+        page = spotify.current_user_top_artists(
+            limit=min(PAGE_SIZE, limit - len(artists)),
+            offset=len(artists),
+            time_range=time_range
+        )
+        items = page['items']
+        artists.extend({'name': item['name'], 'id': item['id']} for item in items)
+        if not items or not page.get('next'):
+            break
+    return artists
+
+
+def fetch_top_artists(spotify, limit=config.TOP_ARTISTS_LIMIT):
+    """Fetch every time range concurrently. Returns {time_range: [{'name', 'id'}, ...]} in rank order."""
+    time_ranges = list(TIME_RANGE_WEIGHTS)
+    with ThreadPoolExecutor(max_workers=len(time_ranges)) as executor:
+        results = executor.map(lambda time_range: fetch_time_range(spotify, time_range, limit), time_ranges)
+        return dict(zip(time_ranges, results))
+
+
+def _load_cache(filename, limit, ttl_hours):
+    """Return the cached ranges if they're fresh and deep enough, else None."""
+    try:
+        with open(filename, 'r') as f:
+            cached = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    age_hours = (time.time() - cached.get('fetched_at', 0)) / 3600
+    if age_hours > ttl_hours or cached.get('limit', 0) < limit:
+        return None
+    return cached['ranges']
+
+
+def _save_cache(filename, limit, ranges):
+    """Write the cache atomically so an interrupted run can't leave a truncated file."""
+    tmp_path = f"{filename}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'fetched_at': time.time(), 'limit': limit, 'ranges': ranges}, f, indent=2)
+    os.replace(tmp_path, filename)
+
+
+def load_top_artists(spotify=None, refresh=False, limit=config.TOP_ARTISTS_LIMIT,
+                     cache_file=config.TOP_ARTISTS_CACHE_FILE, ttl_hours=config.TOP_ARTISTS_CACHE_TTL_HOURS):
+    """Top artists per time range, from the disk cache when it's fresh.
+
+    Spotify is only contacted (and only authenticated, if no client is
+    passed) when the cache is missing, older than ttl_hours, shallower than
+    `limit`, or `refresh` is set.
+    """
+    if not refresh:
+        ranges = _load_cache(cache_file, limit, ttl_hours)
+        if ranges is not None:
+            fetched = datetime.fromtimestamp(os.path.getmtime(cache_file)).strftime('%Y-%m-%d %H:%M')
+            print(f"Using cached listening data from {fetched} ({cache_file})")
+            return ranges
+
+    print("Fetching your listening data from Spotify...")
+    ranges = fetch_top_artists(spotify or spotify_client(), limit)
+    _save_cache(cache_file, limit, ranges)
+    return ranges
+
+
+def score_artists(ranges, weights=TIME_RANGE_WEIGHTS, depth=config.TOP_ARTISTS_LIMIT):
+    """Weighted listening score per artist name.
+
+    Each appearance scores (depth - rank) * the time range's weight, so a
+    higher rank in a more recent range counts for more. Returns
+    {name: {'score', 'appearances', 'time_ranges', 'id'}}.
+    """
+    artist_scores = {}
+    for time_range, weight in weights.items():
+        for idx, artist in enumerate(ranges.get(time_range, [])):
+            rank_score = max(depth - idx, 0) * weight
+            entry = artist_scores.setdefault(artist['name'], {
+                'score': 0,
+                'appearances': 0,
+                'time_ranges': [],
+                'id': artist['id']
+            })
+            entry['score'] += rank_score
+            entry['appearances'] += 1
+            entry['time_ranges'].append(time_range)
+    return artist_scores
+
+
+def get_artist_scores(spotify=None, refresh=False):
+    """Cached top artists across all time ranges, scored."""
+    return score_artists(load_top_artists(spotify, refresh))
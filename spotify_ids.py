@@ -0,0 +1,123 @@
+"""
+Artist name -> Spotify ID resolution: cached across runs, looked up concurrently, ambiguous matches held for review
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from artist_registry import normalize_artist_name
+from attraction_ids import load_overrides
+from rate_limiter import TokenBucket
+
+# Search results compared per name; more than one exact match is ambiguous
+SEARCH_LIMIT = 5
+
+
+class SpotifyIdResolver:
+    """Resolves curated artist names to Spotify IDs.
+
+    Confident matches are saved in a JSON file, so only new or still
+    unresolved names are searched. Searches run on a bounded thread pool
+    sharing one token bucket. A name is resolved only if exactly one search
+    result has the same normalized name; otherwise the candidates are kept
+    for review rather than following a guess. Entries in the override file
+    ('Artist Name = SPOTIFY_ID', or '= none' to skip) always win.
+    """
+
+    def __init__(self, spotify, filename, overrides_file, workers=4, rate=10):
+        self.spotify = spotify
+        self.filename = filename
+        self.overrides = load_overrides(overrides_file)
+        self.workers = workers
+        self.bucket = TokenBucket(rate, capacity=workers)
+        self.searches = 0
+        self.ambiguous = {}
+        self._lock = threading.Lock()
+        self._entries = {}
+        if os.path.exists(filename):
+            with open(filename, 'r') as f:
+                self._entries = json.load(f)
+
+    def cached_id(self, name):
+        """The known Spotify ID for a name, '' if overridden to none, or None if unknown."""
+        key = normalize_artist_name(name)
+        if key in self.overrides:
+            return self.overrides[key][0] if self.overrides[key] else ''
+        entry = self._entries.get(key)
+        return entry['id'] if entry else None
+
+    def _search(self, name):
+        """Return (spotify_id, candidates): an ID for one exact match, else the candidates to review."""
+        self.bucket.acquire()
+        with self._lock:
+            self.searches += 1
+        results = self.spotify.search(q=f'artist:{name}', type='artist', limit=SEARCH_LIMIT)
+        items = results['artists']['items']
+
+        key = normalize_artist_name(name)
+        exact = [item for item in items if normalize_artist_name(item['name']) == key]
+        if len(exact) == 1:
+            return exact[0]['id'], []
+        candidates = [{
+            'name': item['name'],
+            'id': item['id'],
+            'followers': item.get('followers', {}).get('total'),
+            'genres': item.get('genres', [])[:3],
+        } for item in (exact or items)]
+        return None, candidates
+
+    def resolve_all(self, names):
+        """Resolve names to Spotify IDs. Returns ({name: id}, [names not found or ambiguous])."""
+        resolved = {}
+        pending = []
+        for name in names:
+            spotify_id = self.cached_id(name)
+            if spotify_id is None:
+                pending.append(name)
+            elif spotify_id:
+                resolved[name] = spotify_id
+
+        def search(name):
+            try:
+                return self._search(name)
+            except Exception as e:
+                print(f"  Error searching for {name}: {e}")
+                return None, []
+
+        unresolved = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for name, (spotify_id, candidates) in zip(pending, executor.map(search, pending)):
+                if spotify_id:
+                    resolved[name] = spotify_id
+                    self._entries[normalize_artist_name(name)] = {
+                        'name': name,
+                        'id': spotify_id,
+                        'resolved_at': datetime.now().isoformat(timespec='seconds'),
+                    }
+                else:
+                    unresolved.append(name)
+                    if candidates:
+                        self.ambiguous[name] = candidates
+        return resolved, unresolved
+
+    def save(self):
+        """Write the cache atomically, sorted so the file diffs cleanly."""
+        tmp_path = f"{self.filename}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.filename)
+
+    def write_review(self, filename):
+        """Write ambiguous names with their candidates, as override lines to copy once checked."""
+        with open(filename, 'w') as f:
+            f.write("# Artists whose Spotify search didn't give exactly one exact match.\n")
+            f.write("# Copy the right line into the override file (or use '= none' to skip the artist).\n")
+            for name, candidates in sorted(self.ambiguous.items()):
+                f.write(f"\n# {name}\n")
+                for candidate in candidates:
+                    genres = ', '.join(candidate['genres']) or 'no genres'
+                    f.write(f"#   '{candidate['name']}': {candidate['followers'] or 0:,} followers, {genres}\n")
+                    f.write(f"# {name} = {candidate['id']}\n")
@@ -0,0 +1,570 @@
+"""
+SQLite-backed bot state: notified events, the artist cache, search schedule, run history, the progress journal
+and the notification outbox
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notified_events (
+    event_id TEXT PRIMARY KEY,
+    event_date TEXT,
+    notified_at TEXT NOT NULL,
+    lookups INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_notified_events_date ON notified_events (event_date);
+CREATE INDEX IF NOT EXISTS idx_notified_events_undated ON notified_events (notified_at) WHERE event_date IS NULL;
+
+CREATE TABLE IF NOT EXISTS show_fingerprints (
+    fingerprint TEXT PRIMARY KEY,
+    event_id TEXT NOT NULL,
+    event_date TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_show_fingerprints_date ON show_fingerprints (event_date);
+
+CREATE TABLE IF NOT EXISTS artists (
+    position INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    spotify_id TEXT,
+    source TEXT
+);
+
+CREATE TABLE IF NOT EXISTS followed_artists (
+    position INTEGER PRIMARY KEY,
+    spotify_id TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS artist_schedule (
+    artist_key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    last_checked TEXT NOT NULL,
+    last_changed TEXT,
+    checks INTEGER NOT NULL,
+    changes INTEGER NOT NULL,
+    quiet_streak INTEGER NOT NULL,
+    event_ids TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    artists_checked INTEGER,
+    new_concerts INTEGER,
+    api_requests INTEGER,
+    tracked_events INTEGER,
+    undated_events INTEGER,
+    expired_events INTEGER,
+    artists_skipped INTEGER,
+    audited_artists INTEGER,
+    audit_misses INTEGER,
+    duplicates_collapsed INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS run_journal (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL,
+    artist_name TEXT NOT NULL,
+    complete INTEGER NOT NULL,
+    alerts TEXT NOT NULL,
+    recorded_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_run_journal_run ON run_journal (run_id);
+
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel TEXT NOT NULL,
+    event_id TEXT,
+    alert TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    queued_at TEXT NOT NULL,
+    sent_at TEXT,
+    UNIQUE (channel, event_id)
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_pending ON outbox (channel, id) WHERE status = 'pending';
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def now_iso():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+class StateStore:
+    """Bot state in one SQLite database (WAL mode).
+
+    Notified events are inserted as they're found and expired with a single
+    indexed DELETE. The JSON file is now just a sorted, one-entry-per-line dump
+    for committing to git; it's imported on first use and whenever it changes
+    underneath us (e.g. a `git pull` brought in the Actions job's updates).
+
+    With `scratch=True` the database is copied into memory and nothing is
+    written back (used by --offline). `busy_timeout` is how many seconds a
+    write waits for another connection's open transaction to finish.
+    """
+
+    def __init__(self, path, scratch=False, busy_timeout=5.0):
+        self.path = path
+        self._lock = threading.RLock()
+        if scratch:
+            self.conn = sqlite3.connect(':memory:', check_same_thread=False)
+            if os.path.exists(path):
+                disk = sqlite3.connect(path)
+                disk.backup(self.conn)
+                disk.close()
+        else:
+            self.conn = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self.conn.commit()
+
+    def _migrate(self):
+        """Add columns introduced after a database was created."""
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(runs)')}
+        for column in ('undated_events', 'expired_events', 'artists_skipped', 'audited_artists', 'audit_misses',
+                       'duplicates_collapsed'):
+            if column not in columns:
+                self.conn.execute(f'ALTER TABLE runs ADD COLUMN {column} INTEGER')
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(notified_events)')}
+        if 'lookups' not in columns:
+            self.conn.execute('ALTER TABLE notified_events ADD COLUMN lookups INTEGER NOT NULL DEFAULT 0')
+        # Cross-source show keys used to be kept as 'show:' pseudo-events; show_fingerprints replaces them
+        self.conn.execute("DELETE FROM notified_events WHERE event_id LIKE 'show:%'")
+
+    # --- Notified events -------------------------------------------------
+
+    def is_notified(self, event_id):
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT 1 FROM notified_events WHERE event_id = ?', (event_id,)
+            ).fetchone()
+        return row is not None
+
+    def add_notified(self, event_id, event_date):
+        """Record an event (a no-op if it's already tracked). Returns True if it was new.
+
+        Not committed on its own: checkpoint_artist() commits the artist's
+        events together with their alerts, so a crash can't leave an event
+        marked as notified without the alert that still has to go out.
+        """
+        with self._lock:
+            cursor = self.conn.execute(
+                'INSERT OR IGNORE INTO notified_events (event_id, event_date, notified_at) VALUES (?, ?, ?)',
+                (event_id, event_date, now_iso())
+            )
+        return cursor.rowcount == 1
+
+    def notified_ids(self):
+        with self._lock:
+            return {row[0] for row in self.conn.execute('SELECT event_id FROM notified_events')}
+
+    def count_notified(self):
+        with self._lock:
+            return self.conn.execute('SELECT COUNT(*) FROM notified_events').fetchone()[0]
+
+    def delete_events_before(self, date_str):
+        """Expire every event dated before date_str (YYYY-MM-DD). Returns how many were removed.
+
+        A range delete on the event_date index, so only expired rows are touched.
+        """
+        with self._lock:
+            cursor = self.conn.execute('DELETE FROM notified_events WHERE event_date < ?', (date_str,))
+            self.conn.execute('DELETE FROM show_fingerprints WHERE event_date < ?', (date_str,))
+            self.conn.commit()
+        return cursor.rowcount
+
+    def delete_undated_before(self, notified_before):
+        """Expire undated events first tracked before an ISO timestamp. Returns how many were removed."""
+        with self._lock:
+            cursor = self.conn.execute(
+                'DELETE FROM notified_events WHERE event_date IS NULL AND notified_at < ?', (notified_before,)
+            )
+            self.conn.commit()
+        return cursor.rowcount
+
+    def undated_ids(self, limit=None, max_lookups=None):
+        """IDs of events tracked without a date, least looked-up then oldest first.
+
+        With `max_lookups`, events whose date lookup already failed that many
+        times are left out.
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT event_id FROM notified_events WHERE event_date IS NULL AND lookups < ? '
+                'ORDER BY lookups, notified_at, event_id LIMIT ?',
+                (2 ** 31 if max_lookups is None else max_lookups, -1 if limit is None else limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def record_failed_lookups(self, event_ids):
+        """Count a failed date lookup (a 404 or no date) for each undated event."""
+        with self._lock:
+            self.conn.executemany(
+                'UPDATE notified_events SET lookups = lookups + 1 WHERE event_id = ? AND event_date IS NULL',
+                [(event_id,) for event_id in event_ids]
+            )
+            self.conn.commit()
+
+    def backfill_dates(self, dates):
+        """Fill in dates for undated events from an {event_id: date} dict. Returns how many were filled."""
+        with self._lock:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                'UPDATE notified_events SET event_date = ? WHERE event_id = ? AND event_date IS NULL',
+                [(event_date, event_id) for event_id, event_date in dates.items() if event_date]
+            )
+            filled = self.conn.total_changes - before
+            self.conn.commit()
+        return filled
+
+    def tracker_stats(self):
+        """Current size of the tracker: total and undated events, and the dated range."""
+        with self._lock:
+            total, undated, earliest, latest = self.conn.execute(
+                'SELECT COUNT(*), COUNT(*) - COUNT(event_date), MIN(event_date), MAX(event_date) '
+                'FROM notified_events'
+            ).fetchone()
+        return {'tracked': total, 'undated': undated, 'earliest': earliest, 'latest': latest}
+
+    # --- Show fingerprints -----------------------------------------------
+
+    def load_fingerprints(self):
+        """Return {fingerprint: event_id} for every show alerted on so far."""
+        with self._lock:
+            return dict(self.conn.execute('SELECT fingerprint, event_id FROM show_fingerprints'))
+
+    def add_fingerprint(self, fingerprint, event_id, event_date):
+        """Record the event first seen for a show fingerprint. Committed by checkpoint_artist()."""
+        with self._lock:
+            self.conn.execute(
+                'INSERT OR IGNORE INTO show_fingerprints (fingerprint, event_id, event_date) VALUES (?, ?, ?)',
+                (fingerprint, event_id, event_date)
+            )
+
+    # --- JSON migration and dump -----------------------------------------
+
+    def import_json(self, filename):
+        """Import notified events from the JSON file if it's new or changed since our last dump.
+
+        Handles the legacy list-of-IDs format and the {id: date} format.
+        Undated entries are null (legacy) or {"tracked": first tracked,
+        "lookups": failed date lookups}, so a rebuilt database keeps their
+        expiry clock and lookup back-off; they're stored with a NULL
+        event_date. A date in the file fills in one we didn't have (e.g. from
+        extract_event_ids.py). Returns the number of events added or updated.
+        """
+        if not os.path.exists(filename):
+            return 0
+        mtime = str(os.path.getmtime(filename))
+        if self._get_meta('json_mtime') == mtime and self.count_notified():
+            return 0
+
+        with open(filename, 'r') as f:
+            data = json.load(f)
+        # Handle both old format (list of IDs) and new format (dict with dates)
+        if isinstance(data, list):
+            data = {event_id: None for event_id in data}
+
+        now = now_iso()
+        rows = []
+        for event_id, value in data.items():
+            if isinstance(value, dict):
+                rows.append((event_id, None, value.get('tracked') or now, int(value.get('lookups') or 0)))
+            else:
+                rows.append((event_id, value, now, 0))
+        with self._lock:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                'INSERT INTO notified_events (event_id, event_date, notified_at, lookups) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (event_id) DO UPDATE SET '
+                'event_date = COALESCE(notified_events.event_date, excluded.event_date), '
+                'notified_at = MIN(notified_events.notified_at, excluded.notified_at), '
+                'lookups = MAX(notified_events.lookups, excluded.lookups) '
+                'WHERE notified_events.event_date IS NULL AND (excluded.event_date IS NOT NULL '
+                'OR excluded.notified_at < notified_events.notified_at OR excluded.lookups > notified_events.lookups)',
+                rows
+            )
+            added = self.conn.total_changes - before
+            self._set_meta('json_mtime', mtime)
+            self.conn.commit()
+        return added
+
+    def dump_json(self, filename):
+        """Write notified events as compact, sorted JSON (one entry per line) via atomic rename.
+
+        Dated events map to their date; undated ones to when they were first
+        tracked and how many date lookups failed (see import_json).
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT event_id, event_date, notified_at, lookups FROM notified_events ORDER BY event_id'
+            ).fetchall()
+        lines = [f"{json.dumps(event_id)}: "
+                 f"{json.dumps(event_date or {'tracked': notified_at, 'lookups': lookups})}"
+                 for event_id, event_date, notified_at, lookups in rows]
+        body = '{\n' + ',\n'.join(lines) + '\n}\n' if lines else '{}\n'
+
+        tmp_path = f"{filename}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(body)
+        os.replace(tmp_path, filename)
+        with self._lock:
+            self._set_meta('json_mtime', str(os.path.getmtime(filename)))
+            self.conn.commit()
+
+    # --- Artist cache ----------------------------------------------------
+
+    def save_artists(self, artists):
+        """Replace the cached merged artist list. Returns False (and writes nothing) if it's unchanged."""
+        with self._lock:
+            if self.load_artists() == [{'name': a['name'], 'id': a.get('id'), 'source': a.get('source')}
+                                       for a in artists]:
+                return False
+            self.conn.execute('DELETE FROM artists')
+            self.conn.executemany(
+                'INSERT INTO artists (position, name, spotify_id, source) VALUES (?, ?, ?, ?)',
+                [(i, a['name'], a.get('id'), a.get('source')) for i, a in enumerate(artists)]
+            )
+            self.conn.commit()
+        return True
+
+    def load_artists(self):
+        with self._lock:
+            rows = self.conn.execute('SELECT name, spotify_id, source FROM artists ORDER BY position').fetchall()
+        return [{'name': name, 'id': spotify_id, 'source': source} for name, spotify_id, source in rows]
+
+    # --- Spotify follow snapshot -----------------------------------------
+
+    def load_follow_snapshot(self):
+        """Return the last full Spotify follow list as (fingerprint, taken_at, artists), or None."""
+        fingerprint = self._get_meta('follow_snapshot_fingerprint')
+        if fingerprint is None:
+            return None
+        with self._lock:
+            rows = self.conn.execute('SELECT spotify_id, name FROM followed_artists ORDER BY position').fetchall()
+        artists = [{'id': spotify_id, 'name': name} for spotify_id, name in rows]
+        return fingerprint, self._get_meta('follow_snapshot_taken_at'), artists
+
+    def save_follow_snapshot(self, fingerprint, artists):
+        """Replace the follow snapshot with a freshly fetched list."""
+        with self._lock:
+            self.conn.execute('DELETE FROM followed_artists')
+            self.conn.executemany(
+                'INSERT INTO followed_artists (position, spotify_id, name) VALUES (?, ?, ?)',
+                [(i, a['id'], a['name']) for i, a in enumerate(artists)]
+            )
+            self._set_meta('follow_snapshot_fingerprint', fingerprint)
+            self._set_meta('follow_snapshot_taken_at', now_iso())
+            self.conn.commit()
+
+    # --- Search schedule -------------------------------------------------
+
+    def load_schedule(self):
+        """Return {artist_key: entry} for every artist searched so far."""
+        with self._lock:
+            cursor = self.conn.execute('SELECT * FROM artist_schedule')
+            columns = [c[0] for c in cursor.description]
+            rows = cursor.fetchall()
+        schedule = {}
+        for row in rows:
+            entry = dict(zip(columns, row))
+            entry['event_ids'] = json.loads(entry['event_ids'])
+            schedule[entry['artist_key']] = entry
+        return schedule
+
+    def save_schedule_entry(self, entry):
+        """Insert or replace one artist's schedule entry. Committed by checkpoint_artist()."""
+        with self._lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO artist_schedule (artist_key, name, last_checked, last_changed, '
+                'checks, changes, quiet_streak, event_ids) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (entry['artist_key'], entry['name'], entry['last_checked'], entry['last_changed'],
+                 entry['checks'], entry['changes'], entry['quiet_streak'], json.dumps(sorted(entry['event_ids'])))
+            )
+
+    # --- Run history -----------------------------------------------------
+
+    def start_run(self):
+        """Record the start of a run and return its ID."""
+        with self._lock:
+            cursor = self.conn.execute('INSERT INTO runs (started_at) VALUES (?)', (now_iso(),))
+            self.conn.commit()
+        return cursor.lastrowid
+
+    def finish_run(self, run_id, artists_checked, new_concerts, api_requests, expired_events=0,
+                   duplicates_collapsed=0):
+        """Mark a run finished, closing any older interrupted runs and dropping their journals.
+
+        The tracker's size is recorded with each run so its growth can be reported.
+        """
+        with self._lock:
+            finished_at = now_iso()
+            tracker = self.tracker_stats()
+            self.conn.execute(
+                'UPDATE runs SET finished_at = ?, artists_checked = ?, new_concerts = ?, api_requests = ?, '
+                'tracked_events = ?, undated_events = ?, expired_events = ?, duplicates_collapsed = ? WHERE id = ?',
+                (finished_at, artists_checked, new_concerts, api_requests,
+                 tracker['tracked'], tracker['undated'], expired_events, duplicates_collapsed, run_id)
+            )
+            self.conn.execute(
+                'UPDATE runs SET finished_at = ? WHERE finished_at IS NULL AND id < ?', (finished_at, run_id)
+            )
+            self.conn.execute('DELETE FROM run_journal WHERE run_id <= ?', (run_id,))
+            self.conn.commit()
+
+    def record_schedule_metrics(self, run_id, skipped, audited, misses):
+        """Record how many artists the schedule skipped, and what auditing the skipped ones found."""
+        with self._lock:
+            self.conn.execute(
+                'UPDATE runs SET artists_skipped = ?, audited_artists = ?, audit_misses = ? WHERE id = ?',
+                (skipped, audited, misses, run_id)
+            )
+            self.conn.commit()
+
+    def interrupted_runs(self):
+        """Return (id, started_at) for every run that never finished, oldest first."""
+        with self._lock:
+            return self.conn.execute(
+                'SELECT id, started_at FROM runs WHERE finished_at IS NULL ORDER BY id'
+            ).fetchall()
+
+    def recent_runs(self, limit=10):
+        with self._lock:
+            cursor = self.conn.execute('SELECT * FROM runs ORDER BY id DESC LIMIT ?', (limit,))
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    # --- Progress journal ------------------------------------------------
+
+    def checkpoint_artist(self, run_id, artist_name, alerts, complete=True, channels=()):
+        """Append an artist's outcome to the run journal and commit it with its notified events.
+
+        `alerts` are JSON-serializable alert records, also queued in the
+        outbox for each notification channel named in `channels` in the same
+        transaction. `complete` is False when the artist's search failed
+        part-way; any alerts found before the failure are still recorded.
+        """
+        with self._lock:
+            self._queue(channels, alerts)
+            self.conn.execute(
+                'INSERT INTO run_journal (run_id, artist_name, complete, alerts, recorded_at) VALUES (?, ?, ?, ?, ?)',
+                (run_id, artist_name, int(complete), json.dumps(alerts), now_iso())
+            )
+            self.conn.commit()
+
+    def completed_artists(self, run_id):
+        """Names of artists the run finished searching."""
+        with self._lock:
+            return {row[0] for row in self.conn.execute(
+                'SELECT artist_name FROM run_journal WHERE run_id = ? AND complete = 1', (run_id,)
+            )}
+
+    def journaled_alerts(self, up_to_run_id):
+        """Alerts journaled by unfinished runs up to and including up_to_run_id, in the order found."""
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT alerts FROM run_journal WHERE run_id <= ? ORDER BY id', (up_to_run_id,)
+            ).fetchall()
+        return [alert for (alerts,) in rows for alert in json.loads(alerts)]
+
+    # --- Notification outbox ---------------------------------------------
+
+    def queue_alerts(self, channels, alerts):
+        """Queue alerts for delivery through each channel; ones already queued for a channel are ignored."""
+        with self._lock:
+            self._queue(channels, alerts)
+            self.conn.commit()
+
+    def _queue(self, channels, alerts):
+        """Caller commits."""
+        queued_at = now_iso()
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO outbox (channel, event_id, alert, status, queued_at) VALUES (?, ?, ?, 'pending', ?)",
+            [(channel, alert.get('event_id'), json.dumps(alert), queued_at) for channel in channels for alert in alerts]
+        )
+
+    def pending_alerts(self, channel, limit=None):
+        """(outbox ID, alert) for a channel's undelivered alerts, oldest first."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, alert FROM outbox WHERE channel = ? AND status = 'pending' ORDER BY id LIMIT ?",
+                (channel, -1 if limit is None else limit)
+            ).fetchall()
+        return [(outbox_id, json.loads(alert)) for outbox_id, alert in rows]
+
+    def mark_sent(self, outbox_ids):
+        """Mark alerts delivered. Returns how many were marked."""
+        with self._lock:
+            self.conn.executemany(
+                "UPDATE outbox SET status = 'sent', attempts = attempts + 1, last_error = NULL, sent_at = ? "
+                "WHERE id = ?",
+                [(now_iso(), outbox_id) for outbox_id in outbox_ids]
+            )
+            self.conn.commit()
+        return len(outbox_ids)
+
+    def mark_failed(self, outbox_ids, error, max_attempts):
+        """Count a failed delivery attempt; alerts that reach `max_attempts` are given up on.
+
+        Returns how many were given up on.
+        """
+        with self._lock:
+            self.conn.executemany(
+                'UPDATE outbox SET attempts = attempts + 1, last_error = ? WHERE id = ?',
+                [(str(error), outbox_id) for outbox_id in outbox_ids]
+            )
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "UPDATE outbox SET status = 'failed' WHERE id = ? AND attempts >= ?",
+                [(outbox_id, max_attempts) for outbox_id in outbox_ids]
+            )
+            given_up = self.conn.total_changes - before
+            self.conn.commit()
+        return given_up
+
+    def prune_outbox(self, keep_days):
+        """Drop delivered alerts sent more than `keep_days` ago. Returns how many were removed."""
+        cutoff = (datetime.now() - timedelta(days=keep_days)).isoformat(timespec='seconds')
+        with self._lock:
+            cursor = self.conn.execute("DELETE FROM outbox WHERE status = 'sent' AND sent_at < ?", (cutoff,))
+            self.conn.commit()
+        return cursor.rowcount
+
+    def outbox_stats(self):
+        """{channel: {status: count}} across the outbox."""
+        stats = {}
+        with self._lock:
+            for channel, status, count in self.conn.execute(
+                'SELECT channel, status, COUNT(*) FROM outbox GROUP BY channel, status'
+            ):
+                stats.setdefault(channel, {})[status] = count
+        return stats
+
+    # --- Internals -------------------------------------------------------
+
+    def _get_meta(self, key):
+        with self._lock:
+            row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        """Caller commits."""
+        with self._lock:
+            self.conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
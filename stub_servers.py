@@ -0,0 +1,897 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for the external APIs the bot talks to (for benchmarks and offline testing)
+"""
+
+import email
+import hashlib
+import json
+import math
+import socketserver
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from venue_index import distance_miles
+
+
+def fake_events(artist_name, count=None):
+    """Build deterministic Discovery-style events for an artist."""
+    digest = hashlib.sha1(artist_name.encode('utf-8')).hexdigest()
+    if count is None:
+        count = int(digest[:2], 16) % 4  # 0-3 shows per artist
+    events = []
+    for i in range(count):
+        event_digest = hashlib.sha1(f'{artist_name}:{i}'.encode('utf-8')).hexdigest()
+        event_id = f"FAKE{event_digest[:12].upper()}"
+        event_date = datetime.now() + timedelta(days=1 + int(event_digest[12:16], 16) % 360)
+        events.append({
+            'id': event_id,
+            'name': artist_name if i % 2 == 0 else f"{artist_name} - World Tour",
+            'url': f"https://www.ticketmaster.com/event/{event_id}",
+            'dates': {'start': {'localDate': event_date.strftime('%Y-%m-%d'), 'localTime': '20:00:00'}},
+            '_embedded': {
+                'venues': [{'name': 'The Fake Venue', 'city': {'name': 'Los Angeles'}}],
+                'attractions': [{'id': f"K8vZ{digest[:10]}", 'name': artist_name}],
+            },
+        })
+    return events
+
+
+def fake_duplicate_listings(events, every=3):
+    """Second listings of some events under new IDs, like a presale or Ticketweb mirror of the same show."""
+    listings = []
+    for event in events[::every]:
+        digest = hashlib.sha1(f"{event['id']}:mirror".encode('utf-8')).hexdigest()
+        listing_id = f"TW{digest[:14].upper()}"
+        start = event['dates']['start']
+        listings.append(dict(
+            event,
+            id=listing_id,
+            name=f"{event['name']} (Presale)",
+            url=f"https://www.ticketweb.com/event/{listing_id.lower()}",
+            # Listed a few minutes off the main listing's door time
+            dates={'start': dict(start, localTime=start['localTime'][:3] + '15:00')},
+        ))
+    return listings
+
+
+def fake_regional_events(count, seed='region'):
+    """Build filler music events by acts nobody follows, to populate a regional sweep."""
+    events = []
+    for i in range(count):
+        digest = hashlib.sha1(f'{seed}:{i}'.encode('utf-8')).hexdigest()
+        name = f"Local Act {digest[:6].upper()}"
+        event_date = datetime.now() + timedelta(days=1 + int(digest[6:10], 16) % 360)
+        events.append({
+            'id': f"LOCAL{digest[:12].upper()}",
+            'name': name,
+            'url': f"https://www.ticketmaster.com/event/LOCAL{digest[:12].upper()}",
+            'dates': {'start': {'localDate': event_date.strftime('%Y-%m-%d'), 'localTime': '21:00:00'}},
+            '_embedded': {
+                'venues': [{'name': 'The Fake Venue', 'city': {'name': 'Los Angeles'}}],
+                'attractions': [{'id': f"K8vZ{digest[12:22]}", 'name': name}],
+            },
+        })
+    return events
+
+
+def fake_venues(count, latitude, longitude, spread_miles, seed='venue'):
+    """Deterministic Discovery-style venues scattered up to spread_miles around a point."""
+    venues = []
+    for i in range(count):
+        digest = hashlib.sha1(f'{seed}:{i}'.encode('utf-8')).hexdigest()
+        # sqrt keeps the venues evenly spread over the disc rather than bunched at the centre
+        distance = spread_miles * math.sqrt(int(digest[:8], 16) / 0xFFFFFFFF)
+        bearing = 2 * math.pi * int(digest[8:16], 16) / 0xFFFFFFFF
+        venue_latitude = latitude + distance * math.cos(bearing) / 69.09
+        venue_longitude = longitude + distance * math.sin(bearing) / (69.09 * math.cos(math.radians(latitude)))
+        venues.append({
+            'id': f"KovZ{digest[16:28].upper()}",
+            'name': f"Fake Venue {digest[28:34].upper()}",
+            'city': {'name': 'Fake City'},
+            'location': {'latitude': f"{venue_latitude:.5f}", 'longitude': f"{venue_longitude:.5f}"},
+        })
+    return venues
+
+
+def place_events(events, venues):
+    """Copies of events moved to venues picked deterministically from the list."""
+    placed = []
+    for event in events:
+        index = int(hashlib.sha1(event['id'].encode('utf-8')).hexdigest()[:8], 16) % len(venues)
+        placed.append(dict(event, _embedded=dict(event['_embedded'], venues=[venues[index]])))
+    return placed
+
+
+def _fake_images(kind, key):
+    """The ten image variants Discovery attaches to every event and attraction."""
+    ratios = [('16_9', 2048, 1152), ('16_9', 1024, 576), ('16_9', 640, 360), ('16_9', 305, 225),
+              ('3_2', 1024, 683), ('3_2', 640, 427), ('3_2', 305, 203), ('4_3', 305, 228),
+              ('16_9', 205, 115), ('16_9', 100, 56)]
+    return [{
+        'ratio': ratio,
+        'url': f"https://s1.ticketm.net/dam/{kind}/{key}/{ratio.upper()}_{width}x{height}.jpg",
+        'width': width,
+        'height': height,
+        'fallback': False,
+    } for ratio, width, height in ratios]
+
+
+def full_event(event):
+    """Pad a slim fake event out to the shape of a real Discovery event (~6 KB of JSON).
+
+    Adds the images, sales, classifications, price ranges, venue details and
+    links Ticketmaster sends with every event, none of which the bot reads.
+    """
+    event_id = event['id']
+    start = event['dates']['start']
+    classification = {
+        'primary': True,
+        'segment': {'id': 'KZFzniwnSyZfZ7v7nJ', 'name': 'Music'},
+        'genre': {'id': 'KnvZfZ7vAeA', 'name': 'Rock'},
+        'subGenre': {'id': 'KZazBEonSMnZfZ7v6F1', 'name': 'Pop'},
+        'type': {'id': 'KZAyXgnZfZ7v7nI', 'name': 'Undefined'},
+        'subType': {'id': 'KZFzBErXgnZfZ7v7lJ', 'name': 'Undefined'},
+        'family': False,
+    }
+    venues = [dict(venue, **{
+        'type': 'venue',
+        'id': 'KovZpZA7AAEA',
+        'test': False,
+        'url': 'https://www.ticketmaster.com/the-fake-venue-tickets-los-angeles/venue/82924',
+        'locale': 'en-us',
+        'images': [{'ratio': '16_9', 'url': 'https://s1.ticketm.net/dbimages/venue.jpg',
+                    'width': 205, 'height': 115, 'fallback': False}],
+        'postalCode': '90028',
+        'timezone': 'America/Los_Angeles',
+        'state': {'name': 'California', 'stateCode': 'CA'},
+        'country': {'name': 'United States Of America', 'countryCode': 'US'},
+        'address': {'line1': '6233 Hollywood Blvd'},
+        'location': {'longitude': '-118.32500', 'latitude': '34.10180'},
+        'markets': [{'name': 'Los Angeles', 'id': '27'}],
+        'dmas': [{'id': 223}, {'id': 324}, {'id': 354}, {'id': 383}],
+        'boxOfficeInfo': {
+            'phoneNumberDetail': 'Box Office: (323) 468-1770',
+            'openHoursDetail': 'Box office opens two hours before show time on performance days.',
+            'acceptedPaymentDetail': 'Cash, Visa, MasterCard, American Express and Discover.',
+            'willCallDetail': 'Will call tickets may be picked up two hours before show time. '
+                              'Customers must present the credit card used and a valid photo ID.',
+        },
+        'parkingDetail': 'Parking is available in the Hollywood & Highland structure and nearby lots.',
+        'accessibleSeatingDetail': 'Wheelchair and companion seating is available in all price levels.',
+        'generalInfo': {
+            'generalRule': 'No outside food or drink. No professional cameras or recording devices.',
+            'childRule': 'All ages with a ticket. Children under 2 do not require a ticket.',
+        },
+        'upcomingEvents': {'_total': 92, 'ticketmaster': 92, '_filtered': 0},
+        '_links': {'self': {'href': '/discovery/v2/venues/KovZpZA7AAEA?locale=en-us'}},
+    }) for venue in event['_embedded']['venues']]
+    attractions = [dict(attraction, **{
+        'type': 'attraction',
+        'url': f"https://www.ticketmaster.com/artist/{attraction['id']}",
+        'locale': 'en-us',
+        'externalLinks': {name: [{'url': f"https://{name}.com/{attraction['id']}"}]
+                          for name in ('youtube', 'twitter', 'itunes', 'facebook', 'spotify',
+                                       'instagram', 'homepage')},
+        'images': _fake_images('attraction', attraction['id']),
+        'classifications': [classification],
+        'upcomingEvents': {'_total': 12, 'ticketmaster': 12, '_filtered': 0},
+        '_links': {'self': {'href': f"/discovery/v2/attractions/{attraction['id']}?locale=en-us"}},
+    }) for attraction in event['_embedded']['attractions']]
+
+    return {
+        'name': event['name'],
+        'type': 'event',
+        'id': event_id,
+        'test': False,
+        'url': event['url'],
+        'locale': 'en-us',
+        'images': _fake_images('event', event_id),
+        'sales': {
+            'public': {'startDateTime': '2025-01-10T18:00:00Z', 'startTBD': False, 'startTBA': False,
+                       'endDateTime': f"{start['localDate']}T03:00:00Z"},
+            'presales': [{'startDateTime': '2025-01-08T17:00:00Z', 'endDateTime': '2025-01-09T05:00:00Z',
+                          'name': name} for name in ('Artist Presale', 'Citi Cardmember Presale',
+                                                     'Live Nation Presale', 'Venue Presale')],
+        },
+        'dates': {
+            'start': dict(start, dateTime=f"{start['localDate']}T03:00:00Z", dateTBD=False,
+                          dateTBA=False, timeTBA=False, noSpecificTime=False),
+            'timezone': 'America/Los_Angeles',
+            'status': {'code': 'onsale'},
+            'spanMultipleDays': False,
+        },
+        'classifications': [classification],
+        'promoter': {'id': '653', 'name': 'LIVE NATION MUSIC', 'description': 'LIVE NATION MUSIC / NTL / USA'},
+        'promoters': [{'id': '653', 'name': 'LIVE NATION MUSIC', 'description': 'LIVE NATION MUSIC / NTL / USA'}],
+        'info': 'All ages. Doors open one hour before the show. Lineup subject to change.',
+        'pleaseNote': 'Tickets are non-refundable. Mobile entry only, screenshots will not be accepted.',
+        'priceRanges': [{'type': 'standard', 'currency': 'USD', 'min': 45.0, 'max': 125.0},
+                        {'type': 'standard including fees', 'currency': 'USD', 'min': 58.15, 'max': 151.4}],
+        'products': [{'name': 'Parking', 'id': f"{event_id}P", 'url': f"{event['url']}?parking",
+                      'type': 'Parking', 'classifications': [classification]}],
+        'seatmap': {'staticUrl': f"https://maps.ticketmaster.com/maps/geometry/3/event/{event_id}/staticImage"},
+        'accessibility': {'ticketLimit': 2, 'id': f"{event_id}A"},
+        'ticketLimit': {'info': 'There is an overall 8 ticket limit for this event.', 'id': f"{event_id}L"},
+        'ageRestrictions': {'legalAgeEnforced': False, 'id': f"{event_id}R"},
+        'ticketing': {'safeTix': {'enabled': True}, 'allInclusivePricing': {'enabled': False}, 'id': f"{event_id}T"},
+        '_links': {
+            'self': {'href': f"/discovery/v2/events/{event_id}?locale=en-us"},
+            'attractions': [{'href': f"/discovery/v2/attractions/{a['id']}?locale=en-us"} for a in attractions],
+            'venues': [{'href': '/discovery/v2/venues/KovZpZA7AAEA?locale=en-us'}],
+        },
+        '_embedded': {'venues': venues, 'attractions': attractions},
+    }
+
+
+class FakeTicketmasterServer:
+    """Serves /discovery/v2/events.json and attractions.json from an in-memory event list.
+
+    With `rate_limit` set, more than that many requests in any one-second window
+    get a 429 with Retry-After, like the real Discovery API quota. Responses carry
+    an ETag and honor If-None-Match with a 304. With `full_payloads`, events are
+    padded out to the size and shape of real Discovery events.
+
+    Usage:
+        with FakeTicketmasterServer(events, latency=0.1) as server:
+            config.TICKETMASTER_BASE_URL = server.base_url
+    """
+
+    def __init__(self, events=None, latency=0.0, rate_limit=None, daily_quota=5000, port=0, full_payloads=False):
+        self.events = events or []
+        self.full_payloads = full_payloads
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.daily_quota = daily_quota
+        self.request_count = 0
+        self.throttled_count = 0
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/discovery/v2"
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with fake._lock:
+                    fake.request_count += 1
+                    throttled = fake._over_rate_limit()
+                if throttled:
+                    self._send(429, {'fault': {'faultstring': 'Rate limit quota violation'}},
+                               {'Retry-After': '1'})
+                    return
+                if fake.latency:
+                    time.sleep(fake.latency)
+
+                parsed = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                if parsed.path == '/discovery/v2/events.json':
+                    payload = fake.search(params)
+                elif parsed.path == '/discovery/v2/attractions.json':
+                    payload = fake.search_attractions(params)
+                elif parsed.path.startswith('/discovery/v2/events/') and parsed.path.endswith('.json'):
+                    payload = fake.event_details(parsed.path[len('/discovery/v2/events/'):-len('.json')])
+                    if payload is None:
+                        self._send(404, {'errors': [{'detail': 'Resource not found'}]})
+                        return
+                else:
+                    self._send(404, {'errors': [{'detail': 'Not found'}]})
+                    return
+                if 'errors' in payload:
+                    self._send(400, payload)
+                    return
+                etag = '"' + hashlib.sha1(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                self._send(200, payload, {'ETag': etag})
+
+            def _send(self, status, payload, headers=None):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Rate-Limit', str(fake.daily_quota))
+                self.send_header('Rate-Limit-Available', str(max(0, fake.daily_quota - fake.request_count)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output clean
+
+        return Handler
+
+    def _over_rate_limit(self):
+        """Sliding one-second window check (caller holds the lock)."""
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] >= 1.0:
+            self._recent.popleft()
+        if len(self._recent) >= self.rate_limit:
+            self.throttled_count += 1
+            return True
+        self._recent.append(now)
+        return False
+
+    # Documented Discovery sort values the fake supports (ties broken by event ID)
+    SORT_KEYS = {
+        'date,asc': lambda event: (event['dates']['start']['localDate'], event['id']),
+        'date,desc': lambda event: (event['dates']['start']['localDate'], event['id']),
+        'name,asc': lambda event: (event['name'].lower(), event['id']),
+        'name,desc': lambda event: (event['name'].lower(), event['id']),
+    }
+
+    def search(self, params):
+        """Return a Discovery-style response for the given query parameters.
+
+        Honors keyword, startDateTime/endDateTime, latlong/radius (for venues
+        with a location), sort, size and page, and rejects pages past the API's
+        1,000-result deep paging limit. Sort values outside SORT_KEYS are
+        rejected too, so the bot can't come to rely on an undocumented order.
+        """
+        keyword = params.get('keyword', '').lower()
+        attraction_ids = set(filter(None, params.get('attractionId', '').split(',')))
+        start = params.get('startDateTime', '')[:10]
+        end = params.get('endDateTime', '')[:10] or '9999-12-31'
+        size = int(params.get('size', 20))
+        page = int(params.get('page', 0))
+
+        matches = [
+            event for event in self.events
+            if (not keyword or any(keyword in a['name'].lower() for a in event['_embedded']['attractions']))
+            and (not attraction_ids or any(a['id'] in attraction_ids for a in event['_embedded']['attractions']))
+            and start <= event['dates']['start']['localDate'] <= end
+            and self._within_radius(event, params)
+        ]
+        sort = params.get('sort', 'date,asc')
+        if sort not in self.SORT_KEYS:
+            return {'errors': [{'detail': f"Invalid sort value: {sort}"}]}
+        matches.sort(key=self.SORT_KEYS[sort], reverse=sort.endswith(',desc'))
+
+        if (page + 1) * size > 1000:
+            return {'errors': [{'code': 'DIS1035', 'detail': 'API Limits Exceeded: Max paging depth exceeded. (page * size) must be less than 1,000'}]}
+
+        page_events = matches[page * size:(page + 1) * size]
+        data = {'page': {
+            'size': size,
+            'totalElements': len(matches),
+            'totalPages': (len(matches) + size - 1) // size,
+            'number': page,
+        }}
+        if page_events:
+            if self.full_payloads:
+                page_events = [full_event(event) for event in page_events]
+            data['_embedded'] = {'events': page_events}
+        if self.full_payloads:
+            # Real responses list _embedded and _links first and paging info last
+            data['_links'] = {'self': {'href': f"/discovery/v2/events.json?page={page}&size={size}"}}
+            data['page'] = data.pop('page')
+        return data
+
+    @staticmethod
+    def _within_radius(event, params):
+        location = event['_embedded']['venues'][0].get('location')
+        if not location or 'latlong' not in params:
+            return True
+        latitude, longitude = map(float, params['latlong'].split(','))
+        distance = distance_miles(latitude, longitude, float(location['latitude']), float(location['longitude']))
+        return distance <= float(params.get('radius', 50))
+
+    def event_details(self, event_id):
+        """Return a single event by ID (the /events/{id}.json endpoint), or None."""
+        return next((event for event in self.events if event['id'] == event_id), None)
+
+    def search_attractions(self, params):
+        """Return a Discovery-style attractions response for a keyword."""
+        keyword = params.get('keyword', '').lower()
+        attractions = {}
+        for event in self.events:
+            for attraction in event['_embedded']['attractions']:
+                if keyword in attraction['name'].lower():
+                    attractions[attraction['id']] = attraction
+        found = sorted(attractions.values(), key=lambda a: a['name'])[:int(params.get('size', 20))]
+        data = {'page': {'size': len(found), 'totalElements': len(found), 'totalPages': 1, 'number': 0}}
+        if found:
+            data['_embedded'] = {'attractions': found}
+        return data
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class FakeSpotifyServer:
+    """Serves the Spotify token endpoint plus followed and top artists, checking bearer tokens.
+
+    POST /api/token hands out a fresh access token for any refresh token;
+    tokens expire after `token_lifetime` seconds and `revoke_tokens()`
+    invalidates all of them, so API calls with a stale token get a 401 like
+    the real Web API.
+
+    Usage:
+        with FakeSpotifyServer(artist_names) as server:
+            config.SPOTIFY_API_BASE_URL = server.api_url
+            config.SPOTIFY_TOKEN_URL = server.token_url
+    """
+
+    def __init__(self, artist_names=(), latency=0.0, token_lifetime=3600,
+                 scope='user-follow-modify user-follow-read user-top-read', port=0):
+        self.followed = [{'name': name, 'id': f"sp{i:06d}"} for i, name in enumerate(artist_names)]
+        self.latency = latency
+        self.token_lifetime = token_lifetime
+        self.scope = scope
+        self.token_requests = 0
+        self.api_requests = 0
+        self.unauthorized_count = 0
+        self._tokens = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def root_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self):
+        return f"{self.root_url}/v1/"
+
+    @property
+    def token_url(self):
+        return f"{self.root_url}/api/token"
+
+    def revoke_tokens(self):
+        with self._lock:
+            self._tokens.clear()
+
+    def _issue_token(self):
+        with self._lock:
+            self.token_requests += 1
+            token = f"fake-access-{self.token_requests}"
+            self._tokens[token] = time.time() + self.token_lifetime
+        return {'access_token': token, 'token_type': 'Bearer', 'expires_in': self.token_lifetime,
+                'scope': self.scope}
+
+    def _authorized(self, header):
+        token = (header or '')[len('Bearer '):]
+        with self._lock:
+            self.api_requests += 1
+            valid = self._tokens.get(token, 0) > time.time()
+            if not valid:
+                self.unauthorized_count += 1
+        return valid
+
+    def _page(self, items, offset, limit, path):
+        next_url = f"{self.api_url}{path}?offset={offset + limit}&limit={limit}" if offset + limit < len(items) else None
+        return {'items': items[offset:offset + limit], 'total': len(items), 'limit': limit,
+                'offset': offset, 'next': next_url}
+
+    def following(self, params):
+        """/me/following?type=artist, paged with an `after` cursor (the last artist ID seen)."""
+        limit = int(params.get('limit', 20))
+        after = params.get('after')
+        start = next((i + 1 for i, a in enumerate(self.followed) if a['id'] == after), 0) if after else 0
+        items = self.followed[start:start + limit]
+        more = start + limit < len(self.followed)
+        next_url = f"{self.api_url}me/following?type=artist&limit={limit}&after={items[-1]['id']}" if more else None
+        return {'artists': {'items': items, 'total': len(self.followed), 'limit': limit,
+                            'cursors': {'after': items[-1]['id'] if more else None}, 'next': next_url}}
+
+    def top_artists(self, params):
+        """/me/top/artists: the followed artists in a different order per time range."""
+        limit = int(params.get('limit', 20))
+        offset = int(params.get('offset', 0))
+        time_range = params.get('time_range', 'medium_term')
+        shift = ['short_term', 'medium_term', 'long_term'].index(time_range)
+        return self._page(self.followed[shift::2], offset, limit, 'me/top/artists')
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if urlparse(self.path).path != '/api/token':
+                    self._send(404, {'error': 'not_found'})
+                    return
+                self._send(200, fake._issue_token())
+
+            def do_GET(self):
+                if not fake._authorized(self.headers.get('Authorization')):
+                    self._send(401, {'error': {'status': 401, 'message': 'The access token expired'}})
+                    return
+                if fake.latency:
+                    time.sleep(fake.latency)
+                parsed = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                if parsed.path == '/v1/me/following':
+                    self._send(200, fake.following(params))
+                elif parsed.path == '/v1/me/top/artists':
+                    self._send(200, fake.top_artists(params))
+                else:
+                    self._send(404, {'error': {'status': 404, 'message': 'Not found'}})
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output clean
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def fake_source_shows(artist_name):
+    """Shows another provider would list for an artist: Ticketmaster's, plus small-room and out-of-town dates.
+
+    Returned in a neutral shape that FakeBandsintownServer and
+    FakeSeatGeekServer render in their own formats.
+    """
+    shows = []
+    for event in fake_events(artist_name):
+        start = event['dates']['start']
+        shows.append({'id': event['id'][4:], 'artist': artist_name, 'title': event['name'],
+                      'date': start['localDate'], 'time': start['localTime'],
+                      'venue': 'Fake Venue', 'city': 'Los Angeles', 'lat': 34.05, 'lon': -118.25})
+    digest = hashlib.sha1(f'{artist_name}:small'.encode('utf-8')).hexdigest()
+    show_date = (datetime.now() + timedelta(days=1 + int(digest[:4], 16) % 300)).strftime('%Y-%m-%d')
+    if int(digest[4:6], 16) % 3 == 0:
+        shows.append({'id': f"SMALL{digest[6:14].upper()}", 'artist': artist_name, 'title': f"{artist_name} (Intimate Show)",
+                      'date': show_date, 'time': '21:00:00',
+                      'venue': 'The Fake Small Room', 'city': 'Los Angeles', 'lat': 34.09, 'lon': -118.28})
+    if int(digest[6:8], 16) % 4 == 0:
+        shows.append({'id': f"AWAY{digest[8:16].upper()}", 'artist': artist_name, 'title': artist_name,
+                      'date': show_date, 'time': '20:00:00',
+                      'venue': 'Fake Hall North', 'city': 'San Francisco', 'lat': 37.77, 'lon': -122.42})
+    return shows
+
+
+class _JsonStubServer:
+    """Base for the small JSON stub servers: latency, request counting and lifecycle."""
+
+    def __init__(self, latency=0.0, port=0):
+        self.latency = latency
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def route(self, path, params):
+        """Return (status, payload) for a GET."""
+        raise NotImplementedError
+
+    def receive(self, path, payload):
+        """Return (status, payload, extra headers) for a POST of a JSON payload."""
+        return 405, {'error': 'Method not allowed'}, {}
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self._count()
+                parsed = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                status, payload = fake.route(unquote(parsed.path), params)
+                self._respond(status, payload)
+
+            def do_POST(self):
+                self._count()
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                try:
+                    payload = json.loads(body or b'null')
+                except ValueError:
+                    self._respond(400, {'error': 'Invalid JSON'})
+                    return
+                status, payload, headers = fake.receive(unquote(urlparse(self.path).path), payload)
+                self._respond(status, payload, headers)
+
+            def _count(self):
+                with fake._lock:
+                    fake.request_count += 1
+                if fake.latency:
+                    time.sleep(fake.latency)
+
+            def _respond(self, status, payload, headers=None):
+                body = b'' if payload is None else json.dumps(payload).encode('utf-8')
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    for name, value in (headers or {}).items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The client gave up waiting (timeout tests)
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output clean
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class FakeBandsintownServer(_JsonStubServer):
+    """Serves /artists/{name}/events like the Bandsintown API, from fake_source_shows().
+
+    Usage:
+        with FakeBandsintownServer(artist_names) as server:
+            config.BANDSINTOWN_BASE_URL = server.base_url
+    """
+
+    def __init__(self, artist_names=(), latency=0.0, port=0):
+        self.shows = {name.lower(): fake_source_shows(name) for name in artist_names}
+        super().__init__(latency, port)
+
+    def route(self, path, params):
+        if not (path.startswith('/artists/') and path.endswith('/events')):
+            return 404, {'errorMessage': '[NotFound] Unknown endpoint'}
+        name = path[len('/artists/'):-len('/events')].lower()
+        if name not in self.shows:
+            return 404, {'errorMessage': '[NotFound] The artist was not found'}
+        return 200, [{
+            'id': show['id'],
+            'url': f"https://www.bandsintown.com/e/{show['id']}",
+            'datetime': f"{show['date']}T{show['time']}",
+            'title': '',
+            'lineup': [show['artist']],
+            'venue': {'name': show['venue'], 'city': show['city'], 'country': 'United States',
+                      'latitude': str(show['lat']), 'longitude': str(show['lon'])},
+        } for show in self.shows[name]]
+
+
+class FakeSeatGeekServer(_JsonStubServer):
+    """Serves /events like the SeatGeek API (q, lat/lon/range, page/per_page), from fake_source_shows().
+
+    Usage:
+        with FakeSeatGeekServer(artist_names) as server:
+            config.SEATGEEK_BASE_URL = server.base_url
+    """
+
+    def __init__(self, artist_names=(), latency=0.0, port=0):
+        self.shows = [show for name in artist_names for show in fake_source_shows(name)]
+        super().__init__(latency, port)
+
+    def route(self, path, params):
+        if path != '/events':
+            return 404, {'status': 404, 'message': 'Not found'}
+        query = params.get('q', '').lower()
+        matches = [show for show in self.shows if query in show['artist'].lower()]
+        if 'lat' in params:
+            # A rough box is enough to leave out the out-of-town dates
+            matches = [show for show in matches
+                       if abs(show['lat'] - float(params['lat'])) < 1 and abs(show['lon'] - float(params['lon'])) < 1]
+        per_page = int(params.get('per_page', 10))
+        page = int(params.get('page', 1))
+        return 200, {
+            'events': [{
+                'id': int(hashlib.sha1(show['id'].encode('utf-8')).hexdigest()[:8], 16),
+                'title': show['title'],
+                'url': f"https://seatgeek.com/e/{show['id'].lower()}",
+                'datetime_local': f"{show['date']}T{show['time']}",
+                'time_tbd': False,
+                'venue': {'name': show['venue'], 'city': show['city'],
+                          'location': {'lat': show['lat'], 'lon': show['lon']}},
+                'performers': [{'name': show['artist']}],
+            } for show in matches[(page - 1) * per_page:page * per_page]],
+            'meta': {'total': len(matches), 'page': page, 'per_page': per_page},
+        }
+
+
+
+class FakeWebhookServer(_JsonStubServer):
+    """Accepts Discord/Slack-style webhook posts (and SendGrid's /v3/mail/send), recording each payload.
+
+    `failures` queues status codes to answer the next posts with (a 429 comes
+    with a Retry-After of `retry_after` seconds) before accepting again.
+
+    Usage:
+        with FakeWebhookServer(failures=[500, 429]) as server:
+            config.WEBHOOK_URL = server.base_url + '/webhook'
+            config.SENDGRID_API_URL = server.base_url
+    """
+
+    def __init__(self, failures=(), retry_after=0.2, latency=0.0, port=0):
+        self.failures = deque(failures)
+        self.retry_after = retry_after
+        self.received = []
+        super().__init__(latency, port)
+
+    def receive(self, path, payload):
+        with self._lock:
+            if self.failures:
+                status = self.failures.popleft()
+                headers = {'Retry-After': str(self.retry_after)} if status == 429 else {}
+                return status, {'message': 'Failing on purpose'}, headers
+            self.received.append((path, payload))
+        # SendGrid answers 202 with no body; Discord 204, Slack 200
+        return (202, None, {}) if path == '/v3/mail/send' else (204, None, {})
+
+
+class FakeSmtpServer:
+    """A minimal SMTP server (HELO/EHLO, MAIL, RCPT, DATA, RSET, NOOP, QUIT) that keeps each message.
+
+    No STARTTLS or AUTH, so point the bot at it with SMTP_STARTTLS=false and
+    no SMTP_USERNAME. `failures` queues SMTP reply codes (e.g. 421, 451) to
+    refuse the next messages' DATA with. `messages` holds
+    (sender, recipients, email.message.Message).
+
+    Usage:
+        with FakeSmtpServer() as server:
+            config.SMTP_HOST, config.SMTP_PORT = server.host, server.port
+    """
+
+    def __init__(self, failures=(), latency=0.0, port=0):
+        self.failures = deque(failures)
+        self.latency = latency
+        self.messages = []
+        self.connection_count = 0
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer(('127.0.0.1', port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def host(self):
+        return self._server.server_address[0]
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(f"{line}\r\n".encode('ascii'))
+
+            def handle(self):
+                with fake._lock:
+                    fake.connection_count += 1
+                self.reply('220 fake-smtp ready')
+                sender, recipients = None, []
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode('utf-8', 'replace').strip()
+                    verb = command[:4].upper()
+                    if verb == 'EHLO':
+                        self.reply('250-fake-smtp')
+                        self.reply('250 8BITMIME')
+                    elif verb == 'HELO' or verb == 'NOOP':
+                        self.reply('250 OK')
+                    elif verb == 'MAIL':
+                        sender, recipients = command.partition(':')[2].strip().strip('<>'), []
+                        self.reply('250 OK')
+                    elif verb == 'RCPT':
+                        recipients.append(command.partition(':')[2].strip().strip('<>'))
+                        self.reply('250 OK')
+                    elif verb == 'DATA':
+                        self.receive_data(sender, recipients)
+                    elif verb == 'RSET':
+                        sender, recipients = None, []
+                        self.reply('250 OK')
+                    elif verb == 'QUIT':
+                        self.reply('221 Bye')
+                        return
+                    else:
+                        self.reply('502 Command not implemented')
+
+            def receive_data(self, sender, recipients):
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                lines = []
+                while True:
+                    line = self.rfile.readline()
+                    if not line or line in (b'.\r\n', b'.\n'):
+                        break
+                    lines.append(line[1:] if line.startswith(b'..') else line)
+                if fake.latency:
+                    time.sleep(fake.latency)
+                with fake._lock:
+                    code = fake.failures.popleft() if fake.failures else None
+                    if code is None:
+                        fake.messages.append((sender, recipients, email.message_from_bytes(b''.join(lines))))
+                self.reply(f"{code} Try again later" if code else '250 OK: queued')
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == '__main__':
+    # Run a standalone fake server seeded from the curated artist list
+    with open('my_artists.txt', 'r') as f:
+        names = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    events = [event for name in names for event in fake_events(name)]
+    server = FakeTicketmasterServer(events, port=8765)
+    print(f"Fake Ticketmaster serving {len(events)} events at {server.base_url}")
+    print(f"Run the bot with TICKETMASTER_BASE_URL={server.base_url}. Ctrl+C to stop.")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -1,12 +1,17 @@
 #!/usr/bin/env python3
 """
 Sync Spotify followed artists to match the curated list
+
+Usage: python sync_spotify_follows.py [--yes] [--dry-run]
 """
 
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
+import argparse
+import sys
+
 import config
-import time
+from spotify_auth import spotify_client
+from spotify_batches import apply_in_batches
+from spotify_ids import SpotifyIdResolver
 
 def get_all_followed_artists(spotify):
     """Get all artists the user currently follows"""
@@ -27,23 +32,13 @@ def get_all_followed_artists(spotify):
 
     return followed
 
-def search_artist(spotify, artist_name):
-    """Search for an artist by name and return their Spotify ID"""
-    try:
-        results = spotify.search(q=f'artist:{artist_name}', type='artist', limit=1)
-        if results['artists']['items']:
-            return results['artists']['items'][0]['id']
-    except Exception as e:
-        print(f"  Error searching for {artist_name}: {e}")
-    return None
+parser = argparse.ArgumentParser(description='Sync Spotify followed artists to match my_artists.txt')
+parser.add_argument('--yes', action='store_true', help='Apply the changes without asking (for scheduled runs)')
+parser.add_argument('--dry-run', action='store_true', help='Only show what would change')
+args = parser.parse_args()
 
 # Initialize Spotify with user-modify-follow scope
-spotify = spotipy.Spotify(auth_manager=SpotifyOAuth(
-    client_id=config.SPOTIFY_CLIENT_ID,
-    client_secret=config.SPOTIFY_CLIENT_SECRET,
-    redirect_uri=config.SPOTIFY_REDIRECT_URI,
-    scope='user-top-read user-follow-read user-follow-modify'
-))
+spotify = spotify_client(scope='user-top-read user-follow-read user-follow-modify')
 
 print("=" * 80)
 print("SPOTIFY FOLLOW SYNC")
@@ -89,43 +84,71 @@ if to_follow:
         print(f"  ... and {len(to_follow) - 20} more")
 
 print("\n" + "=" * 80)
-response = input("\nProceed with syncing? (yes/no): ").strip().lower()
-
-if response != 'yes':
-    print("Cancelled. No changes made to your Spotify follows.")
-    exit(0)
+if args.dry_run:
+    print("Dry run. No changes made to your Spotify follows.")
+    sys.exit(0)
+
+if not args.yes:
+    if not sys.stdin.isatty():
+        print("Not running interactively - pass --yes to apply the changes.")
+        sys.exit(1)
+    response = input("\nProceed with syncing? (yes/no): ").strip().lower()
+    if response != 'yes':
+        print("Cancelled. No changes made to your Spotify follows.")
+        sys.exit(0)
 
 print("\n" + "=" * 80)
 print("SYNCING...")
 print("=" * 80)
 
-# Unfollow artists
+failed = []
+
+# Unfollow artists (50 IDs per request)
 if to_unfollow:
     print(f"\nUnfollowing {len(to_unfollow)} artists...")
-    for i, artist in enumerate(to_unfollow, 1):
-        try:
-            spotify.user_unfollow_artists([artist['id']])
-            print(f"  [{i}/{len(to_unfollow)}] Unfollowed: {artist['name']}")
-            time.sleep(0.1)  # Rate limiting
-        except Exception as e:
-            print(f"  [{i}/{len(to_unfollow)}] Error unfollowing {artist['name']}: {e}")
-
-# Follow artists
+    _, unfollow_failed = apply_in_batches(spotify.user_unfollow_artists, to_unfollow, 'Unfollowed')
+    failed += [dict(artist, action='unfollow') for artist in unfollow_failed]
+
+# Follow artists: look up every ID first (cached, concurrent), then follow 50 per request
 if to_follow:
-    print(f"\nFollowing {len(to_follow)} new artists...")
-    for i, artist_name in enumerate(to_follow, 1):
-        artist_id = search_artist(spotify, artist_name)
-        if artist_id:
-            try:
-                spotify.user_follow_artists([artist_id])
-                print(f"  [{i}/{len(to_follow)}] Followed: {artist_name}")
-                time.sleep(0.1)  # Rate limiting
-            except Exception as e:
-                print(f"  [{i}/{len(to_follow)}] Error following {artist_name}: {e}")
+    print(f"\nLooking up {len(to_follow)} new artists...")
+    resolver = SpotifyIdResolver(
+        spotify,
+        config.SPOTIFY_IDS_FILE,
+        config.SPOTIFY_ID_OVERRIDES_FILE,
+        workers=config.SPOTIFY_WORKERS,
+        rate=config.SPOTIFY_RATE_LIMIT
+    )
+    ids, unresolved = resolver.resolve_all(to_follow)
+    resolver.save()
+    print(f"  {len(ids)} found ({len(ids) - resolver.searches + len(unresolved)} from cache, "
+          f"{resolver.searches} Spotify searches)")
+
+    for artist_name in unresolved:
+        if artist_name in resolver.ambiguous:
+            error = f"ambiguous match - see {config.SPOTIFY_ID_REVIEW_FILE}"
         else:
-            print(f"  [{i}/{len(to_follow)}] Could not find: {artist_name}")
+            error = 'not found on Spotify'
+        print(f"  Could not resolve: {artist_name} ({error})")
+        failed.append({'name': artist_name, 'id': None, 'action': 'follow', 'error': error})
+    if resolver.ambiguous:
+        resolver.write_review(config.SPOTIFY_ID_REVIEW_FILE)
+        print(f"  {len(resolver.ambiguous)} ambiguous match(es) written to {config.SPOTIFY_ID_REVIEW_FILE} - "
+              f"add the right IDs to {config.SPOTIFY_ID_OVERRIDES_FILE}")
+
+    resolved = [{'name': name, 'id': spotify_id} for name, spotify_id in ids.items()]
+    print(f"\nFollowing {len(resolved)} new artists...")
+    _, follow_failed = apply_in_batches(spotify.user_follow_artists, resolved, 'Followed')
+    failed += [dict(artist, action='follow') for artist in follow_failed]
 
 print("\n" + "=" * 80)
+if failed:
+    print(f"⚠️  SYNC FINISHED WITH {len(failed)} FAILURE(S)")
+    print("=" * 80)
+    for artist in failed:
+        print(f"  - Could not {artist['action']} {artist['name']}: {artist['error']}")
+    sys.exit(1)
+
 print("✓ SYNC COMPLETE!")
 print("=" * 80)
 print(f"\nYour Spotify now follows exactly {len(curated_artists)} artists from your curated list.")
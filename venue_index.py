@@ -0,0 +1,203 @@
+"""
+Local venue geo index: venue coordinates cached from event payloads, bucketed into a lat/long grid for area checks
+"""
+
+import json
+import math
+import os
+import threading
+
+from artist_registry import normalize_artist_name
+
+try:
+    import numpy
+except ImportError:  # optional: pip install numpy
+    numpy = None
+
+EARTH_RADIUS_MILES = 3958.8
+# Miles per degree of latitude (and of longitude at the equator)
+MILES_PER_DEGREE = 69.09
+
+
+def distance_miles(lat1, lon1, lat2, lon2):
+    """Great-circle (haversine) distance between two points, in miles."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
+
+
+def vectorized_available():
+    return numpy is not None
+
+
+def distances_miles(latitude, longitude, latitudes, longitudes):
+    """Haversine distances from one point to many, in miles (sequences in, a list out).
+
+    Evaluated as whole-array operations when numpy is installed, otherwise
+    one point at a time.
+    """
+    if numpy is None:
+        return [distance_miles(latitude, longitude, lat, lon) for lat, lon in zip(latitudes, longitudes)]
+    lat1, lon1 = math.radians(latitude), math.radians(longitude)
+    lat2, lon2 = numpy.radians(numpy.asarray(latitudes)), numpy.radians(numpy.asarray(longitudes))
+    a = numpy.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * numpy.cos(lat2) * numpy.sin((lon2 - lon1) / 2) ** 2
+    return (2 * EARTH_RADIUS_MILES * numpy.arcsin(numpy.sqrt(a))).tolist()
+
+
+def point_in_polygon(latitude, longitude, polygon):
+    """Ray-casting test for a point inside a polygon of (latitude, longitude) vertices."""
+    inside = False
+    for (lat1, lon1), (lat2, lon2) in zip(polygon, polygon[1:] + polygon[:1]):
+        if (lat1 > latitude) != (lat2 > latitude):
+            crossing = lon1 + (latitude - lat1) * (lon2 - lon1) / (lat2 - lat1)
+            if longitude < crossing:
+                inside = not inside
+    return inside
+
+
+def enclosing_region(polygon):
+    """(latitude, longitude, radius) of a circle covering every vertex of a polygon, radius rounded up."""
+    latitude = sum(lat for lat, _ in polygon) / len(polygon)
+    longitude = sum(lon for _, lon in polygon) / len(polygon)
+    radius = max(distance_miles(latitude, longitude, lat, lon) for lat, lon in polygon)
+    return round(latitude, 4), round(longitude, 4), math.ceil(radius)
+
+
+def venue_key(venue):
+    """Ticketmaster's venue ID, or the normalized name and city for sources without one."""
+    if venue.get('id'):
+        return venue['id']
+    name = normalize_artist_name(venue.get('name') or '')
+    if not name:
+        return None
+    return f"{name}|{normalize_artist_name((venue.get('city') or {}).get('name') or '')}"
+
+
+class VenueIndex:
+    """Coordinates of every venue the bot has seen, for filtering events by area without the API.
+
+    Venues are cached in a JSON file by key (see venue_key), so a venue's
+    location is only parsed out of an event the first time it shows up.
+    Each venue is bucketed into a `cell_degrees` lat/long grid cell, so an
+    area only computes distances for venues in the cells its bounding box
+    overlaps. The set of venues inside each area is computed once per run,
+    after which checking an event is a set lookup.
+
+    An area is a region (latitude, longitude, radius in miles), optionally
+    narrowed by a polygon given as a tuple of (latitude, longitude) vertices.
+    """
+
+    def __init__(self, filename, cell_degrees=0.5):
+        self.filename = filename
+        self.cell_degrees = cell_degrees
+        self.added = 0
+        self._lock = threading.Lock()
+        self._venues = {}
+        if filename and os.path.exists(filename):
+            with open(filename, 'r') as f:
+                self._venues = json.load(f)
+        self._grid = {}
+        for key, venue in self._venues.items():
+            self._grid.setdefault(self._cell(venue['latitude'], venue['longitude']), []).append(key)
+        self._within = {}
+
+    def __len__(self):
+        return len(self._venues)
+
+    def _cell(self, latitude, longitude):
+        return (math.floor(latitude / self.cell_degrees), math.floor(longitude / self.cell_degrees))
+
+    def locate(self, event):
+        """(venue key, latitude, longitude) for an event's venue, or None if it has no coordinates."""
+        venues = event.get('_embedded', {}).get('venues') or [{}]
+        key = venue_key(venues[0])
+        if key is None:
+            return None
+        with self._lock:
+            venue = self._venues.get(key)
+        if venue is not None:
+            return key, venue['latitude'], venue['longitude']
+
+        location = venues[0].get('location') or {}
+        try:
+            latitude, longitude = float(location['latitude']), float(location['longitude'])
+        except (KeyError, TypeError, ValueError):
+            return None
+        self._add(key, venues[0], latitude, longitude)
+        return key, latitude, longitude
+
+    def _add(self, key, venue, latitude, longitude):
+        with self._lock:
+            if key in self._venues:
+                return
+            self._venues[key] = {
+                'name': venue.get('name'),
+                'city': (venue.get('city') or {}).get('name'),
+                'latitude': latitude,
+                'longitude': longitude,
+            }
+            self._grid.setdefault(self._cell(latitude, longitude), []).append(key)
+            self.added += 1
+            # Keep the precomputed areas current with the new venue
+            for (region, polygon), inside in self._within.items():
+                if self._in_area(region, polygon, latitude, longitude):
+                    inside.add(key)
+
+    def _in_area(self, region, polygon, latitude, longitude):
+        latitude_center, longitude_center, radius = region
+        if distance_miles(latitude_center, longitude_center, latitude, longitude) > radius:
+            return False
+        return polygon is None or point_in_polygon(latitude, longitude, polygon)
+
+    def venues_within(self, region, polygon=None):
+        """Keys of the known venues inside an area, computed once and then kept up to date."""
+        area = (region, polygon)
+        with self._lock:
+            if area in self._within:
+                return self._within[area]
+
+            latitude, longitude, radius = region
+            lat_span = radius / MILES_PER_DEGREE
+            lon_span = radius / (MILES_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+            low = self._cell(latitude - lat_span, longitude - lon_span)
+            high = self._cell(latitude + lat_span, longitude + lon_span)
+            candidates = [key for lat_cell in range(low[0], high[0] + 1) for lon_cell in range(low[1], high[1] + 1)
+                          for key in self._grid.get((lat_cell, lon_cell), ())]
+
+            latitudes = [self._venues[key]['latitude'] for key in candidates]
+            longitudes = [self._venues[key]['longitude'] for key in candidates]
+            distances = distances_miles(latitude, longitude, latitudes, longitudes)
+            inside = {key for key, lat, lon, distance in zip(candidates, latitudes, longitudes, distances)
+                      if distance <= radius and (polygon is None or point_in_polygon(lat, lon, polygon))}
+            self._within[area] = inside
+        return inside
+
+    def contains(self, region, polygon, event):
+        """True/False for whether the event's venue is inside the area, or None if its location is unknown.
+
+        A venue seen before costs two set/dict lookups; only a new one is parsed and measured.
+        """
+        inside = self._within.get((region, polygon))
+        if inside is None:
+            inside = self.venues_within(region, polygon)
+        venues = event.get('_embedded', {}).get('venues')
+        key = venue_key(venues[0]) if venues else None
+        if key in inside:
+            return True
+        if key in self._venues:
+            return False
+        located = self.locate(event)
+        if located is None:
+            return None
+        return located[0] in inside
+
+    def save(self):
+        """Write the venue cache atomically if any venue was added, sorted so the file diffs cleanly."""
+        if not self.added or not self.filename:
+            return
+        with self._lock:
+            tmp_path = f"{self.filename}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self._venues, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.filename)
+            self.added = 0